@@ -67,6 +67,7 @@ def main():
             'docs': ['sphinx>=2.1.2', 'recommonmark', 'nbsphinx', 'sphinx_rtd_theme', 'ipykernel', 'ipython'],
             'arithmetic': ['scipy', 'numpy'],
             'rddl': ['pyrddl'],
+            'clingo': ['clingo'],
         },
 
         # This will include non-code files specified in the manifest, see e.g.
@@ -1,4 +1,5 @@
 from . import simple
+from .batch import evaluate_batch
 
 factory_entries = {'simple': simple.evaluate}
 
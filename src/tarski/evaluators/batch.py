@@ -0,0 +1,144 @@
+"""
+ Vectorized evaluation of a formula or term over a batch of packed states.
+ The batch is represented as a numpy matrix with one row per state and one column per ground state variable, which
+ allows us to evaluate (ground) formulas column-wise instead of once per state.
+"""
+from .. import errors as err
+from .. import modules
+from ..grounding.common import StateVariableLite
+from ..syntax import Connective, Atom, CompoundFormula, builtins, Constant, CompoundTerm, Tautology, Contradiction, \
+    IfThenElse, Interval
+from .simple import evaluate, _builtin_predicate_operations, builtin_function_implementation
+
+
+def states_to_matrix(states, layout):
+    """ Return a numpy matrix with one row for each of the given packed states, all of which must have the given
+    layout. The first columns of the matrix hold the truth value (0/1) of each predicative state variable, in the
+    order of their bit positions in the layout, and the remaining ones hold the value of each functional state
+    variable, in the order of their slots in the layout. If all functional state variables are numeric, the matrix
+    is a float matrix, with NaN for undefined values; otherwise, it is a matrix of Python objects, in which the value
+    of each non-numeric state variable is the name of the corresponding object, or None if undefined. """
+    np = modules.import_numpy()
+    nstates, natoms, nterms = len(states), len(layout.atoms), len(layout.terms)
+    buffer = np.frombuffer(b''.join(bytes(s.bits) for s in states), dtype=np.uint8).reshape(nstates, layout.nbytes)
+    atoms = np.unpackbits(buffer, axis=1, count=natoms, bitorder='little')
+    if not nterms:
+        return atoms
+
+    numeric = [_is_numeric(v.symbol) for v in layout.terms]  # Variables are listed in the order of their slots
+    if all(numeric):
+        values = np.array([[np.nan if v is None else v.symbol for v in s.values] for s in states], dtype=float)
+    else:
+        undefined = [np.nan if n else None for n in numeric]
+        values = np.empty((nstates, nterms), dtype=object)
+        values[:, :] = [[u if v is None else v.symbol for v, u in zip(s.values, undefined)] for s in states]
+    return np.hstack([atoms, values.reshape(nstates, nterms)])
+
+
+def _is_numeric(function):
+    return isinstance(function.codomain, Interval)
+
+
+def evaluate_batch(expr, models, layout=None):
+    """ Evaluate the given ground formula or term over each of the given models, and return a numpy array with the
+    result for each model. `models` can be either a list of packed models sharing the same layout, or a matrix of
+    states such as the one returned by `states_to_matrix`, in which case the layout needs to be given.
+    Formulas are evaluated into boolean arrays, numeric terms into float arrays, and other terms into arrays with the
+    names of the objects they denote. """
+    np = modules.import_numpy()
+    if isinstance(models, np.ndarray):
+        if layout is None:
+            raise err.TarskiError('evaluate_batch needs the state layout in order to evaluate a matrix of states')
+        matrix = models
+    else:
+        models = list(models)
+        if not models:
+            return np.zeros(0, dtype=bool)
+        layout = models[0].layout if layout is None else layout
+        matrix = states_to_matrix(models, layout)
+
+    result = _BatchEvaluator(np, matrix, layout).evaluate(expr)
+    # Expressions that don't depend on any state variable evaluate to a scalar, which we broadcast to all states
+    return np.broadcast_to(result, (matrix.shape[0], )).copy()
+
+
+class _BatchEvaluator:
+    def __init__(self, np, matrix, layout):
+        self.np = np
+        self.matrix = matrix
+        self.layout = layout
+
+    def evaluate(self, expr):
+        np = self.np
+        if isinstance(expr, Tautology):
+            return True
+
+        if isinstance(expr, Contradiction):
+            return False
+
+        if isinstance(expr, Atom):
+            return self.evaluate_atom(expr)
+
+        if isinstance(expr, CompoundFormula):
+            subformulas = [self.evaluate(f) for f in expr.subformulas]
+            if expr.connective == Connective.Not:
+                return np.logical_not(subformulas[0])
+            if expr.connective == Connective.And:
+                return np.logical_and.reduce(np.broadcast_arrays(*subformulas))
+            return np.logical_or.reduce(np.broadcast_arrays(*subformulas))
+
+        if isinstance(expr, Constant):
+            return expr.symbol
+
+        if isinstance(expr, IfThenElse):
+            return np.where(self.evaluate(expr.condition), self.evaluate(expr.subterms[0]),
+                            self.evaluate(expr.subterms[1]))
+
+        if isinstance(expr, CompoundTerm):
+            return self.evaluate_compound_term(expr)
+
+        # Variables, quantified formulas, etc. have no column-wise interpretation
+        raise err.UnexpectedElementType(expr)
+
+    def evaluate_atom(self, atom: Atom):
+        if builtins.is_builtin_predicate(atom.predicate):
+            operation = _builtin_predicate_operations[atom.predicate.symbol]
+            return operation(*(self.evaluate(t) for t in atom.subterms))
+
+        point = self.ground_point(atom)
+        position = self.layout.atoms.get(StateVariableLite(atom.predicate, point))
+        if position is None:
+            return self.layout.static.holds(atom.predicate, point)
+        return self.matrix[:, position].astype(bool)
+
+    def evaluate_compound_term(self, term: CompoundTerm):
+        np = self.np
+        if builtins.is_builtin_function(term.symbol):
+            symbol = term.symbol.symbol
+            operation = _vectorized_operations.get(symbol) or builtin_function_implementation(symbol)
+            return operation(*(self.evaluate(t) for t in term.subterms))
+
+        point = self.ground_point(term)
+        position = self.layout.terms.get(StateVariableLite(term.symbol, point))
+        if position is None:
+            value = evaluate(term, self.layout.static)
+        else:
+            value = self.matrix[:, len(self.layout.atoms) + position]
+
+        if isinstance(value, Constant):
+            return value.symbol
+        return np.asarray(value, dtype=float) if _is_numeric(term.symbol) else value
+
+    @staticmethod
+    def ground_point(expr):
+        if not all(isinstance(t, Constant) for t in expr.subterms):
+            raise err.TarskiError(f'Batch evaluation only supports ground atoms and terms with constant arguments, '
+                                  f'but got "{expr}"')
+        return tuple(expr.subterms)
+
+
+_vectorized_operations = {
+    # The default implementations of min and max reduce over all of their arguments
+    builtins.BuiltinFunctionSymbol.MIN: lambda x, y: modules.import_numpy().minimum(x, y),
+    builtins.BuiltinFunctionSymbol.MAX: lambda x, y: modules.import_numpy().maximum(x, y),
+}
@@ -0,0 +1,127 @@
+"""
+ A compiler that translates a formula or term into a Python closure that computes its denotation over a given model.
+ All the decisions that the simple evaluator makes on every call (the type of each node, the dispatch of builtin
+ symbols, the construction of ground points) are taken once at compilation time, which pays off whenever the same
+ expression is evaluated over many different models, as is the case e.g. with goals and preconditions during search.
+"""
+from .. import errors as err
+from ..syntax import Connective, Atom, CompoundFormula, QuantifiedFormula, builtins, Variable, Constant, \
+    CompoundTerm, Tautology, Contradiction, IfThenElse, AggregateCompoundTerm, symref
+from ..syntax.algebra import Matrix
+from .simple import evaluate, _builtin_predicate_operations, builtin_function_implementation, \
+    apply_arithmetic_operation_1, apply_arithmetic_operation_2
+
+
+def compile(expr):  # pylint: disable=redefined-builtin
+    """ Compile the given formula or term into a function `f(model, sigma=None)` that returns the same value than
+    `evaluate(expr, model, sigma)`. Values of free variables in sigma are expected to be indexed by symref. """
+    function = _compile(expr)
+
+    def evaluator(model, sigma=None):
+        return function(model, sigma if sigma is not None else {})
+    return evaluator
+
+
+def _compile(expr):
+    # Formulas
+    if isinstance(expr, Tautology):
+        return lambda m, s: True
+
+    if isinstance(expr, Contradiction):
+        return lambda m, s: False
+
+    if isinstance(expr, Atom):
+        return _compile_atom(expr)
+
+    if isinstance(expr, CompoundFormula):
+        return _compile_compound_formula(expr)
+
+    if isinstance(expr, QuantifiedFormula):
+        # Quantified formulas are delegated to the standard evaluator of `tarski.evaluators.simple`, not precompiled
+        return lambda m, s: evaluate(expr, m, s)
+
+    # Terms
+    if isinstance(expr, Variable):
+        ref = symref(expr)
+        return lambda m, s: s[ref]
+
+    if isinstance(expr, Constant):
+        return lambda m, s: expr
+
+    if isinstance(expr, IfThenElse):
+        condition, then, otherwise = _compile(expr.condition), _compile(expr.subterms[0]), _compile(expr.subterms[1])
+        return lambda m, s: then(m, s) if condition(m, s) else otherwise(m, s)
+
+    if isinstance(expr, (Matrix, AggregateCompoundTerm)):
+        return lambda m, s: evaluate(expr, m, s)
+
+    if isinstance(expr, CompoundTerm):
+        return _compile_compound_term(expr)
+
+    raise err.UnexpectedElementType(expr)
+
+
+def _compile_atom(atom: Atom):
+    if builtins.is_builtin_predicate(atom.predicate):
+        operation = _builtin_predicate_operations[atom.predicate.symbol]
+        lhs, rhs = (_compile(t) for t in atom.subterms)
+        return lambda m, s: operation(lhs(m, s).symbol, rhs(m, s).symbol)
+
+    predicate = atom.predicate
+    if all(isinstance(t, Constant) for t in atom.subterms):
+        point = tuple(atom.subterms)
+        return lambda m, s: m.holds(predicate, point)
+
+    subterms = [_compile(t) for t in atom.subterms]
+    return lambda m, s: m.holds(predicate, tuple(t(m, s) for t in subterms))
+
+
+def _compile_compound_formula(formula: CompoundFormula):
+    subformulas = [_compile(f) for f in formula.subformulas]
+    if formula.connective == Connective.Not:
+        sub = subformulas[0]
+        return lambda m, s: not sub(m, s)
+
+    if formula.connective == Connective.And:
+        if len(subformulas) == 2:
+            lhs, rhs = subformulas
+            return lambda m, s: lhs(m, s) and rhs(m, s)
+        return lambda m, s: all(f(m, s) for f in subformulas)
+
+    if formula.connective == Connective.Or:
+        if len(subformulas) == 2:
+            lhs, rhs = subformulas
+            return lambda m, s: lhs(m, s) or rhs(m, s)
+        return lambda m, s: any(f(m, s) for f in subformulas)
+
+    raise err.UnexpectedElementType(formula)
+
+
+def _compile_compound_term(term: CompoundTerm):
+    subterms = [_compile(t) for t in term.subterms]
+
+    if builtins.is_builtin_function(term.symbol):
+        operation = builtin_function_implementation(term.symbol.symbol)
+        if len(subterms) == 1:
+            sub = subterms[0]
+            return lambda m, s: apply_arithmetic_operation_1(operation, sub(m, s))
+        lhs, rhs = subterms
+        return lambda m, s: apply_arithmetic_operation_2(operation, lhs(m, s), rhs(m, s), m, s)
+
+    function = term.symbol
+    if all(isinstance(t, Constant) for t in term.subterms):
+        point = tuple(term.subterms)
+
+        def value(m, s):  # pylint: disable=unused-argument
+            try:
+                return m.value(function, point)
+            except KeyError:
+                raise err.UndefinedTerm(term) from None
+        return value
+
+    def evaluate_point(m, s):
+        try:
+            return m.value(function, tuple(t(m, s) for t in subterms))
+        except KeyError:
+            raise err.UndefinedTerm(term) from None
+    return evaluate_point
@@ -1,10 +1,11 @@
+import itertools
 import operator
 from typing import List
 
 from .. import funcsym
 from .. import errors as err
-from ..syntax import ops, Connective, Atom, Formula, CompoundFormula, QuantifiedFormula, builtins, Variable, \
-    Constant, CompoundTerm, Tautology, Contradiction, IfThenElse, AggregateCompoundTerm, Term
+from ..syntax import ops, Connective, Atom, CompoundFormula, QuantifiedFormula, Quantifier, builtins, Variable, \
+    Constant, CompoundTerm, Tautology, Contradiction, IfThenElse, AggregateCompoundTerm, Term, symref
 from ..syntax.algebra import Matrix
 from ..model import Model
 
@@ -33,7 +34,7 @@ def evaluate(element, m: Model, sigma=None):
 
     # Terms
     if isinstance(element, Variable):
-        return sigma[element]  # TODO Finish this, ATM it will raise a runtime error
+        return sigma[symref(element)]
 
     if isinstance(element, (Constant, CompoundTerm, IfThenElse, Matrix, AggregateCompoundTerm)):
         return evaluate_term(element, m, sigma)
@@ -57,9 +58,110 @@ def evaluate_atom(atom: Atom, m: Model, sigma):
     return m.holds(atom.predicate, point)
 
 
-def evaluate_quantified(formula: Formula, m: Model, sigma):
-    # pylint: disable=unused-argument
-    raise NotImplementedError()
+def evaluate_quantified(formula: QuantifiedFormula, m: Model, sigma):
+    """ Evaluate the given quantified formula. Instead of enumerating the whole cartesian product of the domains of the
+    quantified variables, candidate bindings are obtained by joining the model extensions of those atoms that need
+    to be true in any binding that satisfies the formula (for existential formulas) or falsifies it (for universal
+    formulas). Only variables that appear in none of these atoms are enumerated over their whole domain. """
+    # forall x. phi is true iff there is no binding of x that makes phi false
+    polarity = formula.quantifier == Quantifier.Exists
+    for _ in _enumerate_bindings(formula.variables, formula.formula, polarity, m, sigma):
+        return polarity
+    return not polarity
+
+
+def _enumerate_bindings(variables, formula, polarity, m: Model, sigma):
+    """ Generate all extensions of sigma with a binding of the given variables under which the given formula evaluates
+    to the given polarity. """
+    quantified = {symref(v): v for v in variables}
+    # Quantified variables shadow any variable with the same name that might be bound in sigma
+    sigma = {k: v for k, v in sigma.items() if k not in quantified}
+
+    atoms = [a for a in _collect_required_atoms(formula, polarity, []) if _is_joinable(a, quantified, sigma)]
+    plan = _create_join_plan(atoms, quantified, m)
+
+    bound = {ref for _, _, free in plan for _, ref, _ in free}
+    unbound = [(ref, v) for ref, v in quantified.items() if ref not in bound]
+    domains = [list(v.sort.domain()) for _, v in unbound]
+
+    for binding in _join(plan, 0, sigma):
+        for values in itertools.product(*domains):
+            full = dict(binding)
+            full.update((ref, value) for (ref, _), value in zip(unbound, values))
+            if evaluate(formula, m, full) == polarity:
+                yield full
+
+
+def _collect_required_atoms(formula, polarity, atoms):
+    """ Collect those (non-builtin) atoms that must necessarily be true for the given formula to evaluate to the given
+    polarity. """
+    if isinstance(formula, Atom):
+        if polarity and not builtins.is_builtin_predicate(formula.predicate) and \
+                all(isinstance(t, (Variable, Constant)) for t in formula.subterms):
+            atoms.append(formula)
+
+    elif isinstance(formula, CompoundFormula):
+        if formula.connective == Connective.Not:
+            _collect_required_atoms(formula.subformulas[0], not polarity, atoms)
+        elif (formula.connective == Connective.And) == polarity:  # i.e. a true conjunction or a false disjunction
+            for sub in formula.subformulas:
+                _collect_required_atoms(sub, polarity, atoms)
+    return atoms
+
+
+def _is_joinable(atom: Atom, quantified, sigma):
+    refs = [symref(t) for t in atom.subterms if isinstance(t, Variable)]
+    return any(r in quantified for r in refs) and all(r in quantified or r in sigma for r in refs)
+
+
+def _create_join_plan(atoms, quantified, m: Model):
+    """ Return a list with one (index, key, free) tuple for each of the given atoms, ordered by increasing extension
+    size. `index` is a hash index of the extension of the atom, keyed by the values of those positions of the atom that
+    are already bound when joining it; `key` tells how to compute such key from the current binding, and `free` lists
+    the (position, variable, sort) of the quantified variables that are bound by the atom. """
+    extensions = sorted(((a, m.get_extension(a.predicate)) for a in atoms), key=lambda x: len(x[1]))
+    plan, bound = [], set()
+    for atom, extension in extensions:
+        key, free, positions = [], [], []
+        for i, t in enumerate(atom.subterms):
+            ref = symref(t)
+            if isinstance(t, Variable) and ref in quantified and ref not in bound:
+                free.append((i, ref, t.sort))
+            else:
+                positions.append(i)
+                key.append((ref, isinstance(t, Variable)))
+        bound.update(ref for _, ref, _ in free)
+
+        index = dict()
+        for point in extension:
+            index.setdefault(tuple(point[i] for i in positions), []).append(point)
+        plan.append((index, key, free))
+    return plan
+
+
+def _join(plan, i, sigma):
+    if i == len(plan):
+        yield sigma
+        return
+
+    index, key, free = plan[i]
+    for point in index.get(tuple(symref(sigma[ref]) if is_variable else ref for ref, is_variable in key), ()):
+        binding = dict(sigma)
+        if _bind(point, free, binding):
+            yield from _join(plan, i + 1, binding)
+
+
+def _bind(point, free, binding):
+    for i, ref, sort in free:
+        value = point[i].expr
+        if ref in binding:  # The variable appears more than once in the atom
+            if point[i] != symref(binding[ref]):
+                return False
+        elif not sort.language.is_subtype(value.sort, sort):
+            return False
+        else:
+            binding[ref] = value
+    return True
 
 
 def evaluate_term(term, m: Model, sigma):
@@ -106,18 +208,20 @@ def evaluate_term(term, m: Model, sigma):
         raise err.UndefinedTerm(term) from None
 
 
-def evaluate_builtin_predicate(atom, model, sigma):
-    bip = builtins.BuiltinPredicateSymbol
-    _evaluators = {
-        bip.EQ: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol == evaluate(f.subterms[1], m, s).symbol,
-        bip.NE: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol != evaluate(f.subterms[1], m, s).symbol,
-        bip.LT: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol < evaluate(f.subterms[1], m, s).symbol,
-        bip.LE: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol <= evaluate(f.subterms[1], m, s).symbol,
-        bip.GT: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol > evaluate(f.subterms[1], m, s).symbol,
-        bip.GE: lambda f, m, s: evaluate(f.subterms[0], m, s).symbol >= evaluate(f.subterms[1], m, s).symbol,
-    }
+_builtin_predicate_operations = {
+    builtins.BuiltinPredicateSymbol.EQ: operator.eq,
+    builtins.BuiltinPredicateSymbol.NE: operator.ne,
+    builtins.BuiltinPredicateSymbol.LT: operator.lt,
+    builtins.BuiltinPredicateSymbol.LE: operator.le,
+    builtins.BuiltinPredicateSymbol.GT: operator.gt,
+    builtins.BuiltinPredicateSymbol.GE: operator.ge,
+}
 
-    return _evaluators[atom.predicate.symbol](atom, model, sigma)
+
+def evaluate_builtin_predicate(atom, model, sigma):
+    operation = _builtin_predicate_operations[atom.predicate.symbol]
+    lhs, rhs = atom.subterms
+    return operation(evaluate(lhs, model, sigma).symbol, evaluate(rhs, model, sigma).symbol)
 
 
 def symbolic_matrix_multiplication(lhs: Matrix, rhs: Matrix):
@@ -133,36 +237,28 @@ def symbolic_matrix_multiplication(lhs: Matrix, rhs: Matrix):
 
 
 def evaluate_builtin_function(term, model, sigma):
-    bif = builtins.BuiltinFunctionSymbol
-    ae1 = _arithmetic_evaluator_1
-    ae2 = _arithmetic_evaluator_2
-    _evaluators = {
-        bif.ADD: lambda f, m, s: ae2(operator.add, f.subterms[0], f.subterms[1], m, s),
-        bif.SUB: lambda f, m, s: ae2(operator.sub, f.subterms[0], f.subterms[1], m, s),
-        bif.MUL: lambda f, m, s: ae2(operator.mul, f.subterms[0], f.subterms[1], m, s),
-        bif.MATMUL: lambda f, m, s: ae2(symbolic_matrix_multiplication, f.subterms[0], f.subterms[1], m, s),
-        bif.DIV: lambda f, m, s: ae2(operator.truediv, f.subterms[0], f.subterms[1], m, s),
-        bif.POW: lambda f, m, s: ae2(operator.pow, f.subterms[0], f.subterms[1], m, s),
-        bif.MOD: lambda f, m, s: ae2(operator.mod, f.subterms[0], f.subterms[1], model, s),
-        bif.MIN: lambda f, m, s: ae2(funcsym.impl(bif.MIN.value), f.subterms[0], f.subterms[1], m, s),
-        bif.MAX: lambda f, m, s: ae2(funcsym.impl(bif.MAX.value), f.subterms[0], f.subterms[1], m, s),
-        bif.ABS: lambda f, m, s: ae1(funcsym.impl(bif.ABS.value), f.subterms[0], m, s),
-        bif.SIN: lambda f, m, s: ae1(funcsym.impl(bif.SIN.value), f.subterms[0], m, s),
-        bif.COS: lambda f, m, s: ae1(funcsym.impl(bif.COS.value), f.subterms[0], m, s),
-        bif.TAN: lambda f, m, s: ae1(funcsym.impl(bif.TAN.value), f.subterms[0], m, s),
-        bif.ATAN: lambda f, m, s: ae1(funcsym.impl(bif.ATAN.value), f.subterms[0], m, s),
-        bif.ASIN: lambda f, m, s: ae1(funcsym.impl(bif.ASIN.value), f.subterms[0], m, s),
-        bif.EXP: lambda f, m, s: ae1(funcsym.impl(bif.EXP.value), f.subterms[0], m, s),
-        bif.LOG: lambda f, m, s: ae1(funcsym.impl(bif.LOG.value), f.subterms[0], m, s),
-        bif.ERF: lambda f, m, s: ae1(funcsym.impl(bif.ERF.value), f.subterms[0], m, s),
-        bif.ERFC: lambda f, m, s: ae1(funcsym.impl(bif.ERFC.value), f.subterms[0], m, s),
-        bif.SGN: lambda f, m, s: ae1(funcsym.impl(bif.SGN.value), f.subterms[0], m, s),
-        bif.SQRT: lambda f, m, s: ae1(funcsym.impl(bif.SQRT.value), f.subterms[0], m, s),
-        bif.NORMAL: lambda f, m, s: ae2(funcsym.impl(bif.NORMAL.value), f.subterms[0], f.subterms[1], m, s),
-        bif.GAMMA: lambda f, m, s: ae2(funcsym.impl(bif.GAMMA.value), f.subterms[0], f.subterms[1], m, s),
-    }
-
-    return _evaluators[term.symbol.symbol](term, model, sigma)
+    operation = builtin_function_implementation(term.symbol.symbol)
+    if len(term.subterms) == 1:
+        return _arithmetic_evaluator_1(operation, term.subterms[0], model, sigma)
+    return _arithmetic_evaluator_2(operation, term.subterms[0], term.subterms[1], model, sigma)
+
+
+def builtin_function_implementation(symbol: builtins.BuiltinFunctionSymbol):
+    """ Return the Python callable that implements the given builtin function symbol. """
+    operation = _arithmetic_operations.get(symbol)
+    # Most builtin functions are implemented by numpy or scipy, which we only want to import on demand
+    return operation if operation is not None else funcsym.impl(symbol.value)
+
+
+_arithmetic_operations = {
+    builtins.BuiltinFunctionSymbol.ADD: operator.add,
+    builtins.BuiltinFunctionSymbol.SUB: operator.sub,
+    builtins.BuiltinFunctionSymbol.MUL: operator.mul,
+    builtins.BuiltinFunctionSymbol.MATMUL: symbolic_matrix_multiplication,
+    builtins.BuiltinFunctionSymbol.DIV: operator.truediv,
+    builtins.BuiltinFunctionSymbol.POW: operator.pow,
+    builtins.BuiltinFunctionSymbol.MOD: operator.mod,
+}
 
 
 def _arithmetic_evaluator_1(operation, expr, model, sigma):
@@ -170,7 +266,10 @@ def _arithmetic_evaluator_1(operation, expr, model, sigma):
     # _rhs = args[1].symbol
     # assert self.domain[0].contains(_lhs)
     # assert self.domain[1].contains(_rhs)
-    expr = evaluate_term(expr, model, sigma)
+    return apply_arithmetic_operation_1(operation, evaluate_term(expr, model, sigma))
+
+
+def apply_arithmetic_operation_1(operation, expr):
     value = operation(ops.cast_to_number(expr))
     sort = ops.infer_numeric_sort(value, expr.language)
     return Constant(value, sort)
@@ -183,6 +282,10 @@ def _arithmetic_evaluator_2(operation, lhs, rhs, model, sigma):
     # assert self.domain[1].contains(_rhs)
     lhs = evaluate_term(lhs, model, sigma)
     rhs = evaluate_term(rhs, model, sigma)
+    return apply_arithmetic_operation_2(operation, lhs, rhs, model, sigma)
+
+
+def apply_arithmetic_operation_2(operation, lhs, rhs, model, sigma):
     if isinstance(lhs, Matrix) and isinstance(rhs, Matrix):
         # print("Matrix op Matrix")
         value = operation(lhs, rhs)
@@ -1,12 +1,13 @@
 
 import copy
 import itertools
+import weakref
 from collections import defaultdict, OrderedDict
 from typing import Union
 
 from . import errors as err
 from .errors import UndefinedElement
-from .syntax import Function, Constant, Variable, Sort, inclusion_closure, Predicate, Interval
+from .syntax import Function, Constant, Variable, Sort, inclusion_closure, Predicate, Interval, CompoundFormula, Term
 from .syntax.algebra import Matrix
 from . import modules
 
@@ -36,6 +37,9 @@ class FirstOrderLanguage:
 
         self.theories = set()
 
+        # The table of unique compound expressions of the language, if hash-consing is enabled
+        self._unique_expressions = None
+
         self._attach_object_sort()
 
     def __deepcopy__(self, memo):
@@ -43,6 +47,16 @@ class FirstOrderLanguage:
         memo[id(self)] = self
         return self
 
+    def __getstate__(self):
+        # The table of unique expressions cannot be pickled, and its expressions would not be unique after unpickling
+        state = self.__dict__.copy()
+        state['_unique_expressions'] = self._unique_expressions is not None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._unique_expressions = weakref.WeakValueDictionary() if state['_unique_expressions'] else None
+
     # NOTE: At the moment it's not clear what kind of FOL language object comparison we want.
     # Ideally we'd want to make sure that the language contains exactly the same vocabulary,
     # including the same objects/constants, the same sorts, etc. But this is too expensive to
@@ -361,6 +375,42 @@ class FirstOrderLanguage:
                f"{len(self._functions)} functions and {len(self.constants())} constants"
     __repr__ = __str__
 
+    def enable_hash_consing(self):
+        """ Enable the hash-consing of the compound terms, atoms and compound formulas of the language that are built
+        with the usual constructors, e.g. `f(a)`, `p(a, b)`, `land(phi, psi)` or `neg(phi)`. Any structurally identical
+        expressions built after this call will be one single object, so that the syntactic equality of two expressions
+        can be checked by identity, and repeated (e.g. ground) expressions don't take additional memory.
+
+        Since they may be shared by any number of other expressions, unique expressions must not be modified in place.
+        Walkers and transformations operating in place modify a copy of them instead (see
+        `tarski.syntax.util.modifiable`), so that their result must always be used instead of the given expression.
+        Expressions are kept in the table of unique expressions only while they are used somewhere else. """
+        if self._unique_expressions is None:
+            self._unique_expressions = weakref.WeakValueDictionary()
+
+    @property
+    def hash_consing(self):
+        return self._unique_expressions is not None
+
+    def get_unique(self, factory, head, components):
+        """ Return the expression `factory(head, components)`, where `factory` is either `CompoundTerm`, `Atom` or
+        `CompoundFormula`. If hash-consing is enabled, return instead the unique object structurally identical to that
+        expression, which is looked up before building (and checking) any new expression, and registered if there is
+        none yet. """
+        table = self._unique_expressions
+        if table is None:
+            return factory(head, components)
+
+        key = _expression_key(factory, head, components)
+        expression = None if key is None else table.get(key)
+        if expression is None:
+            expression = factory(head, components)
+            if key is None:  # Some components were cast into terms by the constructor, e.g. f(2)
+                key = _expression_key(factory, head, expression.subterms)
+            expression = table.setdefault(key, expression)
+            expression._unique = id(expression)  # pylint: disable=protected-access  # See syntax.util.modifiable
+        return expression
+
     def register_operator_handler(self, operator, t1, t2, handler):
         self._operators[(operator, t1, t2)] = handler
 
@@ -427,3 +477,21 @@ class _NamespaceAccessor:
 
     def __getattr__(self, name):
         return self.lang.get(name)
+
+
+def _expression_key(factory, head, components):
+    """ Return the key of the unique expression `factory(head, components)`, or None if some of the components of a
+    compound term or atom is not a term. """
+    # The subexpressions of unique expressions are themselves unique, hence can be identified by their id
+    if factory is CompoundFormula:
+        return (CompoundFormula, head, *map(id, components))
+    if not all(isinstance(t, Term) for t in components):
+        return None
+    return (factory, id(head), *map(_subterm_key, components))
+
+
+def _subterm_key(term):
+    """ Return a key that identifies the given subterm of a unique expression. """
+    if isinstance(term, (Constant, Variable)):  # Constants and variables are not unique objects, e.g. numeric constants
+        return type(term), term.symbol, id(term.sort)
+    return id(term)
@@ -0,0 +1,122 @@
+"""
+ A compact, language-independent encoding of (ground or lifted) formulas, terms, effects and operators into nested
+ tuples of names. Encoded expressions hold no reference to the language they belong to, which makes them much cheaper
+ to pickle than the expressions themselves, e.g. to ship them across processes or to store them on disk. Decoding
+ requires the language of the original expressions.
+"""
+from .. import errors as err
+from ..syntax import Atom, CompoundFormula, QuantifiedFormula, Tautology, Contradiction, Constant, Variable, \
+    CompoundTerm, Interval, top, bot
+from .action import PlainOperator
+from .fstrips import AddEffect, DelEffect, FunctionalEffect, IncreaseEffect, UniversalEffect
+
+# Tags used to identify each type of encoded element
+_TOP, _BOT, _ATOM, _COMPOUND, _QUANTIFIED = 'T', 'F', 'a', 'c', 'q'
+_CONSTANT, _VARIABLE, _TERM = 'k', 'v', 't'
+_ADD, _DEL, _FUNCTIONAL, _INCREASE, _UNIVERSAL = '+', '-', ':=', '+=', '*'
+
+
+def encode_formula(formula):
+    if isinstance(formula, Tautology):
+        return _TOP,
+    if isinstance(formula, Contradiction):
+        return _BOT,
+    if isinstance(formula, Atom):
+        return _ATOM, formula.predicate.name, tuple(encode_term(t) for t in formula.subterms)
+    if isinstance(formula, CompoundFormula):
+        return _COMPOUND, formula.connective, tuple(encode_formula(f) for f in formula.subformulas)
+    if isinstance(formula, QuantifiedFormula):
+        return _QUANTIFIED, formula.quantifier, tuple(encode_term(v) for v in formula.variables), \
+            encode_formula(formula.formula)
+    raise err.UnexpectedElementType(formula)
+
+
+def encode_term(term):
+    if isinstance(term, Constant):
+        return _CONSTANT, term.name, term.sort.name
+    if isinstance(term, Variable):
+        return _VARIABLE, term.symbol, term.sort.name
+    if isinstance(term, CompoundTerm):
+        return _TERM, term.symbol.name, tuple(encode_term(t) for t in term.subterms)
+    raise err.UnexpectedElementType(term)
+
+
+def encode_effect(effect):
+    condition = encode_formula(effect.condition)
+    if isinstance(effect, AddEffect):
+        return _ADD, condition, encode_formula(effect.atom)
+    if isinstance(effect, DelEffect):
+        return _DEL, condition, encode_formula(effect.atom)
+    if isinstance(effect, FunctionalEffect):
+        tag = _INCREASE if isinstance(effect, IncreaseEffect) else _FUNCTIONAL
+        return tag, condition, encode_term(effect.lhs), encode_term(effect.rhs)
+    if isinstance(effect, UniversalEffect):
+        return _UNIVERSAL, condition, tuple(encode_term(v) for v in effect.variables), \
+            tuple(encode_effect(e) for e in effect.effects)
+    raise err.UnexpectedElementType(effect)
+
+
+def encode_operator(operator: PlainOperator):
+    return operator.name, encode_formula(operator.precondition), tuple(encode_effect(e) for e in operator.effects)
+
+
+class Decoder:
+    """ A decoder of expressions encoded with the functions in this module, which must all belong to the given
+    language. Constants are cached, so that decoding many expressions over the same objects is cheap. """
+    def __init__(self, language):
+        self.language = language
+        self.constants = dict()
+
+    def formula(self, code):
+        tag = code[0]
+        if tag == _ATOM:
+            return self.language.get_unique(Atom, self.language.get_predicate(code[1]),
+                                            tuple(self.term(t) for t in code[2]))
+        if tag == _COMPOUND:
+            return self.language.get_unique(CompoundFormula, code[1], [self.formula(f) for f in code[2]])
+        if tag == _TOP:
+            return top
+        if tag == _BOT:
+            return bot
+        if tag == _QUANTIFIED:
+            return QuantifiedFormula(code[1], [self.term(v) for v in code[2]], self.formula(code[3]))
+        raise err.TarskiError(f'Unexpected encoded formula "{code}"')
+
+    def term(self, code):
+        tag = code[0]
+        if tag == _CONSTANT:
+            key = code[1:]
+            constant = self.constants.get(key)
+            if constant is None:
+                constant = self.constants[key] = self._constant(*key)
+            return constant
+        if tag == _TERM:
+            return self.language.get_unique(CompoundTerm, self.language.get_function(code[1]),
+                                            tuple(self.term(t) for t in code[2]))
+        if tag == _VARIABLE:
+            return Variable(code[1], self.language.get_sort(code[2]))
+        raise err.TarskiError(f'Unexpected encoded term "{code}"')
+
+    def _constant(self, name, sortname):
+        sort = self.language.get_sort(sortname)
+        if sort.builtin or isinstance(sort, Interval):
+            return Constant(name, sort)
+        return self.language.get_constant(name)
+
+    def effect(self, code):
+        tag, condition = code[0], self.formula(code[1])
+        if tag == _ADD:
+            return AddEffect(self.formula(code[2]), condition)
+        if tag == _DEL:
+            return DelEffect(self.formula(code[2]), condition)
+        if tag == _FUNCTIONAL:
+            return FunctionalEffect(self.term(code[2]), self.term(code[3]), condition)
+        if tag == _INCREASE:
+            return IncreaseEffect(self.term(code[2]), self.term(code[3]), condition)
+        if tag == _UNIVERSAL:
+            return UniversalEffect([self.term(v) for v in code[2]], [self.effect(e) for e in code[3]], condition)
+        raise err.TarskiError(f'Unexpected encoded effect "{code}"')
+
+    def operator(self, code):
+        name, precondition, effects = code
+        return PlainOperator(self.language, name, self.formula(precondition), [self.effect(e) for e in effects])
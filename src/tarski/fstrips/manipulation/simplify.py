@@ -10,7 +10,7 @@ from ...syntax.terms import Constant, Variable, CompoundTerm
 from ...syntax.formulas import CompoundFormula, QuantifiedFormula, Atom, Tautology, Contradiction, Connective, is_neg, \
     Quantifier, unwrap_conjunction_or_atom, is_eq_atom, land, exists
 from ...syntax.transform.substitutions import substitute_expression
-from ...syntax.util import get_symbols
+from ...syntax.util import get_symbols, modifiable
 from ...syntax.walker import FOLWalker
 from ...syntax.ops import flatten
 from ...syntax import symref
@@ -95,7 +95,7 @@ class Simplify:
         return simple
 
     def simplify_expression(self, node, inplace=True):
-        node = node if inplace else copy.deepcopy(node)
+        node = modifiable(node) if inplace else copy.deepcopy(node)
 
         # Nothing to be simplified about these:
         if isinstance(node, (Variable, Constant)):
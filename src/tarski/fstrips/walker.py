@@ -8,6 +8,7 @@ import copy
 from enum import Enum
 
 from ..errors import TarskiError
+from ..syntax.util import modifiable
 
 
 class WalkerError(TarskiError):
@@ -123,7 +124,7 @@ class ProblemWalker:
     def visit_expression(self, node, inplace=True):
         from ..syntax import CompoundFormula, QuantifiedFormula, Atom, Tautology, Contradiction, Constant, Variable,\
             CompoundTerm, IfThenElse  # pylint: disable=import-outside-toplevel  # Avoiding circular references
-        node = node if inplace else copy.deepcopy(node)
+        node = modifiable(node) if inplace else copy.deepcopy(node)
 
         if isinstance(node, (Variable, Constant, Contradiction, Tautology)):
             pass
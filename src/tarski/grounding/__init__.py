@@ -2,3 +2,5 @@
 from .naive_grounding import ProblemGrounding, create_all_possible_state_variables, \
     NaiveGroundingStrategy
 from .lp_grounding import LPGroundingStrategy
+from .datalog_grounding import DatalogGroundingStrategy
+from .cache import GroundingCache
@@ -0,0 +1,215 @@
+"""
+ An on-disk cache for the results of grounding strategies, i.e. for the reachable state variables and the action
+ groundings of a problem. Cache entries are keyed by a fingerprint of the contents of the (parsed) problem and of the
+ configuration of the grounding strategy, not by the files from which the problem was read.
+
+ Entries are stored in a compact binary format: a header, a table with all the (symbol and object) names involved in
+ the grounding, and a single array of machine integers that refer to those names. Loading an entry takes a single
+ read of the memory-mapped file. Note that the array uses the native byte order of the machine, i.e. cache
+ directories are not meant to be shared across platforms.
+"""
+import itertools
+import mmap
+import os
+import struct
+import tempfile
+from array import array
+
+from ..errors import TarskiError
+from ..syntax import Constant, Predicate
+from ..syntax.sorts import Interval, parent
+from ..util import SymbolIndex
+from ..utils.hashing import consistent_hash
+from .common import StateVariableLite
+
+_MAGIC = b'TGC1'
+_HEADER = struct.Struct('<4sI')  # Magic number and size in bytes of the name table
+_PREDICATE, _FUNCTION = 0, 1
+_NO_ACTIONS = -1
+
+
+class GroundingCache:
+    """ A cache of grounding results stored in the given directory, which is created if it does not exist. """
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def filename(self, problem, options):
+        return os.path.join(self.directory, f'{problem_fingerprint(problem, options):016x}.grounding')
+
+    def ground(self, problem, options, compute):
+        """ Return the pair (state variables, action groundings) of the given problem for the grounding strategy
+        configured with the given list of options. If the pair is not in the cache, it is obtained by calling
+        `compute()` and stored in the cache. Action groundings are returned as a dictionary mapping the name of each
+        action schema to a list of tuples of constants, or None if the strategy doesn't ground actions. """
+        filename = self.filename(problem, options)
+        if os.path.isfile(filename):
+            return load_grounding(filename, problem.language)
+
+        variables, actions = compute()
+        store_grounding(filename, variables, actions)
+        return variables, actions
+
+
+def problem_fingerprint(problem, options=()):
+    """ Return a hash of the contents of the given problem and the given list of (string) options that is stable
+    across Python processes. """
+    return consistent_hash(itertools.chain(options, _describe_domain(problem), _describe_instance(problem)))
+
+
+def domain_fingerprint(problem):
+    """ Return a hash of the contents of the given problem, excluding its initial state and goal, that is stable
+    across Python processes. """
+    return consistent_hash(_describe_domain(problem))
+
+
+def _describe_domain(problem):
+    """ Iterate over strings that describe the language and action schemas of the given problem unambiguously. """
+    lang = problem.language
+    yield '\0sorts'
+    for s in lang.sorts:
+        p = parent(s)
+        yield f'{s.name}<{p.name if p is not None else ""}'
+        if isinstance(s, Interval):
+            yield f'[{s.lower_bound},{s.upper_bound}]'
+    yield '\0constants'
+    yield from (f'{c.name}:{c.sort.name}' for c in lang.constants())
+    yield '\0predicates'
+    yield from (f'{p.name}:{",".join(s.name for s in p.sort)}' for p in lang.predicates)
+    yield '\0functions'
+    yield from (f'{f.name}:{",".join(s.name for s in f.domain)}:{f.codomain.name}' for f in lang.functions)
+    for name, action in problem.actions.items():
+        yield f'\0action\0{name}'
+        yield from (f'{p.symbol}:{p.sort.name}' for p in action.parameters)
+        yield f'\0{action.precondition}\0{action.cost}'
+        yield from (str(e) for e in action.effects)
+    yield from (f'\0derived\0{derived}' for derived in problem.derived_predicates.values())
+
+
+def _describe_instance(problem):
+    """ Iterate over strings that describe the initial state, goal and constraints of the given problem. """
+    yield '\0init'
+    yield from sorted(str(atom) for atom in problem.init.as_atoms())
+    yield f'\0goal\0{problem.goal}'
+    yield from (f'\0constraint\0{c}' for c in problem.constraints)
+
+
+def store_grounding(filename, variables, actions):
+    """ Store the given state variables and action groundings (see `GroundingCache.ground`) into the given file.
+    The file is written atomically, so that concurrent processes never read a partially written cache entry. """
+    names = _NameTable()
+    ints = []
+
+    constants = [c for v in variables for c in v.binding]
+    if actions is not None:
+        constants += [c for groundings in actions.values() for grounding in groundings for c in grounding]
+    for c in constants:
+        names.constant(c)
+    ints.append(len(names.constants))
+    for name, sortname in names.constants:
+        ints += [names.string(name), names.string(sortname)]
+
+    symbols = dict()  # Group the state variables by symbol, preserving their order
+    for variable in variables:
+        symbols.setdefault(variable.symbol, []).append(variable.binding)
+    ints.append(len(symbols))
+    for symbol, bindings in symbols.items():
+        kind = _PREDICATE if isinstance(symbol, Predicate) else _FUNCTION
+        ints += [names.string(symbol.name), kind, symbol.arity, len(bindings)]
+        ints += [names.constant(c) for binding in bindings for c in binding]
+
+    ints.append(_NO_ACTIONS if actions is None else len(actions))
+    for name, groundings in (actions or {}).items():
+        groundings = list(groundings)
+        arity = len(groundings[0]) if groundings else 0
+        ints += [names.string(name), arity, len(groundings)]
+        ints += [names.constant(c) for grounding in groundings for c in grounding]
+
+    table = '\0'.join(names.strings).encode('utf-8')
+    directory = os.path.dirname(os.path.abspath(filename))
+    with tempfile.NamedTemporaryFile(mode='wb', dir=directory, delete=False) as f:
+        f.write(_HEADER.pack(_MAGIC, len(table)))
+        f.write(table + b'\0' * (-len(table) % 4))
+        f.write(array('i', ints).tobytes())
+    os.replace(f.name, filename)
+
+
+def load_grounding(filename, language):
+    """ Load the state variables and action groundings stored in the given file by `store_grounding`, resolving all
+    symbol and object names in the given language. """
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        magic, size = _HEADER.unpack_from(buffer)
+        if magic != _MAGIC:
+            raise TarskiError(f'File "{filename}" is not a valid grounding cache file')
+        start, end = _HEADER.size, _HEADER.size + size
+        with memoryview(buffer) as view:
+            strings = bytes(view[start:end]).decode('utf-8').split('\0')
+            with view[end + (-size % 4):].cast('i') as integers:
+                ints = integers.tolist()
+
+    cursor = 0
+
+    def read(n):
+        nonlocal cursor
+        cursor += n
+        return ints[cursor - n:cursor]
+
+    def read_tuples(arity, count):
+        if arity == 0:
+            return [()] * count
+        args = [constants[a] for a in read(arity * count)]
+        return [tuple(args[i:i + arity]) for i in range(0, arity * count, arity)]
+
+    nconstants, = read(1)
+    pairs = read(2 * nconstants)
+    constants = [_resolve_constant(language, strings[pairs[i]], strings[pairs[i + 1]])
+                 for i in range(0, len(pairs), 2)]
+
+    variables = SymbolIndex()
+    nsymbols, = read(1)
+    for _ in range(nsymbols):
+        name, kind, arity, count = read(4)
+        get_symbol = language.get_predicate if kind == _PREDICATE else language.get_function
+        symbol = get_symbol(strings[name])
+        for binding in read_tuples(arity, count):
+            variables.add(StateVariableLite(symbol, binding))
+
+    nactions, = read(1)
+    if nactions == _NO_ACTIONS:
+        return variables, None
+    actions = dict()
+    for _ in range(nactions):
+        name, arity, count = read(3)
+        actions[strings[name]] = read_tuples(arity, count)
+    return variables, actions
+
+
+class _NameTable:
+    """ The table of strings and (name, sort name) constant pairs of a cache entry, with their indexes. """
+    def __init__(self):
+        self.strings = []
+        self.string_indexes = dict()
+        self.constants = []
+        self.constant_indexes = dict()
+
+    def string(self, s):
+        index = self.string_indexes.get(s)
+        if index is None:
+            index = self.string_indexes[s] = len(self.strings)
+            self.strings.append(s)
+        return index
+
+    def constant(self, c):
+        key = str(c.name), c.sort.name
+        index = self.constant_indexes.get(key)
+        if index is None:
+            index = self.constant_indexes[key] = len(self.constants)
+            self.constants.append(key)
+        return index
+
+
+def _resolve_constant(language, name, sortname):
+    sort = language.get_sort(sortname)
+    if isinstance(sort, Interval):
+        return Constant(name, sort)
+    return language.get_constant(name)
@@ -1,5 +1,9 @@
+import struct
+import weakref
+
 from ..errors import TarskiError
-from ..syntax import Predicate, Function, Constant, termlists_are_equal, termlist_hash
+from ..syntax import Predicate, Function, Constant, Interval, termlists_are_equal, termlist_hash
+from ..util import CompactIndex
 
 
 class StateVariableLite:
@@ -12,19 +16,36 @@ class StateVariableLite:
     Note that we could use the CompoundTerm or Atom classes to represent the same concept represented by a
     StateVariableLite, but currently we prefer to use a single class, hence the existence of StateVariableLite.
     Note: This is a lightweight version of the StateVariable class above, hoping that it can eventually replace it.
+
+    State variables are interned: creating a state variable with the same symbol and binding as a state variable that
+    is still alive returns that same object, so that all components of the grounding and search share a single
+    instance of each state variable, whose hash is computed only once, and dictionary lookups succeed by identity.
     """
+    __slots__ = ('symbol', 'binding', '_hash', '__weakref__')
+    _interned = weakref.WeakValueDictionary()
 
-    def __init__(self, symbol, binding):
+    def __new__(cls, symbol, binding):
         if not isinstance(symbol, (Predicate, Function)) or not all(isinstance(c, Constant) for c in binding):
             raise TarskiError(f"Cannot build state variable from {symbol} and {binding}")
-        self.symbol = symbol
-        self.binding = binding
+        # The interned object keeps both the symbol and the constants alive, so their ids are not reused while it lives
+        key = (id(symbol), *((c.name, id(c.sort)) for c in binding))
+        variable = cls._interned.get(key)
+        if variable is None:
+            variable = super().__new__(cls)
+            variable.symbol = symbol
+            variable.binding = tuple(binding)
+            variable._hash = hash((symbol, termlist_hash(binding)))
+            cls._interned[key] = variable
+        return variable
+
+    def __reduce__(self):
+        return StateVariableLite, (self.symbol, self.binding)
 
     def __hash__(self):
-        return hash((self.symbol, termlist_hash(self.binding)))
+        return self._hash
 
     def __eq__(self, other):
-        return self.symbol == other.symbol and termlists_are_equal(self.binding, other.binding)
+        return self is other or (self.symbol == other.symbol and termlists_are_equal(self.binding, other.binding))
 
     def __str__(self):
         return '{}({})'.format(self.symbol.symbol, ','.join(map(str, self.binding)))
@@ -37,3 +58,111 @@ class StateVariableLite:
 
     def to_atom(self):
         return self.symbol(*self.binding)
+
+
+_CHUNK_MASK = (1 << 21) - 1  # Values are split into chunks of (at most) 22 bits, to fit into non-negative 32-bit ints
+
+
+class StateVariableIndex:
+    """ A compact index of state variables with the same interface as a `SymbolIndex` of `StateVariableLite`
+    objects, in which each state variable is stored as the tuple formed by the id of its symbol and the ids of the
+    constants in its binding, in a `CompactIndex`. StateVariableLite objects are only created when accessed.
+
+    Ids are given by the order in which symbols, constants and sorts were declared in the language, so the language
+    should not be extended while the index is in use. Constants of built-in (interval) sorts, e.g. numbers, are not
+    declared in the language, and are stored by value instead, as an id that tells the sort and the type (integer or
+    float) of the value, followed by the 64 bits of the value split into three integers. The (picklable) index of
+    integer tuples is available as `keys`, and can be attached to the same language later on with
+    `StateVariableIndex(language, keys)`.
+    """
+    def __init__(self, language, keys=None, elements=None):
+        self.language = language
+        self.symbols = language.predicates + language.functions
+        self.symbol_ids = {symbol.name: i for i, symbol in enumerate(self.symbols)}
+        self.constants = language.constants()
+        self.constant_ids = {c.name: i for i, c in enumerate(self.constants)}
+        self.intervals = [s for s in language.sorts if isinstance(s, Interval)]
+        self.interval_ids = {s.name: i for i, s in enumerate(self.intervals)}
+        self.keys = keys if keys is not None else CompactIndex()
+        self.update(elements or [])
+
+    def encode(self, variable):
+        """ Return the tuple of integers that represents the given state variable. """
+        try:
+            key = [self.symbol_ids[variable.symbol.name]]
+            for c in variable.binding:
+                if isinstance(c.sort, Interval):
+                    key += self._encode_value(c)
+                else:
+                    key.append(self.constant_ids[c.name])
+        except KeyError:
+            raise TarskiError(f'Cannot index state variable "{variable}", whose symbol or constants are not declared '
+                              f'in language "{self.language}"') from None
+        return tuple(key)
+
+    def _encode_value(self, constant):
+        value = constant.symbol
+        is_float = isinstance(value, float)
+        try:
+            bits = int.from_bytes(struct.pack('<d' if is_float else '<q', value), 'little')
+        except struct.error:
+            raise TarskiError(f'Cannot index value "{value}" of sort "{constant.sort.name}" in 64 bits') from None
+        tag = len(self.constants) + 2 * self.interval_ids[constant.sort.name] + is_float
+        return tag, bits >> 42, (bits >> 21) & _CHUNK_MASK, bits & _CHUNK_MASK
+
+    def decode(self, key):
+        """ Return the state variable represented by the given tuple of integers. """
+        binding, ids, nconstants = [], iter(key[1:]), len(self.constants)
+        for i in ids:
+            if i < nconstants:
+                binding.append(self.constants[i])
+                continue
+            sort, is_float = divmod(i - nconstants, 2)
+            bits = (next(ids) << 42) | (next(ids) << 21) | next(ids)
+            value, = struct.unpack('<d' if is_float else '<q', bits.to_bytes(8, 'little'))
+            binding.append(self.language.constant(value, self.intervals[sort]))
+        return StateVariableLite(self.symbols[key[0]], tuple(binding))
+
+    def get_index(self, key):
+        return self.keys.get_index(self.encode(key))
+
+    def get_object(self, index):
+        return self.decode(self.keys.get_object(index))
+
+    def add(self, obj):
+        self.keys.add(self.encode(obj))
+
+    def get_or_add(self, obj):
+        return self.keys.get_or_add(self.encode(obj))
+
+    def update(self, elements):
+        for element in elements:
+            self.keys.get_or_add(self.encode(element))
+
+    def dump(self):
+        return [str(o) for o in self]
+
+    def save(self, filename):
+        self.keys.save(filename)
+
+    @staticmethod
+    def load(filename, language):
+        return StateVariableIndex(language, CompactIndex.load(filename))
+
+    def __str__(self):
+        return ','.join('{}: {}'.format(idx, o) for idx, o in self.enumerate())
+
+    __repr__ = __str__
+
+    def __iter__(self):
+        return (self.decode(key) for key in self.keys)
+
+    def enumerate(self):
+        """ Iterate over all (ordered) pairs of the form idx, o, where idx is the index of state variable 'o' """
+        return enumerate(self)
+
+    def __contains__(self, k):
+        return self.encode(k) in self.keys
+
+    def __len__(self):
+        return len(self.keys)
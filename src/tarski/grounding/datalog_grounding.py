@@ -0,0 +1,82 @@
+"""
+ A grounding strategy that performs the same relaxed reachability analysis as the LP-based strategy, but evaluates
+ the reachability program natively in Python, without the need of any ASP solver.
+"""
+from collections import defaultdict
+
+from ..reachability.asp import create_reachability_lp_compiler
+from ..reachability.datalog import DatalogProgram, DatalogEvaluator, iterate_datalog_model
+from .lp_grounding import LPGroundingStrategy
+
+
+class DatalogGroundingStrategy(LPGroundingStrategy):
+    """ A grounding strategy with the same interface and results as `LPGroundingStrategy`, in which the relaxed
+    reachability logic program is solved with the semi-naive Datalog evaluator of `tarski.reachability.datalog`
+    instead of with Gringo. This avoids both the dependency on the external solver and the cost of writing the
+    program to disk and parsing back its solution.
+
+    The fixpoint of the domain rules and the initial state facts is computed separately from the goal rules, and
+    strategies created with `reground` for problems whose initial state is a superset of the initial state of the
+    original problem resume the computation of the fixpoint from the one already computed.
+    """
+    def __init__(self, problem, ground_actions=True, include_variable_inequalities=False, cache=None,
+                 split_rules=False):
+        super().__init__(problem, ground_actions, include_variable_inequalities, cache=cache, split_rules=split_rules)
+        self.evaluator = None  # The evaluator with the fixpoint of the domain rules and the facts in `init_facts`
+        self.init_facts = None
+
+    def reground(self, problem):
+        strategy = super().reground(problem)
+        strategy.evaluator, strategy.init_facts = self.evaluator, self.init_facts
+        return strategy
+
+    @staticmethod
+    def _create_program():
+        return DatalogProgram()
+
+    def _create_lp(self):
+        # We keep apart the facts of the initial state and the goal rules, as the domain rules are already compiled
+        compiler = create_reachability_lp_compiler(self.problem, DatalogProgram(), self.do_ground_actions,
+                                                   self.include_variable_inequalities, self.split_rules)
+        compiler.load_domain(self._compile_domain())
+        init = compiler.lp = DatalogProgram()
+        compiler.create_init()
+        goal = compiler.lp = DatalogProgram()
+        compiler.create_goal()
+        return (init, goal), compiler.tr
+
+    def _solve(self, lp, tr):
+        model = defaultdict(set)
+        for symbol, arguments in self._iterate_solution(lp, tr):
+            model[symbol].add(arguments)
+        return model
+
+    def _iterate_solution(self, lp, tr):
+        init, goal = lp
+        # The goal rules are evaluated on top of the fixpoint of the domain and initial state, which they don't modify
+        evaluator = DatalogEvaluator(goal, base=self._evaluate_init(init))
+        return iterate_datalog_model(evaluator.evaluate(), tr)
+
+    def _evaluate_init(self, init):
+        """ Return an evaluator with the fixpoint of the domain rules and the given initial state facts. """
+        facts = frozenset(str(head) for head, _ in init.rules)
+        if self.evaluator is not None and self.init_facts == facts:
+            return self.evaluator
+
+        if self.evaluator is not None and self.init_facts <= facts:
+            # Monotonicity ensures that the previous fixpoint is contained in the new one
+            evaluator = self.evaluator.copy()
+            evaluator.add_rules(rule for rule in init.rules if str(rule[0]) not in self.init_facts)
+        else:
+            evaluator = DatalogEvaluator()
+            evaluator.add_rules(self._compile_domain().rules)
+            evaluator.add_rules(init.rules)
+
+        evaluator.evaluate()
+        self.evaluator, self.init_facts = evaluator, facts
+        return evaluator
+
+    def __str__(self):
+        return 'DatalogGroundingStrategy["{}"]'.format(self.problem.name)
+
+    __repr__ = __str__
@@ -1,13 +1,15 @@
 """
  Classes and methods related to the Logic-Program based grounding  strategy of planning problems.
 """
-from ..utils.command import silentremove
+from ..errors import TarskiError
 from ..grounding.ops import approximate_symbol_fluency
-from ..reachability import create_reachability_lp, run_clingo, parse_model
-from ..reachability.asp import GOAL
+from ..reachability import create_reachability_lp, solve_lp, iterate_lp_solution
+from ..reachability.asp import GOAL, LogicProgram, compile_reachability_domain
+from .cache import domain_fingerprint
 from .errors import ReachabilityLPUnsolvable
 from ..util import SymbolIndex
 from .common import StateVariableLite
+from .parallel import ground_operators_in_parallel
 
 
 class LPGroundingStrategy:
@@ -17,19 +19,46 @@ class LPGroundingStrategy:
     the parameter groundings of all reachable ground actions; if false, it will not, which should result in a smaller
     and cheaper logic program.
     """
-    def __init__(self, problem, ground_actions=True, include_variable_inequalities=False):
+    def __init__(self, problem, ground_actions=True, include_variable_inequalities=False, cache=None,
+                 split_rules=False):
+        """ If a `GroundingCache` is given, the reachable state variables and ground actions are looked up in (or else
+        stored into) the cache, and the LP is not even generated if they are found there. If `split_rules` is true,
+        the rules of the LP are split into smaller rules, which reduces the cost of grounding the LP (see
+        `ReachabilityLPCompiler`). """
         self.problem = problem
         self.do_ground_actions = ground_actions
         self.include_variable_inequalities = include_variable_inequalities
+        self.split_rules = split_rules
         self.model = None  # We'll cache the solution of the LP here
+        self.cache = cache
+        self.cached = None  # We'll store here the (state variables, action groundings) pair read from the cache
+        self.domain = None  # We'll store here the compiled domain rules of the LP, which `reground` shares
         self.fluent_symbols, self.static_symbols = approximate_symbol_fluency(problem)
 
+    def reground(self, problem):
+        """ Return a grounding strategy with the same configuration as this one for the given problem, which must have
+        the same objects and action schemas as the problem of this strategy, differing at most in its initial state
+        and goal. The new strategy reuses the rules of the reachability LP that depend only on the domain and
+        objects, so that only the initial state facts and the goal rules need to be compiled for the new problem. """
+        if domain_fingerprint(problem) != domain_fingerprint(self.problem):
+            raise TarskiError(f'Cannot reground problem "{problem.name}" with the LP of problem "{self.problem.name}", '
+                              f'as they have different domains or objects')
+        strategy = type(self)(problem, self.do_ground_actions, self.include_variable_inequalities, cache=self.cache,
+                              split_rules=self.split_rules)
+        strategy.domain = self._compile_domain()
+        return strategy
+
     def ground_state_variables(self):
         """ Create and index all state variables of the problem by exhaustively grounding all predicate and function
         symbols that are considered to be fluent with respect to the problem constants. Thus, if the problem has one
         fluent predicate "p" and one static predicate "q", and constants "a", "b", "c", the result of this operation
         will be the state variables "p(a)", "p(b)" and "p(c)".
         """
+        if self.cache is not None:
+            return self._load_cached_grounding()[0]
+        return self._ground_state_variables()
+
+    def _ground_state_variables(self):
         model = self._solve_lp()
 
         variables = SymbolIndex()
@@ -49,6 +78,12 @@ class LPGroundingStrategy:
         if not self.do_ground_actions:
             raise RuntimeError('Cannot retrieve set of ground actions from LPGroundingStrategy '
                                'configured with ground_actions=False')
+        if self.cache is not None:
+            return {k: {tuple(c.name for c in grounding) for grounding in groundings}
+                    for k, groundings in self._load_cached_grounding()[1].items()}
+        return self._ground_actions()
+
+    def _ground_actions(self):
         model = self._solve_lp()
         # This will take care of the case where there is not ground action from some schema
         groundings = dict()
@@ -57,6 +92,36 @@ class LPGroundingStrategy:
             groundings[k] = model[key] if key in model else set()
         return groundings
 
+    def iterate_action_groundings(self):
+        """ Iterate over all (schema name, parameter grounding) pairs of reachable ground actions, as they are read
+        from the solution of the LP. Unless the LP has already been solved, its solution is not stored, which
+        avoids keeping in memory the whole set of reachable ground actions for large problems. """
+        if not self.do_ground_actions:
+            raise RuntimeError('Cannot retrieve set of ground actions from LPGroundingStrategy '
+                               'configured with ground_actions=False')
+        if self.cache is not None:
+            for k, groundings in self.ground_actions().items():
+                yield from ((k, binding) for binding in groundings)
+            return
+
+        if self.model is not None:
+            for k in self.problem.actions.keys():
+                yield from ((k, binding) for binding in self.model.get("action_" + k, ()))
+            return
+
+        lp, tr = self._create_lp()
+        schemas = {"action_" + k: k for k in self.problem.actions.keys()}
+        goal_reached = False
+        for symbol, arguments in self._iterate_solution(lp, tr):
+            schema = schemas.get(symbol)
+            if schema is not None:
+                yield schema, arguments
+            elif symbol == GOAL:
+                goal_reached = True
+
+        if not goal_reached:
+            raise ReachabilityLPUnsolvable()
+
     def iterate_over_schema_groundings(self, schema_name: str):
         """  Iterate over all reachable parameter groundings of the given action schema. """
         model = self._solve_lp()
@@ -64,18 +129,52 @@ class LPGroundingStrategy:
 
     def _solve_lp(self):
         if self.model is None:
-            lp, tr = create_reachability_lp(self.problem, self.do_ground_actions, self.include_variable_inequalities)
-            model_filename, theory_filename = run_clingo(lp)
-            self.model = parse_model(model_filename, tr)
-
-            # Remove the input and output files for Gringo
-            silentremove(model_filename)
-            silentremove(theory_filename)
-
+            lp, tr = self._create_lp()
+            self.model = self._solve(lp, tr)
             if len(self.model[GOAL]) != 1:
                 raise ReachabilityLPUnsolvable()
         return self.model
 
+    def _load_cached_grounding(self):
+        if self.cached is None:
+            options = [type(self).__name__, f'ground_actions={self.do_ground_actions}',
+                       f'include_variable_inequalities={self.include_variable_inequalities}']
+            self.cached = self.cache.ground(self.problem, options, self._compute_cacheable_grounding)
+        return self.cached
+
+    def _compute_cacheable_grounding(self):
+        variables, actions = self._ground_state_variables(), None
+        if self.do_ground_actions:
+            lang = self.problem.language
+            actions = {k: [tuple(lang.get_constant(c) for c in grounding) for grounding in groundings]
+                       for k, groundings in self._ground_actions().items()}
+        return variables, actions
+
+    def _compile_domain(self):
+        if self.domain is None:
+            self.domain = compile_reachability_domain(self.problem, self.do_ground_actions,
+                                                      self.include_variable_inequalities, self.split_rules,
+                                                      lp=self._create_program())
+        return self.domain
+
+    def _create_lp(self):
+        """ Return the reachability logic program of the problem, along with its symbol translation dictionary. """
+        return create_reachability_lp(self.problem, self.do_ground_actions, self.include_variable_inequalities,
+                                      split_rules=self.split_rules, lp=self._create_program(),
+                                      domain=self._compile_domain())
+
+    @staticmethod
+    def _create_program():
+        return LogicProgram()
+
+    def _solve(self, lp, tr):
+        """ Return the model of the given logic program, as a map from symbols to sets of argument tuples. """
+        return solve_lp(lp, tr)
+
+    def _iterate_solution(self, lp, tr):
+        """ Iterate over the (symbol, arguments) pairs of the atoms in the model of the given logic program. """
+        return iterate_lp_solution(lp, tr)
+
     def __str__(self):
         return 'LPGroundingStrategy["{}"]'.format(self.problem.name)
 
@@ -87,12 +186,21 @@ def compute_action_groundings(problem, include_variable_inequalities=False):
     return grounding.ground_actions()
 
 
-def ground_problem_schemas_into_plain_operators(problem, include_variable_inequalities=False):
-    from ..syntax.transform.action_grounding import ground_schema_into_plain_operator_from_grounding
-    action_groundings = compute_action_groundings(problem, include_variable_inequalities)
-    operators = []
-    for action_name, groundings in action_groundings.items():
-        action = problem.get_action(action_name)
-        for grounding in groundings:
-            operators.append(ground_schema_into_plain_operator_from_grounding(action, grounding))
-    return operators
+def ground_problem_schemas_into_plain_operators(problem, include_variable_inequalities=False, nprocs=1):
+    """ Return a list with all reachable ground operators of the given problem. If `nprocs` is larger than one, the
+    action schemas are instantiated in parallel by that number of worker processes. In both cases, operators of
+    different schemas appear in the order in which the schemas are declared in the problem. """
+    from ..syntax.transform.action_grounding import ActionSchemaTemplate
+    grounding = LPGroundingStrategy(problem, True, include_variable_inequalities)
+    if nprocs > 1:
+        return ground_operators_in_parallel(problem, grounding.iterate_action_groundings(), nprocs)
+
+    # Operators are created as the ground actions are read, so we never keep the whole LP solution in memory
+    templates = dict()
+    operators = {name: [] for name in problem.actions.keys()}
+    for action_name, binding in grounding.iterate_action_groundings():
+        template = templates.get(action_name)
+        if template is None:
+            template = templates[action_name] = ActionSchemaTemplate(problem.get_action(action_name))
+        operators[action_name].append(template.instantiate(binding))
+    return [op for schema_operators in operators.values() for op in schema_operators]
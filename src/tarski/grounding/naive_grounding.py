@@ -4,8 +4,9 @@
 import itertools
 
 from ..grounding.ops import approximate_symbol_fluency
-from ..syntax import Constant, Variable, CompoundTerm, Atom, create_substitution, termlists_are_equal, termlist_hash
-from ..errors import DuplicateDefinition
+from ..syntax import Constant, Variable, CompoundTerm, Atom, CompoundFormula, Connective, BuiltinPredicateSymbol, \
+    create_substitution, termlists_are_equal, termlist_hash, symref
+from ..syntax.ops import flatten
 from .errors import UnableToGroundError
 from .common import StateVariableLite
 from ..syntax.transform.substitutions import substitute_expression
@@ -70,11 +71,7 @@ def create_all_possible_state_variables(fluent_terms):
                 instantiations.append(list(st.sort.domain()))
             else:
                 raise UnableToGroundError(st, "Grounding of complex nested subterms is not implemented yet!")
-        for instantiation in itertools.product(*instantiations):
-            try:
-                variables.add(StateVariable(ref.expr, instantiation))
-            except DuplicateDefinition:
-                pass
+        variables.update(StateVariable(ref.expr, instantiation) for instantiation in itertools.product(*instantiations))
     return variables
 
 
@@ -82,18 +79,21 @@ class StateVariable:
     """ A state variable is nothing else than a CompoundTerm or Atom which is expected to change its
     value, along with a particular instantiation of its subterms.
     """
+    __slots__ = ('term', 'head', 'instantiation', '_hash')
 
     def __init__(self, term, instantiation):
         assert isinstance(term, (CompoundTerm, Atom))
         self.term = term
         self.head = term.predicate if isinstance(term, Atom) else term.symbol
         self.instantiation = instantiation
+        self._hash = hash((self.head.symbol, termlist_hash(self.instantiation)))
 
     def __hash__(self):
-        return hash((self.head.symbol, termlist_hash(self.instantiation)))
+        return self._hash
 
     def __eq__(self, other):
-        return self.head.symbol == other.head.symbol and termlists_are_equal(self.instantiation, other.instantiation)
+        return self is other or (self.head.symbol == other.head.symbol and
+                                 termlists_are_equal(self.instantiation, other.instantiation))
 
     def __str__(self):
         return '{}({})'.format(self.head.symbol, ','.join(str(a) for a in self.instantiation))
@@ -112,8 +112,16 @@ class NaiveGroundingStrategy:
     TODO / Note: This is a lightweight version of the ProblemGrounding class above, hoping that it can eventually
                  replace it.
     """
-    def __init__(self, problem, ignore_symbols=None):
+    def __init__(self, problem, ignore_symbols=None, prune_with_statics=False, cache=None):
+        """ If `prune_with_statics` is true, action groundings are obtained by a backtracking search that discards
+        partial groundings as soon as they violate some static atom or (in)equality of the action precondition,
+        instead of by the exhaustive enumeration of the cartesian product of the parameter domains.
+        If a `GroundingCache` is given, state variables and action groundings are looked up in (or else stored into)
+        the cache. """
         self.problem = problem
+        self.prune_with_statics = prune_with_statics
+        self.cache = cache
+        self.cached = None  # We'll store here the (state variables, action groundings) pair read from the cache
         self.fluent_symbols, self.static_symbols = approximate_symbol_fluency(problem)
         if ignore_symbols:  # Remove undesired symbols if necessary
             self.fluent_symbols = {s for s in self.fluent_symbols if s.name not in ignore_symbols}
@@ -125,17 +133,39 @@ class NaiveGroundingStrategy:
         fluent predicate "p" and one static predicate "q", and constants "a", "b", "c", the result of this operation
         will be the state variables "p(a)", "p(b)" and "p(c)".
         """
+        if self.cache is not None:
+            return self._load_cached_grounding()[0]
         return ground_symbols_exhaustively(self.fluent_symbols)
 
     def ground_actions(self):
         """  Return a dictionary mapping each action schema of the problem to the set of parameter groundings that
         make that schema a possible ground action. """
+        if self.cache is not None:
+            return self._load_cached_grounding()[1]
+        return self._ground_actions()
+
+    def _ground_actions(self):
         groundings = dict()
         for aname, action in self.problem.actions.items():
-            domains = [p.sort.domain() for p in action.parameters]
-            groundings[aname] = list(itertools.product(*domains))
+            if self.prune_with_statics:
+                groundings[aname] = ground_action_with_static_constraints(action, self.problem.init,
+                                                                          self.static_symbols)
+            else:
+                domains = [p.sort.domain() for p in action.parameters]
+                groundings[aname] = list(itertools.product(*domains))
         return groundings
 
+    def _load_cached_grounding(self):
+        if self.cached is None:
+            options = [type(self).__name__, f'prune_with_statics={self.prune_with_statics}',
+                       f'fluent={sorted(s.name for s in self.fluent_symbols)}',
+                       f'static={sorted(s.name for s in self.static_symbols)}']
+            self.cached = self.cache.ground(self.problem, options, self._compute_cacheable_grounding)
+        return self.cached
+
+    def _compute_cacheable_grounding(self):
+        return ground_symbols_exhaustively(self.fluent_symbols), self._ground_actions()
+
     def __str__(self):
         return 'NaiveGroundingStrategy["{}"]'.format(self.problem.name)
 
@@ -151,7 +181,93 @@ def ground_symbols_exhaustively(symbols):
         # We need to consider full sort for predicates, domain only for functions
         domains = [s.domain() for s in symbol.domain]
 
-        for binding in itertools.product(*domains):
-            variables.add(StateVariableLite(symbol, binding))
+        variables.update(StateVariableLite(symbol, binding) for binding in itertools.product(*domains))
 
     return variables
+
+
+def ground_action_with_static_constraints(action, init, static_symbols):
+    """ Return a list with all groundings of the parameters of the given action schema (as tuples of constants, in
+    parameter order) that satisfy the static part of the action precondition on the given initial model.
+
+    The static part of the precondition consists of those literals of the (top-level conjunctive) precondition that
+    are either (in)equalities or atoms over static symbols, and whose arguments are parameters or constants. The
+    groundings are computed by a backtracking search that binds parameters by increasing domain size and checks each
+    static literal as soon as all of its parameters are bound.
+    """
+    parameters = action.parameters
+    positions = {symref(p): i for i, p in enumerate(parameters)}
+    domains = [list(p.sort.domain()) for p in parameters]
+    order = sorted(range(len(parameters)), key=lambda i: len(domains[i]))
+    depths = {position: depth for depth, position in enumerate(order)}
+
+    checks = [[] for _ in parameters]  # The constraints that can be checked after binding the parameter at each depth
+    for literal in _conjunctive_literals(action.precondition):
+        constraint = _compile_static_constraint(literal, positions, init, static_symbols)
+        if constraint is None:
+            continue
+        variables, check = constraint
+        if not variables:
+            if not check(None):
+                return []  # The precondition can never be satisfied
+            continue
+        checks[max(depths[i] for i in variables)].append(check)
+
+    groundings = []
+    values = [None] * len(parameters)
+
+    def bind(depth):
+        if depth == len(order):
+            groundings.append(tuple(values))
+            return
+        position = order[depth]
+        for value in domains[position]:
+            values[position] = value
+            if all(check(values) for check in checks[depth]):
+                bind(depth + 1)
+
+    bind(0)
+    return groundings
+
+
+def _conjunctive_literals(precondition):
+    formula = flatten(precondition)
+    if isinstance(formula, CompoundFormula) and formula.connective == Connective.And:
+        return formula.subformulas
+    return [formula]
+
+
+def _compile_static_constraint(literal, positions, init, static_symbols):
+    """ Return a pair (variables, check) for the given literal, where `variables` is the set of parameter positions
+    mentioned in the literal and `check` is a function that checks whether the literal is satisfied by a given
+    list of parameter values, or None if the literal is not a static literal. """
+    polarity = True
+    if isinstance(literal, CompoundFormula) and literal.connective == Connective.Not:
+        literal, polarity = literal.subformulas[0], False
+
+    if not isinstance(literal, Atom):
+        return None
+
+    arguments = []  # For each argument of the atom, either its parameter position, or the constant name
+    for term in literal.subterms:
+        if isinstance(term, Constant):
+            arguments.append((None, term.name))
+        elif isinstance(term, Variable) and symref(term) in positions:
+            arguments.append((positions[symref(term)], None))
+        else:
+            return None
+
+    def names(values):
+        return tuple(name if position is None else values[position].name for position, name in arguments)
+    variables = {position for position, _ in arguments if position is not None}
+
+    symbol = literal.predicate.symbol
+    if symbol in (BuiltinPredicateSymbol.EQ, BuiltinPredicateSymbol.NE):
+        expected = polarity == (symbol == BuiltinPredicateSymbol.EQ)
+        return variables, lambda values: (len(set(names(values))) == 1) == expected
+
+    if literal.predicate.builtin or literal.predicate not in static_symbols:
+        return None
+
+    extension = {tuple(ref.expr.name for ref in point) for point in init.get_extension(literal.predicate)}
+    return variables, lambda values: (names(values) in extension) == polarity
@@ -0,0 +1,61 @@
+"""
+ Parallel instantiation of action schemas into ground operators.
+"""
+import multiprocessing
+
+from ..fstrips.encoding import Decoder, encode_operator
+from ..syntax import Constant
+
+# The problem being grounded by the current worker process, set by the initializer of the pool. Since workers are
+# forked, they inherit the problem instead of receiving a pickled copy of it.
+_problem = None
+
+
+def ground_operators_in_parallel(problem, action_groundings, nprocs, chunksize=1000):
+    """ Instantiate the given (schema name, grounding) pairs into PlainOperators using a pool of `nprocs` worker
+    processes. Each task sent to the pool contains groundings of a single schema, and operators are shipped back in a
+    compact encoding. The returned list of operators has a deterministic order: operators of different schemas appear
+    in the order in which the schemas are declared in the problem, and operators of the same schema in the order in
+    which their groundings were given.
+
+    Worker processes are created with the "fork" start method; on platforms where it is not available, the grounding
+    is performed serially in the current process.
+    """
+    chunks = _create_chunks(problem, action_groundings, chunksize)
+    if nprocs <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return [op for chunk in chunks for op in _ground_chunk(problem, chunk)]
+
+    decoder = Decoder(problem.language)
+    operators = []
+    with multiprocessing.get_context('fork').Pool(nprocs, initializer=_set_problem, initargs=(problem, )) as pool:
+        # imap returns results in the order of the tasks, regardless of the order in which they get completed
+        for encoded in pool.imap(_ground_encoded_chunk, chunks):
+            operators += [decoder.operator(code) for code in encoded]
+    return operators
+
+
+def _set_problem(problem):
+    global _problem  # pylint: disable=global-statement
+    _problem = problem
+
+
+def _create_chunks(problem, action_groundings, chunksize):
+    """ Group the given (schema name, grounding) pairs into (schema name, list of groundings) chunks of at most
+    `chunksize` groundings each. Groundings are stored as tuples of object names, which are cheap to pickle. """
+    groundings = {name: [] for name in problem.actions.keys()}
+    for name, grounding in action_groundings:
+        groundings[name].append(tuple(c.name if isinstance(c, Constant) else c for c in grounding))
+
+    return [(name, bindings[i:i + chunksize])
+            for name, bindings in groundings.items() for i in range(0, len(bindings), chunksize)]
+
+
+def _ground_chunk(problem, chunk):
+    from ..syntax.transform.action_grounding import ActionSchemaTemplate  # pylint: disable=import-outside-toplevel
+    name, groundings = chunk
+    template = ActionSchemaTemplate(problem.get_action(name))
+    return [template.instantiate(grounding) for grounding in groundings]
+
+
+def _ground_encoded_chunk(chunk):
+    return [encode_operator(op) for op in _ground_chunk(_problem, chunk)]
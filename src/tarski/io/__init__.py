@@ -1,5 +1,7 @@
 
 from .fstrips import FstripsReader, FstripsWriter
+from .cache import ProblemCache
+from .parallel import read_instances
 from .utils import find_domain_filename
 
 # Just a shortcut, turns out they're both the same! :-)
@@ -0,0 +1,213 @@
+"""
+ A hand-written, streaming parser for PDDL / FSTRIPS instance files. The objects and initial state of the problem are
+ created directly from the stream of tokens of the file, without building any parse tree, which is much faster and
+ leaner than the ANTLR-based parser for instances with large initial states. The remaining sections of the instance
+ (goal, constraints, metric, etc.), which are usually small, are delegated to the ANTLR-based parser.
+"""
+import logging
+import re
+from collections import defaultdict
+
+from .reader import ParsingError, UnsupportedLanguageFeature
+
+# Comments, parentheses, and any other sequence of characters up to a space or parenthesis (names, numbers, etc.)
+_TOKEN = re.compile(r';[^\n]*|[()]|[^\s();]+')
+
+# A run of flat facts of the initial state, i.e. either atoms "(p c1 ... cn)" or assignments "(= (f c1 ... cn) v)",
+# possibly separated by comments. Facts of any other form are left to the (slower) token-based parser.
+_NAME = r'[^\s();]+'
+_FLAT_FACT = re.compile(rf'(?:\s|;[^\n]*)*\((?:\s*=\s*\(\s*({_NAME})((?:\s+{_NAME})*)\s*\)\s*({_NAME})'
+                        rf'|\s*({_NAME})((?:\s+{_NAME})*))\s*\)')
+
+# The sections of an instance that are parsed with the ANTLR parser, and the grammar rule from which they are parsed
+_DELEGATED_SECTIONS = {':requirements': 'requireDef', ':goal': 'goal', ':constraints': 'probConstraints',
+                       ':bounds': 'boundsDecl', ':metric': 'metricSpec'}
+
+
+class InstanceParser:
+    """ A streaming parser of instance files, which works on top of the FStripsParser used for the domain file. """
+    def __init__(self, parser):
+        self.parser = parser
+        self.problem = parser.problem
+        self.language = parser.problem.language
+        self.constants = _ConstantTable(self.language)
+
+    def parse_file(self, filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            return self.parse_string(f.read())
+
+    def parse_string(self, text):
+        if self.parser.case_insensitive:
+            text = text.lower()
+        tokens = _TokenStream(text)
+        tokens.expect('(')
+        tokens.expect('define')
+        tokens.expect('(')
+        tokens.expect('problem')
+        self.problem.name = next(tokens)
+        tokens.expect(')')
+
+        while True:
+            token = next(tokens)
+            if token == ')':
+                return self.problem
+            if token != '(':
+                raise tokens.error(f'Expected the beginning of a section, found "{token}"')
+            start = tokens.start
+            section = next(tokens).lower()
+            if section == ':domain':
+                self._parse_domain_name(tokens)
+            elif section == ':objects':
+                self._parse_objects(tokens)
+            elif section == ':init':
+                self._parse_init(tokens)
+            elif section in _DELEGATED_SECTIONS:
+                tree, _ = self.parser.parse_string(text[start:tokens.skip()], _DELEGATED_SECTIONS[section])
+                self.parser.visit(tree)
+            else:
+                raise tokens.error(f'Unexpected section "{section}"')
+
+    def _parse_domain_name(self, tokens):
+        name = next(tokens)
+        tokens.expect(')')
+        if name != self.problem.domain_name:
+            logging.warning('Domain names as declared in domain and instance files do not coincide: "{}" vs " {}"'.
+                            format(self.problem.domain_name, name))
+
+    def _parse_objects(self, tokens):
+        names, typed = [], []
+        for token in tokens:
+            if token == ')':
+                break
+            if token == '-':
+                typename = next(tokens)
+                if typename == '(':
+                    raise UnsupportedLanguageFeature('"either"-based types not supported in Tarski PDDL parser')
+                typed += [(name, typename.lower()) for name in names]
+                names = []
+            elif token == '(':
+                raise tokens.error('Unexpected "(" in object declaration')
+            else:
+                names.append(token.lower())
+
+        # As in the ANTLR-based parser, untyped objects (which come last) are declared first
+        for name, typename in [(name, 'object') for name in names] + typed:
+            self.language.constant(name, typename)
+
+    def _parse_init(self, tokens):
+        # Facts are grouped by symbol name and added in bulk to the initial state once the whole section is parsed
+        atoms, assignments = defaultdict(list), defaultdict(list)
+        while True:
+            # Consume the run of flat facts that follows, if any, with a single regular expression per fact
+            text, position = tokens.text, tokens.end
+            match = _FLAT_FACT.match(text, position)
+            while match is not None:
+                function, subterms, value, predicate, arguments = match.groups()
+                if predicate is not None:
+                    atoms[predicate].append(arguments)
+                else:
+                    assignments[function].append((subterms, value))
+                position = match.end()
+                match = _FLAT_FACT.match(text, position)
+            tokens.seek(position)
+
+            token = next(tokens)
+            if token == ')':
+                break
+            if token != '(':
+                raise tokens.error(f'Expected an atom of the initial state, found "{token}"')
+
+            # Facts that are not matched by the regular expression, e.g. because they contain comments, are parsed here
+            head = next(tokens)
+            if head.lower() == 'not':  # Negative literals can be ignored, as atoms are assumed by default to be false
+                tokens.expect('(')
+                tokens.skip()
+                tokens.expect(')')
+            elif head == '=':
+                tokens.expect('(')
+                function = next(tokens)
+                subterms = self._parse_arguments(tokens)
+                assignments[function].append((subterms, next(tokens)))
+                tokens.expect(')')
+            else:
+                atoms[head].append(self._parse_arguments(tokens))
+
+        init, constant = self.problem.init, self.constants.__getitem__
+        for name, points in atoms.items():
+            predicate = self.language.get_predicate(name.lower())
+            init.add_all(predicate, [tuple(map(constant, arguments.split())) for arguments in points])
+        for name, points in assignments.items():
+            function = self.language.get_function(name.lower())
+            init.set_all(function, [(tuple(map(constant, subterms.split())), constant(value))
+                                    for subterms, value in points])
+
+    @staticmethod
+    def _parse_arguments(tokens):
+        """ Parse the arguments of a flat atom or term, up to and including the closing parenthesis, and return them as
+        a string of space-separated tokens, as they are matched by the regular expression of flat facts. """
+        arguments = []
+        for token in tokens:
+            if token == ')':
+                break
+            if token == '(':
+                raise tokens.error('Unexpected "(" in the arguments of a flat atom or term')
+            arguments.append(token)
+        return ' '.join(arguments)
+
+
+class _ConstantTable(dict):
+    """ A map from the tokens of an instance file to the constants of the language they denote, which are looked up in
+    the language the first time the token is used. Numbers are left as strings, to be cast into the sort where they
+    are used. """
+    def __init__(self, language):
+        super().__init__()
+        self.language = language
+
+    def __missing__(self, token):
+        self[token] = value = self.language.get_constant(token.lower()) if token[0].isalpha() else token
+        return value
+
+
+class _TokenStream:
+    """ An iterator over the tokens of a PDDL text, which raises a ParsingError if the text ends before expected. """
+    def __init__(self, text):
+        self.text = text
+        self.matches = _TOKEN.finditer(text)
+        self.start = self.end = 0  # The position in the text of the last token read
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        for match in self.matches:
+            token = match.group()
+            if token[0] != ';':
+                self.start, self.end = match.span()
+                return token
+        raise self.error('Unexpected end of file')
+
+    def seek(self, position):
+        """ Continue reading tokens from the given position of the text. """
+        self.matches = _TOKEN.finditer(self.text, position)
+        self.start = self.end = position
+
+    def expect(self, expected):
+        token = next(self)
+        if token.lower() != expected:
+            raise self.error(f'Expected "{expected}", found "{token}"')
+
+    def skip(self):
+        """ Skip all tokens up to the parenthesis that closes the last one read, and return the position where the
+        closing parenthesis ends. """
+        depth = 1
+        while depth:
+            token = next(self)
+            if token == '(':
+                depth += 1
+            elif token == ')':
+                depth -= 1
+        return self.end
+
+    def error(self, msg):
+        line = self.text.count('\n', 0, self.start) + 1
+        return ParsingError(f'line {line}: {msg}')
@@ -0,0 +1,223 @@
+"""
+ An on-disk cache of parsed planning problems. The first time that a pair of domain and instance files is read through
+ a cache, the resulting problem is stored as a compact binary snapshot, keyed by a hash of the contents of both files.
+ Subsequent reads of files with the same contents rebuild the problem from the snapshot instead of parsing the files.
+
+ Snapshots describe the language of the problem (theories, sorts, constants and symbols) by name, in declaration order,
+ and the rest of the problem with the language-independent encoding of `tarski.fstrips.encoding`. The initial state is
+ stored as arrays of integers that refer to a table of all the objects in it. Loading a snapshot replays the
+ declarations of the language and decodes the rest of the problem on top of it, so that no deep copy of any language
+ is involved. Note that snapshots are pickled, i.e. cache directories are meant to be trusted just like the PDDL files
+ they stand for.
+"""
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from array import array
+
+from ..errors import TarskiError
+from ..fstrips.action import AdditiveActionCost
+from ..fstrips.encoding import Decoder, encode_formula, encode_term, encode_effect
+from ..fstrips.fstrips import OptimizationMetric, OptimizationType
+from ..model import ExtensionalFunctionDefinition
+from ..syntax.sorts import Interval
+from ..theories import Theory, load_theory
+
+_MAGIC = b'TPS1'
+
+
+class ProblemCache:
+    """ A cache of parsed problems stored in the given directory, which is created if it does not exist. """
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def filename(self, problem, domain, instance, options):
+        return os.path.join(self.directory, f'{file_fingerprint(problem.language, domain, instance, options)}.problem')
+
+    def read_problem(self, problem, domain, instance, options, parse):
+        """ Return the problem described by the given domain and instance files, given an empty problem whose language
+        is the one where the files are to be parsed, and the list of (string) options of the parser. If there is a
+        snapshot for the contents of the files in the cache, the given problem is filled in from it and returned.
+        Otherwise, the problem is obtained by calling `parse()` and stored in the cache. """
+        filename = self.filename(problem, domain, instance, options)
+        if os.path.isfile(filename):
+            return load_problem(filename, problem)
+
+        problem = parse()
+        try:
+            store_problem(filename, problem)
+        except TarskiError as e:
+            logging.debug(f'Problem "{problem.name}" cannot be stored in the cache: {e}')
+        return problem
+
+
+def file_fingerprint(language, domain, instance, options=()):
+    """ Return a hash of the contents of the given domain and instance files, the given list of (string) options, and
+    the vocabulary of the given language, where the files are to be parsed. """
+    h = hashlib.sha256(_MAGIC)
+    h.update(repr((sorted(t.value for t in language.theories), [s.name for s in language.sorts],
+                   language.vocabulary(), list(options))).encode('utf-8'))
+    for filename in (domain, instance):
+        with open(filename, 'rb') as f:
+            contents = f.read()
+        h.update(len(contents).to_bytes(8, 'little'))
+        h.update(contents)
+    return h.hexdigest()
+
+
+def store_problem(filename, problem):
+    """ Store a snapshot of the given problem into the given file. The file is written atomically, so that concurrent
+    processes never read a partially written snapshot. Raise a TarskiError if some element of the problem cannot be
+    encoded. """
+    data = pickle.dumps(snapshot_problem(problem), protocol=pickle.HIGHEST_PROTOCOL)
+    directory = os.path.dirname(os.path.abspath(filename))
+    with tempfile.NamedTemporaryFile(mode='wb', dir=directory, delete=False) as f:
+        f.write(_MAGIC)
+        f.write(data)
+    os.replace(f.name, filename)
+
+
+def load_problem(filename, problem):
+    """ Fill in the given (empty) problem from the snapshot stored in the given file by `store_problem`, and return
+    it. """
+    with open(filename, 'rb') as f:
+        data = f.read()
+    if data[:len(_MAGIC)] != _MAGIC:
+        raise TarskiError(f'File "{filename}" is not a valid problem snapshot')
+    return restore_problem(pickle.loads(data[len(_MAGIC):]), problem)
+
+
+def snapshot_problem(problem):
+    """ Return a snapshot of the given problem, made up only of tuples, lists, strings, numbers and arrays, which is
+    cheap to pickle. Raise a TarskiError if some element of the problem cannot be encoded. """
+    return _snapshot_language(problem.language), _snapshot_problem(problem), _snapshot_init(problem)
+
+
+def restore_problem(snapshot, problem):
+    """ Fill in the given (empty) problem from the given snapshot, and return it. The declarations of the snapshot
+    that already exist in the language of the problem are skipped. """
+    language, header, init = snapshot
+    _restore_language(problem.language, *language)
+    _restore_problem(problem, Decoder(problem.language), *header)
+    _restore_init(problem, Decoder(problem.language), *init)
+    return problem
+
+
+def _snapshot_language(lang):
+    sorts = []
+    for sort in lang.sorts:
+        parent = lang.immediate_parent[sort]
+        if sort.builtin or parent is None:  # i.e. sorts of some theory, or the "object" sort
+            continue
+        bounds = (sort.lower_bound, sort.upper_bound) if isinstance(sort, Interval) else None
+        sorts.append((sort.name, parent.name, bounds))
+    return ([t.value for t in Theory if t in lang.theories], sorts,
+            [(c.name, c.sort.name) for c in lang.constants()],
+            [(p.name, [s.name for s in p.sort]) for p in lang.predicates if not p.builtin],
+            [(f.name, [s.name for s in f.sort]) for f in lang.functions if not f.builtin])
+
+
+def _restore_language(lang, theories, sorts, constants, predicates, functions):
+    for theory in theories:
+        if Theory(theory) not in lang.theories:
+            load_theory(lang, theory)
+    for name, parent, bounds in sorts:
+        if lang.has_sort(name):
+            continue
+        parent = lang.get_sort(parent)
+        if bounds is None:
+            lang.sort(name, parent)
+        else:
+            lang.attach_sort(Interval(name, lang, parent.encode, *bounds), parent)
+    for name, sort in constants:
+        if not lang.has_constant(name):
+            lang.constant(name, sort)
+    for name, sorts in predicates:
+        if not lang.has_predicate(name):
+            lang.predicate(name, *sorts)
+    for name, sorts in functions:
+        if not lang.has_function(name):
+            lang.function(name, *sorts)
+
+
+def _snapshot_problem(problem):
+    actions = []
+    for action in problem.actions.values():
+        cost = action.cost
+        if cost is not None and not isinstance(cost, AdditiveActionCost):
+            raise TarskiError(f'Unsupported cost "{cost}" of action "{action.name}"')
+        actions.append((action.name, [encode_term(p) for p in action.parameters], encode_formula(action.precondition),
+                        [encode_effect(e) for e in action.effects], None if cost is None else encode_term(cost.addend)))
+
+    derived = [(name, [encode_term(p) for p in d.parameters], encode_formula(d.formula))
+               for name, d in problem.derived_predicates.items()]
+
+    metric = problem.plan_metric
+    if metric is not None:
+        metric = encode_term(metric.opt_expression), metric.opt_type.value
+
+    return (problem.name, problem.domain_name, actions, derived,
+            None if problem.goal is None else encode_formula(problem.goal),
+            [encode_formula(c) for c in problem.constraints], metric)
+
+
+def _restore_problem(problem, decoder, name, domain_name, actions, derived, goal, constraints, metric):
+    problem.name, problem.domain_name = name, domain_name
+    for aname, parameters, precondition, effects, cost in actions:
+        cost = None if cost is None else AdditiveActionCost(decoder.term(cost))
+        problem.action(aname, [decoder.term(p) for p in parameters], decoder.formula(precondition),
+                       [decoder.effect(e) for e in effects], cost)
+    for dname, parameters, formula in derived:
+        problem.derived(dname, [decoder.term(p) for p in parameters], decoder.formula(formula))
+    problem.goal = None if goal is None else decoder.formula(goal)
+    problem.constraints = [decoder.formula(c) for c in constraints]
+    if metric is not None:
+        problem.plan_metric = OptimizationMetric(decoder.term(metric[0]), OptimizationType(metric[1]))
+
+
+def _snapshot_init(problem):
+    objects, indexes = [], dict()
+
+    def index(constant):
+        key = constant.name, constant.sort.name
+        i = indexes.get(key)
+        if i is None:
+            i = indexes[key] = len(objects)
+            objects.append(encode_term(constant))
+        return i
+
+    predicates = [(signature[0], len(extension), array('i', [index(ref.expr) for point in extension for ref in point]))
+                  for signature, extension in problem.init.predicate_extensions.items()]
+
+    functions = []
+    for signature, definition in problem.init.function_extensions.items():
+        if not isinstance(definition, ExtensionalFunctionDefinition):
+            raise TarskiError(f'Unsupported intensional definition of function "{signature[0]}"')
+        ints = array('i')
+        for point, value in definition.data.items():
+            ints.extend(index(ref.expr) for ref in point)
+            ints.append(index(value))
+        functions.append((signature[0], len(definition), ints))
+
+    return objects, predicates, functions
+
+
+def _restore_init(problem, decoder, objects, predicates, functions):
+    lang, init = problem.language, problem.init
+    objects = [decoder.term(code) for code in objects]
+
+    def read_tuples(arity, count, ints):
+        if arity == 0:
+            return [()] * count
+        args = [objects[i] for i in ints]
+        return [tuple(args[i:i + arity]) for i in range(0, arity * count, arity)]
+
+    for name, count, ints in predicates:
+        predicate = lang.get_predicate(name)
+        init.add_all(predicate, read_tuples(predicate.arity, count, ints))
+    for name, count, ints in functions:
+        function = lang.get_function(name)
+        init.set_all(function, [(t[:-1], t[-1]) for t in read_tuples(function.arity + 1, count, ints)])
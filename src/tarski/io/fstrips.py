@@ -1,5 +1,9 @@
+import gzip
+import io
+import itertools
 import logging
 from collections import defaultdict
+from string import Formatter
 from typing import Optional, List
 
 from ..fstrips.action import AdditiveActionCost
@@ -15,6 +19,7 @@ from ..fstrips import create_fstrips_problem, language, FunctionalEffect, AddEff
     UniversalEffect
 
 from ._fstrips.reader import FStripsParser
+from ._fstrips.instance import InstanceParser
 
 # Leave the next import so that it can be imported from the outside without warnings of importing a private module
 # pylint: disable=unused-import
@@ -26,7 +31,7 @@ class FstripsReader:
 
     def __init__(self, raise_on_error=False, theories=None, lang=None,
                  strict_with_requirements=True, case_insensitive=False,
-                 evaluator=None):
+                 evaluator=None, streaming=False, cache=None):
         """ Create a FSTRIPS reader.
 
         :param raise_on_error: Whether to raise a Tarski ParsingError on every syntax error detected by the parser.
@@ -35,6 +40,13 @@ class FstripsReader:
         :param strict_with_requirements: if False, the parser will be less strict with the PDDL requirement flags,
                                          and will load by default the necessary theories to process action costs.
         :param case_insensitive: Whether to be strict with cases. If not, the whole PDDL file will be lowercased.
+        :param streaming: Whether to parse instance files with a streaming parser that declares the objects and builds
+                          the initial state of the problem as it reads the file, without building a full parse tree.
+                          This is much faster on instances with large initial states, but syntax errors in the objects
+                          and initial state sections are always raised as a ParsingError.
+        :param cache: A ProblemCache (see `tarski.io.cache`) from which problems read with `read_problem` are loaded,
+                      if some problem was already read from files with the same contents, and where they are stored
+                      otherwise.
         """
         lang = language(theories=theories) if lang is None else lang
         if not strict_with_requirements:
@@ -43,8 +55,18 @@ class FstripsReader:
 
         self.problem = create_fstrips_problem(language=lang, evaluator=evaluator)
         self.parser = FStripsParser(self.problem, raise_on_error, case_insensitive)
+        self.streaming = streaming
+        self.cache = cache
+        self.case_insensitive = case_insensitive
 
     def read_problem(self, domain, instance):
+        if self.cache is not None:
+            options = [f'case_insensitive={self.case_insensitive}']
+            return self.cache.read_problem(self.problem, domain, instance, options,
+                                           lambda: self._parse_problem(domain, instance))
+        return self._parse_problem(domain, instance)
+
+    def _parse_problem(self, domain, instance):
         self.parse_domain(domain)
         self.parse_instance(instance)
         return self.problem
@@ -59,6 +81,8 @@ class FstripsReader:
         uniformize_costs(self.problem)
 
     def parse_instance(self, filename):
+        if self.streaming:
+            return InstanceParser(self.parser).parse_file(filename)
         self.parse_file(filename, 'problem')
         return self.problem
 
@@ -71,6 +95,9 @@ class FstripsReader:
 
 _TAB = " " * 4
 
+# The number of lines that are joined into a single string before writing them into a stream
+_CHUNKSIZE = 1000
+
 action_tpl = """
     (:action {name}
      :parameters ({parameters})
@@ -111,23 +138,63 @@ def linebreaks(elements, indentation, indent_first):
 
 
 def print_init(problem):
-    elements = []
+    return linebreaks(iterate_init(problem), indentation=2, indent_first=False)
+
+
+def iterate_init(problem):
+    """ Iterate over the PDDL representation of each atom of the initial state of the given problem. Atoms of the same
+    symbol are printed with a single format string, which is built only once. """
     # e.g. (= (value c0) 0)
     for signature, definition in problem.init.function_extensions.items():
         if not isinstance(definition, ExtensionalFunctionDefinition):
             continue  # Ignore intensionally defined symbols
-        fname = signature[0]
+        tpl = "(= {} {{}})".format(_atom_template(signature[0], len(signature) - 2))
         for point, value in definition.data.items():
-            elements.append("(= ({} {}) {})".format(fname, print_term_ref_list(point), value))
+            yield tpl.format(*(ref.expr.symbol for ref in point), value)
 
     # e.g. (clear b1)
     for signature, definition in problem.init.predicate_extensions.items():
         assert isinstance(definition, set)
-        predname = signature[0]
+        tpl = _atom_template(signature[0], len(signature) - 1)
         for point in definition:
-            elements.append("({} {})".format(predname, print_term_ref_list(point)))
+            yield tpl.format(*(ref.expr.symbol for ref in point))
+
+
+def _atom_template(name, arity):
+    """ Return the format string of the atoms (or terms) of the symbol with given name and arity, e.g. "(p {} {})". """
+    return "({} {})".format(name.replace("{", "{{").replace("}", "}}"), " ".join(["{}"] * arity))
+
+
+def write_lines(stream, lines, indentation):
+    """ Write the given lines into the given stream, separated by line breaks and indented as in `linebreaks`, i.e.
+    all of them except the first one. Lines are joined and written in chunks, so that neither all of them need to be
+    kept in memory, nor the stream is written once per line. """
+    lines = iter(lines)
+    separator = "\n" + indent("", indentation)
+    chunk = list(itertools.islice(lines, _CHUNKSIZE))
+    prefix = ""
+    while chunk:
+        stream.write(prefix + separator.join(chunk))
+        prefix = separator
+        chunk = list(itertools.islice(lines, _CHUNKSIZE))
+
+
+def write_template(stream, tpl, **fields):
+    """ Write the given template into the given stream, replacing each of its {fields} by the value of the keyword
+    argument with the same name. The value can be either a string, or a function that writes it into the stream. """
+    for literal, name, _, _ in Formatter().parse(tpl):
+        stream.write(literal)
+        if name is not None:
+            value = fields[name]
+            if callable(value):
+                value(stream)
+            else:
+                stream.write(value)
 
-    return linebreaks(elements, indentation=2, indent_first=False)
+
+def open_for_writing(filename):
+    """ Open the file with the given name for writing text, with gzip compression if the name ends in ".gz". """
+    return gzip.open(filename, 'wt') if filename.endswith('.gz') else open(filename, 'w')
 
 
 def print_goal(problem):
@@ -183,23 +250,31 @@ class FstripsWriter:
         constants", and which as "PDDL instance objects", which is something that cannot be determined from the problem
         information alone. If `constant_objects` is None, all objects are considered instance objects.
         """
-        tpl = load_tpl("fstrips_domain.tpl")
-        content = tpl.format(
+        stream = io.StringIO()
+        self.dump_domain(stream, constant_objects)
+        return stream.getvalue()
+
+    def dump_domain(self, stream, constant_objects: Optional[List[Constant]] = None):
+        """ Write the PDDL representation of the domain (see `print_domain`) into the given text stream, one action
+        at a time. """
+        write_template(
+            stream, load_tpl("fstrips_domain.tpl"),
             header_info="",
             domain_name=self.problem.domain_name,
             requirements=" ".join(get_requirements_string(self.problem)),
             types=self.get_types(),
             functions=self.get_functions(),
             predicates=self.get_predicates(),
-            actions=self.get_actions(),
-            derived=self.get_derived_predicates(),
+            actions=lambda s: write_lines(s, map(self.get_action, self.problem.actions.values()), 0),
+            derived=lambda s: write_lines(s, map(self.get_derived, self.problem.derived_predicates.values()), 0),
             constants=print_objects(constant_objects if constant_objects else []),
         )
-        return content
 
     def write_domain(self, filename, constant_objects):
-        with open(filename, 'w') as file:
-            file.write(self.print_domain(constant_objects))
+        """ Write the PDDL representation of the domain into the file with the given name, which is gzip-compressed if
+        the name ends in ".gz". """
+        with open_for_writing(filename) as file:
+            self.dump_domain(file, constant_objects)
 
     def print_instance(self, constant_objects: Optional[List[Constant]] = None):
         """ Generate the PDDL string representation that would correspond to the instance.pddl file of the current
@@ -208,29 +283,36 @@ class FstripsWriter:
         constants", and which as "PDDL instance objects", which is something that cannot be determined from the problem
         information alone. If `constant_objects` is None, all objects are considered instance objects.
         """
-        tpl = load_tpl("fstrips_instance.tpl")
+        stream = io.StringIO()
+        self.dump_instance(stream, constant_objects)
+        return stream.getvalue()
 
+    def dump_instance(self, stream, constant_objects: Optional[List[Constant]] = None):
+        """ Write the PDDL representation of the instance (see `print_instance`) into the given text stream. The atoms
+        of the initial state are written as they are generated, without building the whole initial state section. """
         # Only objects which are not declared in the domain file need to be printed in the instance file
         constants = {symref(c) for c in constant_objects} if constant_objects else set()
         instance_objects = [c for c in self.problem.language.constants() if symref(c) not in constants]
 
-        content = tpl.format(
+        write_template(
+            stream, load_tpl("fstrips_instance.tpl"),
             header_info="",
             domain_name=self.problem.domain_name,
             problem_name=self.problem.name,
 
             objects=print_objects(instance_objects),
-            init=print_init(self.problem),
+            init=lambda s: write_lines(s, iterate_init(self.problem), 2),
             goal=print_goal(self.problem),
             constraints=print_problem_constraints(self.problem),
             domain_bounds=print_domain_bounds(self.problem),
             metric=print_problem_metric(self.problem),
         )
-        return content
 
     def write_instance(self, filename, constant_objects):
-        with open(filename, 'w') as file:
-            file.write(self.print_instance(constant_objects))
+        """ Write the PDDL representation of the instance into the file with the given name, which is gzip-compressed
+        if the name ends in ".gz". """
+        with open_for_writing(filename) as file:
+            self.dump_instance(file, constant_objects)
 
     def get_types(self):
         res = []
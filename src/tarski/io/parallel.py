@@ -0,0 +1,59 @@
+"""
+ Parsing of many instances of a single domain, optionally in parallel.
+"""
+import multiprocessing
+
+from .cache import snapshot_problem, restore_problem
+from .fstrips import FstripsReader
+
+# The snapshot of the domain, and the options of the readers, shared by all instances read by the current worker
+# process, set by the initializer of the pool. Since workers are forked, they inherit them instead of receiving a
+# pickled copy for each task.
+_domain = None
+
+
+def read_instances(domain, instances, workers=1, snapshots=False, **options):
+    """ Read the problems defined by the given domain file and each of the given instance files, with readers created
+    with the given `FstripsReader` options (other than `lang`), and return them in the order of the instances.
+
+    The domain file is parsed only once. Each instance is then parsed on top of a fresh copy of the parsed domain,
+    which is rebuilt from a snapshot (see `tarski.io.cache.snapshot_problem`) instead of being deep-copied. If
+    `workers` is larger than one, instances are parsed in a pool of that many worker processes, which ship back the
+    problems as snapshots. If `snapshots` is true, the snapshots are returned instead of the problems, e.g. to send
+    them to some other process, which can rebuild each problem with `restore_problem(snapshot, reader.problem)` for
+    a new reader with the same options.
+
+    Worker processes are created with the "fork" start method; on platforms where it is not available, instances are
+    read serially in the current process.
+    """
+    if 'lang' in options:
+        raise ValueError('Instances cannot be read into a single, given language')
+
+    reader = FstripsReader(**options)
+    reader.parse_domain(domain)
+    domain_snapshot = snapshot_problem(reader.problem)
+
+    if workers <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        problems = [_read_instance(domain_snapshot, options, instance) for instance in instances]
+        return [snapshot_problem(p) for p in problems] if snapshots else problems
+
+    with multiprocessing.get_context('fork').Pool(workers, initializer=_set_domain,
+                                                  initargs=((domain_snapshot, options), )) as pool:
+        # imap returns results in the order of the tasks, regardless of the order in which they get completed
+        results = list(pool.imap(_read_instance_snapshot, instances))
+    return results if snapshots else [restore_problem(s, FstripsReader(**options).problem) for s in results]
+
+
+def _set_domain(domain):
+    global _domain  # pylint: disable=global-statement
+    _domain = domain
+
+
+def _read_instance(domain_snapshot, options, instance):
+    reader = FstripsReader(**options)
+    restore_problem(domain_snapshot, reader.problem)
+    return reader.parse_instance(instance)
+
+
+def _read_instance_snapshot(instance):
+    return snapshot_problem(_read_instance(*_domain, instance))
@@ -19,19 +19,7 @@ def _check_assignment(fun, point, value=None):
 
     language = fun.language
     for element, expected_type in zip(elements, typ):
-
-        if not isinstance(element, Constant):
-            # Assume a literal value has been passed instead of its corresponding constant
-            element = Constant(expected_type.cast(element), expected_type)
-            # raise err.IncorrectExtensionDefinition(fun, point, value)
-
-        if element.language != language:
-            raise err.LanguageMismatch(element, element.language, language)
-
-        if not language.is_subtype(element.sort, expected_type):
-            raise err.SortMismatch(element, element.sort, expected_type)
-
-        processed.append(element)
+        processed.append(_check_element(element, expected_type, language))
 
     if value is None:
         return tuple(processed), None
@@ -40,6 +28,43 @@ def _check_assignment(fun, point, value=None):
     return tuple(processed[:-1]), processed[-1]
 
 
+def _check_element(element, expected_type, language):
+    if not isinstance(element, Constant):
+        # Assume a literal value has been passed instead of its corresponding constant
+        element = Constant(expected_type.cast(element), expected_type)
+        # raise err.IncorrectExtensionDefinition(fun, point, value)
+
+    if element.language != language:
+        raise err.LanguageMismatch(element, element.language, language)
+
+    if not language.is_subtype(element.sort, expected_type):
+        raise err.SortMismatch(element, element.sort, expected_type)
+
+    return element
+
+
+def _wrap_points(symbol, points):
+    """ Check that the given tuples of elements are valid points of the extension of the given symbol (including the
+    value, for function symbols), and return them as tuples of term references. Each distinct element is checked and
+    wrapped only once per position, which makes this much faster than checking points one by one. """
+    typ, language = symbol.sort, symbol.language
+    # For each position, a map from the id of the elements seen in it to the element (which keeps the id from being
+    # reused) and its reference
+    seen = [dict() for _ in typ]
+    wrapped = []
+    for point in points:
+        if len(point) != len(typ):
+            raise err.ArityMismatch(symbol, point)
+        refs = []
+        for element, expected_type, references in zip(point, typ, seen):
+            entry = references.get(id(element))
+            if entry is None:
+                entry = references[id(element)] = (element, symref(_check_element(element, expected_type, language)))
+            refs.append(entry[1])
+        wrapped.append(tuple(refs))
+    return wrapped
+
+
 class Model:
     """ A First Order Language Model """
 
@@ -114,6 +139,31 @@ class Model:
         definition = self.predicate_extensions.setdefault(predicate.signature, set())
         definition.add(wrap_tuple(point))
 
+    def add_all(self, predicate: Predicate, points):
+        """ Add all given points (tuples of constants, or of literal values) to the extension of the given predicate.
+        This is equivalent to calling `add(predicate, *point)` for each point, but much faster for large numbers of
+        points, as the predicate and each distinct constant are checked only once. """
+        if not isinstance(predicate, Predicate):
+            raise err.SemanticError("Model.add_all() can only set the value of predicate symbols")
+        if predicate.builtin:
+            raise err.SemanticError(f"Model.add_all() attempted to redefine builtin symbol '{predicate}'")
+        self.predicate_extensions.setdefault(predicate.signature, set()).update(_wrap_points(predicate, points))
+
+    def set_all(self, function: Function, assignments):
+        """ Set the value of the interpretation of the given function on each (point, value) pair of the given
+        assignments, where points are tuples of constants or of literal values. This is equivalent to calling
+        `set(function(*point), value)` for each pair, but much faster for large numbers of pairs. """
+        if not isinstance(function, Function):
+            raise err.SemanticError("Model.set_all() can only set the value of function symbols")
+        if function.builtin:
+            raise err.SemanticError(f"Model.set_all() attempted to redefine builtin symbol '{function}'")
+        definition = self.function_extensions.setdefault(function.signature, ExtensionalFunctionDefinition())
+        if not isinstance(definition, ExtensionalFunctionDefinition):
+            raise err.SemanticError("Cannot define extension of intensional definition")
+
+        wrapped = _wrap_points(function, [tuple(point) + (value,) for point, value in assignments])
+        definition.data.update((refs[:-1], refs[-1].expr) for refs in wrapped)
+
     def remove(self, predicate: Predicate, *args):
         """ Remove a given point from the extension of a predicate.
         Raises exception if the extension does not contain the point. """
@@ -173,6 +223,24 @@ class Model:
 
         return atoms
 
+    def copy_on_write(self, signatures):
+        """ Return a copy of the current model that shares with it the extensions of all symbols except those with
+        the given signatures, which are copied so that they can be safely modified in the new model.
+        This is much cheaper than a deep copy of the model, but the caller is responsible for modifying, in either
+        of the two models, only the extensions of the symbols whose signatures are given. """
+        model = Model(self.language, self.evaluator)
+        model.predicate_extensions = self.predicate_extensions.copy()
+        model.function_extensions = self.function_extensions.copy()
+        for signature in signatures:
+            extension = model.predicate_extensions.get(signature)
+            if extension is not None:
+                model.predicate_extensions[signature] = set(extension)
+
+            definition = model.function_extensions.get(signature)
+            if isinstance(definition, ExtensionalFunctionDefinition):
+                model.function_extensions[signature] = definition.copy()
+        return model
+
     def get_extension(self, symbol):
         """ Return the extension of the given (predicate or function) symbol in the
          current model. """
@@ -225,6 +293,11 @@ class ExtensionalFunctionDefinition:
     def get(self, point):
         return self.data[wrap_tuple(point)]
 
+    def copy(self):
+        definition = ExtensionalFunctionDefinition()
+        definition.data = self.data.copy()
+        return definition
+
     def __len__(self):
         return len(self.data)
 
@@ -32,3 +32,12 @@ def import_pyrddl_parser():
         raise ImportError('The pyrddl module does not seem available. '
                           'Please try installing Tarski with the "rddl" extra.') from None
     return RDDLParser
+
+
+def import_clingo():
+    try:
+        import clingo  # pylint: disable=import-outside-toplevel
+    except ImportError as _:
+        raise ImportError('The clingo module does not seem available. '
+                          'Please try installing Tarski with the "clingo" extra.') from None
+    return clingo
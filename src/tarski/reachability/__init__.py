@@ -1,3 +1,3 @@
 
 from .asp import create_reachability_lp
-from .clingo_wrapper import run_clingo, parse_model
+from .clingo_wrapper import run_clingo, parse_model, solve_lp, iterate_model, iterate_lp_solution
@@ -1,7 +1,9 @@
 """
     A module to create reachability-related logic programs from PDDL tasks
 """
+import gzip
 import itertools
+import sys
 
 from ..fstrips.action import AdditiveActionCost
 from ..syntax.transform import remove_quantifiers, QuantifierEliminationMode
@@ -16,15 +18,51 @@ from ..fstrips.representation import identify_cost_related_functions, expand_uni
 GOAL = "goal"
 
 
-def create_reachability_lp(problem: Problem, ground_actions=True, include_variable_inequalities=False):
-    """ Return a reachability logic program, along with the symbol translation dictionary used to create it """
-    lp = LogicProgram()
-    compiler_class = ReachabilityLPCompiler if ground_actions else VariableOnlyReachabilityLPCompiler
-    compiler = compiler_class(problem, lp, include_variable_inequalities=include_variable_inequalities)
-    compiler.create()
+def create_reachability_lp(problem: Problem, ground_actions=True, include_variable_inequalities=False,
+                           split_rules=False, lp=None, domain=None):
+    """ Return a reachability logic program, along with the symbol translation dictionary used to create it.
+    The rules of the program are added to the given `lp` object, if any, or else to a new `LogicProgram`.
+    If a `ReachabilityLPDomain` is given, its rules are reused instead of compiled again from the problem.
+    See `ReachabilityLPCompiler` for the meaning of `split_rules`. """
+    lp = LogicProgram() if lp is None else lp
+    compiler = create_reachability_lp_compiler(problem, lp, ground_actions, include_variable_inequalities, split_rules)
+    if domain is None:
+        compiler.create_domain()
+    else:
+        compiler.load_domain(domain)
+    compiler.create_init()
+    compiler.create_goal()
     return lp, compiler.tr
 
 
+def create_reachability_lp_compiler(problem: Problem, lp, ground_actions=True, include_variable_inequalities=False,
+                                    split_rules=False):
+    compiler_class = ReachabilityLPCompiler if ground_actions else VariableOnlyReachabilityLPCompiler
+    return compiler_class(problem, lp, include_variable_inequalities=include_variable_inequalities,
+                          split_rules=split_rules)
+
+
+def compile_reachability_domain(problem: Problem, ground_actions=True, include_variable_inequalities=False,
+                                split_rules=False, lp=None):
+    """ Compile the part of the reachability logic program of the given problem that does not depend on its initial
+    state or goal, and return it as a `ReachabilityLPDomain`. The rules are created on the given `lp` object, if any,
+    or else on a new `LogicProgram`, and can only be reused on LP objects of the same type. """
+    lp = LogicProgram() if lp is None else lp
+    compiler = create_reachability_lp_compiler(problem, lp, ground_actions, include_variable_inequalities, split_rules)
+    compiler.create_domain()
+    return ReachabilityLPDomain(list(lp.rules), compiler.tr, compiler.aux_atom_count)
+
+
+class ReachabilityLPDomain:
+    """ The rules of a reachability logic program that depend only on the language and action schemas of a problem,
+    which can be reused to create the logic programs of other problems that differ only in their initial state or
+    goal, along with the translator and number of auxiliary atoms used to create them. """
+    def __init__(self, rules, translator, aux_atom_count):
+        self.rules = rules
+        self.translator = translator
+        self.aux_atom_count = aux_atom_count
+
+
 class ReachabilityLPCompiler:
     """ A class that handles the compilation of planning problem into suitable logic programs to perform reachability
     analysis. The compilation follows roughly the relaxed reachability analysis outlined in Section 6 of
@@ -33,13 +71,20 @@ class ReachabilityLPCompiler:
         Artificial Intelligence, 173(5-6), 503-535.
 
     albeit there are some differences which so far we haven't properly described and analyzed.
+
+    If `split_rules` is true, rules with more than two (non-builtin) body atoms are split into a chain of rules with
+    two body atoms each, following the rule splitting of Section 6.4 of the same paper: body atoms are greedily joined
+    in pairs into auxiliary atoms that project away all variables not needed by the rest of the rule. The resulting
+    program has the same model on the original predicates, but is usually much cheaper to ground.
     """
-    def __init__(self, problem: Problem, lp, include_variable_inequalities=False, include_action_costs=False):
+    def __init__(self, problem: Problem, lp, include_variable_inequalities=False, include_action_costs=False,
+                 split_rules=False):
         self.problem = problem
         self.lp = lp
         self.aux_atom_count = 0
         self.include_variable_inequalities = include_variable_inequalities
         self.include_action_costs = include_action_costs
+        self.split_rules = split_rules
         self.tr = Translator()
 
     def gen_aux_atom(self, args=None):
@@ -47,12 +92,23 @@ class ReachabilityLPCompiler:
         self.aux_atom_count += 1
         return self.lp_atom("__f{}".format(self.aux_atom_count), args)
 
+    def rule(self, lp, head, body):
+        """ Add to the given LP the given rule, split into several rules if so configured. """
+        if self.split_rules:
+            for h, b in split_rule(head, body, self.gen_aux_atom):
+                lp.rule(h, b)
+        else:
+            lp.rule(head, body)
+
     def create(self):
-        problem, lang, lp = self.problem, self.problem.language, self.lp
+        self.create_domain()
+        self.create_init()
+        self.create_goal()
 
-        # Preprocess the domain functions to identify those that appear only in
-        # cost-related effects, which we can then ignore safely
-        cost_related_functions = identify_cost_related_functions(problem)
+    def create_domain(self):
+        """ Add to the LP the rules that depend only on the language and action schemas of the problem, i.e. not on
+        its initial state or goal. """
+        problem, lang, lp = self.problem, self.problem.language, self.lp
 
         # Declare the PDDL objects with their types, e.g. with a fact "block(b1)".
         constants = lang.constants()
@@ -67,6 +123,32 @@ class ReachabilityLPCompiler:
                     lp.rule(self.lp_atom(p.name, [_var()], prefix='type'),
                             [self.lp_atom(s.name, [_var()], prefix='type')])
 
+        # Process all actions
+        for _, action in problem.actions.items():
+            if all(len(list(v.sort.domain())) > 0 for v in action.parameters):
+                # We process only those actions such that all their parameter types have at least one object
+                self.process_action(action, lang, lp)
+
+        # Process all derived predicates
+        # TODO To be implemented yet
+        assert not problem.derived_predicates
+
+        # self.add_directives(problem, lp)
+
+    def load_domain(self, domain):
+        """ Add to the LP the rules of the given `ReachabilityLPDomain`, instead of compiling them from the problem. """
+        self.lp.rules.extend(domain.rules)
+        self.tr = domain.translator.copy()  # The same domain can be loaded into many compilers
+        self.aux_atom_count = domain.aux_atom_count
+
+    def create_init(self):
+        """ Add to the LP the facts that correspond to the atoms in the initial state of the problem. """
+        problem, lp = self.problem, self.lp
+
+        # Preprocess the domain functions to identify those that appear only in
+        # cost-related effects, which we can then ignore safely
+        cost_related_functions = identify_cost_related_functions(problem)
+
         # Process all atoms in the initial state, e.g. "on(b1, b2)."
         for atom in problem.init.as_atoms():
             if isinstance(atom, tuple) and isinstance(atom[0], CompoundTerm) and atom[0].symbol.symbol == 'total-cost':
@@ -82,25 +164,14 @@ class ReachabilityLPCompiler:
                     f'ReachabilityLPCompiler cannot handle functional atom "{t} := {v}" in the initial state')
             lp.rule(self.tarski_atom_to_lp_atom(atom))
 
-        # Process all actions
-        for _, action in problem.actions.items():
-            if all(len(list(v.sort.domain())) > 0 for v in action.parameters):
-                # We process only those actions such that all their parameter types have at least one object
-                self.process_action(action, lang, lp)
-
-        # Process all derived predicates
-        # TODO To be implemented yet
-        assert not problem.derived_predicates
-
-        self.process_goal(problem.goal, lang, lp)
-
-        # self.add_directives(problem, lp)
+    def create_goal(self):
+        self.process_goal(self.problem.goal, self.problem.language, self.lp)
 
     def process_goal(self, goal, lang, lp):
         # Process goal, e.g. "goal :- on(a,b), on(b,c)." (note that the goal is always ground)
         phi = remove_quantifiers(lang, goal, QuantifierEliminationMode.Forall)
         body = self.process_formula(phi)
-        lp.rule(self.lp_atom(GOAL), body)
+        self.rule(lp, self.lp_atom(GOAL), body)
 
     def process_action(self, action, lang, lp):
         # Construct the part of the action rule including action atom plus types,
@@ -115,13 +186,13 @@ class ReachabilityLPCompiler:
         # Remove universal quantifiers and add precondition atoms to the body
         phi = remove_quantifiers(lang, action.precondition, QuantifierEliminationMode.Forall)
         body += self.process_formula(phi)  # e.g. "clear(X), on(X, Y)"
-        lp.rule(action_head, body)
+        self.rule(lp, action_head, body)
         # Now process the effects
         for eff in action.effects:
             for expanded in expand_universal_effect(eff):
                 head, body = self.process_effect(lang, expanded, action.name)
                 if head is not None:
-                    lp.rule(head, [action_atom] + body)
+                    self.rule(lp, head, [action_atom] + body)
         return action_atom
 
     def process_action_cost(self, action, action_atom, parameters_types, lp):
@@ -176,7 +247,7 @@ class ReachabilityLPCompiler:
                 varbinding = [self.lp_type_atom_from_term(v) for v in variables]
                 sub = [self.process_formula(s) for s in f.subformulas]
                 for body in sub:
-                    self.lp.rule(aux, body + varbinding)
+                    self.rule(self.lp, aux, body + varbinding)
                 return [aux]
 
             elif f.connective == Connective.Not:
@@ -201,7 +272,7 @@ class ReachabilityLPCompiler:
                 # Note that the type atom "object(x)" is needed for degenerate cases such as "Exist x True"
                 aux = self.gen_aux_atom()
                 varbinding = [self.lp_type_atom_from_term(v) for v in f.variables]
-                self.lp.rule(aux, self.process_formula(f.formula) + varbinding)
+                self.rule(self.lp, aux, self.process_formula(f.formula) + varbinding)
                 return [aux]
 
             else:
@@ -272,10 +343,12 @@ class ReachabilityLPCompiler:
 class VariableOnlyReachabilityLPCompiler(ReachabilityLPCompiler):
     """ A variation of the standard LP compiler that cares only about state variable, but not action, groundings. """
 
-    def __init__(self, problem: Problem, lp, include_variable_inequalities=False, include_action_costs=False):
+    def __init__(self, problem: Problem, lp, include_variable_inequalities=False, include_action_costs=False,
+                 split_rules=False):
         if include_action_costs:
             raise RuntimeError('Cannot generate a variable-only reachability LP that includes action costs')
-        super().__init__(problem, lp, include_variable_inequalities, include_action_costs=False)
+        super().__init__(problem, lp, include_variable_inequalities, include_action_costs=False,
+                         split_rules=split_rules)
 
     def process_action(self, action, lang, lp):
         # See & contrast with method in parent class
@@ -288,7 +361,7 @@ class VariableOnlyReachabilityLPCompiler(ReachabilityLPCompiler):
         for eff in action.effects:
             head, condeff_body = self.process_effect(lang, eff, action.name)
             if head is not None:
-                lp.rule(head, prec_body + condeff_body)
+                self.rule(lp, head, prec_body + condeff_body)
 
 
 class LPAtom:
@@ -301,13 +374,61 @@ class LPAtom:
     def __str__(self):
         """ Return a string of the form 'symbol(arg1, ..., argn)', or 'symbol()', if args is empty """
         if self.infix:
-            return "{} {} {}".format(self.args[0], self.symbol, self.args[1])
-        arglist = ", ".join(str(arg) for arg in _ensure_list(self.args))
-        return "{}({})".format(self.symbol, arglist)
+            return f"{self.args[0]} {self.symbol} {self.args[1]}"
+        return f"{self.symbol}({', '.join(map(str, _ensure_list(self.args)))})"
 
     __repr__ = __str__
 
 
+def split_rule(head, body, create_aux_atom):
+    """ Split the given rule into a list of equivalent (head, body) rules with at most two non-builtin atoms in their
+    bodies, by greedily joining pairs of body atoms into auxiliary atoms created with `create_aux_atom(args)`.
+    Each auxiliary atom keeps only those variables of the joined atoms that appear in the head, in some other body atom
+    or in some builtin comparison not yet applied; each comparison is applied in the first join where all of its
+    variables are bound. Of all possible pairs, we join first the one that results in the auxiliary atom with fewest
+    variables, and, in case of ties, the one with more variables in common. """
+    atoms = [a for a in body or [] if not a.infix]
+    comparisons = [a for a in body or [] if a.infix]
+    if len(atoms) <= 2:
+        return [(head, body)]
+
+    rules = []
+    while len(atoms) > 2:
+        candidates = (_join_candidate(head, atoms, comparisons, i, j)
+                      for i, j in itertools.combinations(range(len(atoms)), 2))
+        _, i, j, projected, applicable = min(candidates, key=lambda candidate: candidate[0])
+        aux = create_aux_atom(projected)
+        rules.append((aux, [atoms[i], atoms[j]] + applicable))
+        atoms = [a for k, a in enumerate(atoms) if k not in (i, j)] + [aux]
+        comparisons = [c for c in comparisons if c not in applicable]
+
+    rules.append((head, atoms + comparisons))
+    return rules
+
+
+def _join_candidate(head, atoms, comparisons, i, j):
+    """ Return a tuple (cost, i, j, projected, applicable) describing the join of the i-th and j-th of the given body
+    atoms into an auxiliary atom with variables `projected`, where `applicable` are the comparisons applied in the
+    join. """
+    joined = _lp_variables(atoms[i]) + [v for v in _lp_variables(atoms[j]) if v not in _lp_variables(atoms[i])]
+    needed = set(_lp_variables(head))
+    needed.update(v for k, atom in enumerate(atoms) if k not in (i, j) for v in _lp_variables(atom))
+    applicable = [c for c in comparisons if set(_lp_variables(c)) <= set(joined)]
+    needed.update(v for c in comparisons if c not in applicable for v in _lp_variables(c))
+    projected = [v for v in joined if v in needed]
+    shared = set(_lp_variables(atoms[i])) & set(_lp_variables(atoms[j]))
+    return (len(projected), -len(shared)), i, j, projected, applicable
+
+
+def _lp_variables(atom: LPAtom):
+    """ Return the list of distinct variables (i.e. capitalized arguments) of the given LP atom, in order. """
+    variables = []
+    for arg in atom.args:
+        if isinstance(arg, str) and arg[:1].isupper() and arg not in variables:
+            variables.append(arg)
+    return variables
+
+
 def negate_lp_atom(atom: LPAtom):
     negated = symbol_complements.get(atom.symbol, None)
     if negated is not None:  # We have the negation of a builtin comparison symbol, e.g. p != q
@@ -349,20 +470,38 @@ class Translator:
     def __init__(self):
         self.d = dict()
         self.inv = dict()
+        self.cache = dict()  # All (name, prefix) pairs normalized so far, mapped to their (interned) translation
+        self.unchanged = set()  # The names that normalize to themselves
+
+    def copy(self):
+        """ Return a new translator with the same translations as this one, which can be extended independently. """
+        translator = Translator()
+        translator.d, translator.inv = dict(self.d), dict(self.inv)
+        translator.cache, translator.unchanged = dict(self.cache), set(self.unchanged)
+        return translator
 
     def normalize(self, name: str, prefix=''):
         """ Translate a given name and store the translation """
+        translated = self.cache.get((name, prefix))
+        if translated is None:
+            translated = self.cache[(name, prefix)] = sys.intern(self._normalize(name, prefix))
+        return translated
+
+    def _normalize(self, name: str, prefix):
         prefix = prefix + '_' if prefix else ''
         prefixed = prefix + name
 
         translated = self.d.get(prefixed, None)
         if translated is None:
             translated = prefix + sanitize(name)
-            if prefixed in self.inv or translated in self.inv:
+            if prefixed in self.inv or translated in self.inv or \
+                    (translated != prefixed and translated in self.unchanged):
                 raise RuntimeError(f'Sanitization of STRIPS name "{name}" for ASP purposes would create a name clash')
 
             if translated != prefixed:
                 translated = self._insert(prefixed, translated)
+            else:
+                self.unchanged.add(translated)
         return translated
 
     def _insert(self, k, v):
@@ -389,6 +528,19 @@ class LogicProgram:
     def directive(self, directive):
         self.directives.append(directive)
 
+    def text(self):
+        """ Return the whole text of the program, with one rule or directive per line. """
+        return "\n".join(itertools.chain(self.rules, map(str, self.directives), [""]))
+
+    def write(self, fd):
+        """ Write the program into the given file-like object, with a single call to its `write` method. """
+        fd.write(self.text())
+
+    def dump(self, filename):
+        """ Write the program into the file with the given name, which is gzip-compressed if the name ends in ".gz". """
+        with (gzip.open(filename, 'wt') if filename.endswith('.gz') else open(filename, 'w')) as f:
+            self.write(f)
+
 
 class InFileLogicProgram:
     def __init__(self, fd):
@@ -400,7 +552,7 @@ class InFileLogicProgram:
 
 def _print_rule(head, body):
     assert body is None or isinstance(body, (list, tuple))
-    return "{}.".format(head) if body is None else "{} :- {}.".format(head, _print_body(body))
+    return f"{head}." if body is None else f"{head} :- {_print_body(body)}."
 
 
 def _print_body(body):
@@ -1,30 +1,93 @@
 import logging
 import os
 import shutil
+import sys
 import tempfile
 from collections import defaultdict
 
+from .. import modules
 from ..errors import CommandNotFoundError, ExternalCommandError, OutOfMemoryError, OutOfTimeError
 from ..utils import command as cmd
 
 
-def run_clingo(lp):
+def solve_lp(lp, symbol_mapping):
+    """ Ground the given logic program and return its (unique) model, in the format returned by `parse_model`.
+    The program is grounded in-process with the clingo Python module, if available, or else with the gringo binary. """
+    return _collect_model(iterate_lp_solution(lp, symbol_mapping))
+
+
+def iterate_lp_solution(lp, symbol_mapping):
+    """ Ground the given logic program and iterate over the (symbol, arguments) pairs of the atoms in its model,
+    as they are produced, without storing the whole model in memory. """
+    if is_clingo_module_available():
+        yield from iterate_clingo_module_model(lp, symbol_mapping)
+        return
+
+    model_filename, _ = run_clingo(lp, pipe=True)
+    try:
+        yield from iterate_model(model_filename, symbol_mapping)
+    finally:
+        # Remove the output file of Gringo
+        cmd.silentremove(model_filename)
+
+
+def is_clingo_module_available():
+    try:
+        modules.import_clingo()
+    except ImportError:
+        return False
+    return True
+
+
+def ground_with_clingo_module(lp, symbol_mapping):
+    """ Ground the given logic program with the clingo Python module, and return its model as a map from (translated
+    back) predicate names to sets of tuples of (translated back) arguments, as in `parse_model`. """
+    return _collect_model(iterate_clingo_module_model(lp, symbol_mapping))
+
+
+def iterate_clingo_module_model(lp, symbol_mapping):
+    """ Ground the given logic program with the clingo Python module, and iterate over the (symbol, arguments) pairs of
+    the atoms in its model. """
+    clingo = modules.import_clingo()
+    back = cached_back_translation(symbol_mapping)
+    control = clingo.Control(["--warn=none"])
+    try:
+        control.add("base", [], lp.text())
+        control.ground([("base", [])])
+    except MemoryError:
+        raise OutOfMemoryError("Clingo ran out of memory while grounding the logic program") from None
+    except RuntimeError as e:
+        raise ExternalCommandError(f"Unknown Clingo error while grounding the logic program: {e}") from None
+
+    for atom in control.symbolic_atoms:
+        if atom.is_fact:
+            symbol = atom.symbol
+            yield back(symbol.name), tuple(back(str(a)) for a in symbol.arguments)
+
+
+def run_clingo(lp, pipe=False):
+    """ Ground the given logic program with the gringo binary, and return the names of the files with the solution
+    and with the program. If `pipe` is true, the program is piped into the standard input of gringo instead of being
+    written to a file, and None is returned as the name of the program file. """
     gringo = shutil.which("gringo")
     if gringo is None:
         raise CommandNotFoundError("gringo")
 
-    with tempfile.NamedTemporaryFile(mode='w+t', delete=False) as f:
-        _ = [print(str(r), file=f) for r in lp.rules]
-        _ = [print(str(r), file=f) for r in lp.directives]
-        theory_filename = f.name
+    text = lp.text()
+    theory_filename = None
+    if not pipe:
+        with tempfile.NamedTemporaryFile(mode='w+t', delete=False) as f:
+            f.write(text)
+            theory_filename = f.name
 
     logging.debug('Using gringo binary found in "{}"'.format(gringo))
     errlog = ''
     with tempfile.NamedTemporaryFile(mode='w+t', delete=False) as f:
         with tempfile.NamedTemporaryFile(mode='w+t', delete=False) as stderr:
             # Option "-t" enforces an easier-to-parse textual output. Warnings could also be supressed with
-            # option "-Wno-atom-undefined"
-            retcode = cmd.execute([gringo, "-t", theory_filename], stdout=f, stderr=stderr)
+            # option "-Wno-atom-undefined". Without input files, gringo reads the program from its standard input.
+            arguments = [gringo, "-t"] if pipe else [gringo, "-t", theory_filename]
+            retcode = cmd.execute(arguments, stdout=f, stderr=stderr, input=text.encode() if pipe else None)
             model_filename = f.name
             if retcode == 0:
                 return model_filename, theory_filename
@@ -42,20 +105,43 @@ def run_clingo(lp):
 
 
 def parse_model(filename, symbol_mapping):
-    tr = symbol_mapping
-    model = defaultdict(set)
+    return _collect_model(iterate_model(filename, symbol_mapping))
+
+
+def iterate_model(filename, symbol_mapping):
+    """ Iterate over the (symbol, arguments) pairs of the atoms in the given Gringo output file, translated back
+    through the given symbol mapping. Translated names are interned, so that repeated constants share a single string
+    object across the whole model. """
+    back = cached_back_translation(symbol_mapping)
     with open(filename, "r") as f:
         for line in f:
             data = line.rstrip(' \n.').rstrip(')')
             components = data.split('(')
             if len(components) == 1:
-                symbol = tr.back(components[0])
-                model[symbol].add(())
+                yield back(components[0]), ()
             elif len(components) == 2:
                 symbol, arguments = components
-                model[tr.back(symbol)].add(tuple(tr.back(s) for s in arguments.split(',')))
+                yield back(symbol), tuple(back(s) for s in arguments.split(','))
             else:
                 # No nested terms expected, so there should be at most 2 components
                 raise RuntimeError('Unexpected line "{}" in Clingo solution file'.format(line))
 
+
+def _collect_model(atoms):
+    model = defaultdict(set)
+    for symbol, arguments in atoms:
+        model[symbol].add(arguments)
     return model
+
+
+def cached_back_translation(symbol_mapping):
+    """ Return a function that translates back (and interns) the names of the given symbol mapping (e.g. an ASP
+    `Translator`), caching the translation of each name. """
+    cache = dict()
+
+    def back(name):
+        translated = cache.get(name)
+        if translated is None:
+            translated = cache[name] = sys.intern(symbol_mapping.back(name))
+        return translated
+    return back
@@ -0,0 +1,343 @@
+"""
+ A pure-Python, semi-naive evaluator for the Datalog programs that we generate for relaxed reachability analysis
+ (see `asp.ReachabilityLPCompiler`). These programs are positive, possibly recursive, and have no function symbols,
+ so their unique model can be computed by iterating the rules up to a fixpoint, which we do in the semi-naive
+ fashion: in each round, rules are only joined on bindings that involve at least one atom derived in the previous
+ round. Joins are performed through hash indexes on the bound positions of each body atom, built lazily.
+"""
+import itertools
+from collections import defaultdict
+
+from ..errors import TarskiError
+from .asp import LPAtom
+from .clingo_wrapper import cached_back_translation
+
+
+class DatalogProgram:
+    """ A logic program with the same interface as `asp.LogicProgram`, but that keeps its rules as (head, body)
+    pairs of `LPAtom` objects, instead of printing them, so that they can be evaluated with `DatalogEvaluator`. """
+    def __init__(self):
+        self.rules = []
+        self.directives = []
+
+    def rule(self, head, body=None):
+        if not isinstance(head, LPAtom) or not all(isinstance(atom, LPAtom) for atom in body or []):
+            raise TarskiError(f'Datalog programs can only contain rules made up of LP atoms, but got rule '
+                              f'"{head} :- {body}"')
+        self.rules.append((head, list(body or [])))
+
+    def nrules(self):
+        return len(self.rules)
+
+    def directive(self, directive):
+        self.directives.append(directive)
+
+
+def solve_datalog(program, symbol_mapping):
+    """ Return the model of the given Datalog program, in the same format returned by `clingo_wrapper.solve_lp`. """
+    model = defaultdict(set)
+    for symbol, arguments in iterate_datalog_solution(program, symbol_mapping):
+        model[symbol].add(arguments)
+    return model
+
+
+def iterate_datalog_solution(program, symbol_mapping):
+    """ Compute the model of the given Datalog program, and iterate over the (symbol, arguments) pairs of its atoms,
+    translated back through the given symbol mapping. """
+    yield from iterate_datalog_model(DatalogEvaluator(program).evaluate(), symbol_mapping)
+
+
+def iterate_datalog_model(model, symbol_mapping):
+    """ Iterate over the (symbol, arguments) pairs of the atoms in the given model, as returned by
+    `DatalogEvaluator.evaluate`, translated back through the given symbol mapping. """
+    back = cached_back_translation(symbol_mapping)
+    for (symbol, _), tuples in model.items():
+        name = back(symbol)
+        for arguments in tuples:
+            yield name, tuple(back(a) for a in arguments)
+
+
+class DatalogEvaluator:
+    """ A semi-naive evaluator of a `DatalogProgram`. Relations are identified by (symbol, arity) pairs. Following
+    the ASP convention, rule arguments starting with an uppercase letter are variables, and the rest are constants;
+    builtin (infix) atoms such as "X != Y" act as filters on the bindings of the rule.
+
+    Further rules can be added to an evaluator after computing its model, in which case the next evaluation resumes
+    from the model computed so far. An evaluator can also be created on top of the model computed by some `base`
+    evaluator, whose relations are then shared, as long as the rules of the new evaluator derive no atom on them.
+    """
+    def __init__(self, program=None, base=None):
+        if program is not None and program.directives:
+            raise TarskiError('Datalog programs with directives are not supported')
+        self.relations = dict() if base is None else dict(base.relations)
+        self.shared = set() if base is None else set(base.relations.keys())
+        self.rules = []
+        self.pending = []  # The rules that have not been evaluated on the model computed so far
+        if program is not None:
+            self.add_rules(program.rules)
+
+    def add_rules(self, rules):
+        """ Add the given (head, body) rules of LP atoms to the program. """
+        for head, body in rules:
+            rule = _Rule(head, body)
+            if rule.head in self.shared:
+                raise TarskiError(f'Datalog rule with head "{head}" would derive atoms of a shared relation')
+            for key in [rule.head] + [atom.key for atom in rule.atoms]:
+                if key not in self.relations:
+                    self.relations[key] = _Relation()
+            self.rules.append(rule)
+            self.pending.append(rule)
+
+    def copy(self):
+        """ Return an evaluator with the same rules as this one, and a copy of the model computed so far, which can
+        then be extended without affecting this evaluator. """
+        evaluator = DatalogEvaluator()
+        evaluator.relations = {key: relation.copy() for key, relation in self.relations.items()}
+        evaluator.rules, evaluator.pending = list(self.rules), list(self.pending)
+        return evaluator
+
+    def evaluate(self):
+        """ Compute the model of the program, and return it as a dictionary mapping each relation (symbol, arity)
+        pair to the set of tuples in it. """
+        # Rules that have just been added are first joined over the whole model computed so far
+        derived = defaultdict(set)
+        for rule in self.pending:
+            rule.fire(None, self.relations, derived)
+        self.pending = []
+
+        while True:
+            for key, relation in self.relations.items():
+                relation.advance(derived.get(key, set()))
+            if not derived:
+                break
+
+            derived = defaultdict(set)
+            for rule in self.rules:
+                for i, atom in enumerate(rule.atoms):
+                    if self.relations[atom.key].delta:
+                        rule.fire(i, self.relations, derived)
+
+        return {key: relation.stable for key, relation in self.relations.items()}
+
+
+class _Relation:
+    """ The tuples of a relation, split into the "stable" tuples, derived before the previous round of the
+    evaluation, and the "delta" tuples, derived in the previous round. Both sets have their own hash indexes. """
+    def __init__(self):
+        self.stable = set()
+        self.delta = set()
+        self.indexes = dict()
+        self.delta_indexes = dict()
+
+    def __contains__(self, item):
+        return item in self.stable or item in self.delta
+
+    def copy(self):
+        relation = _Relation()
+        relation.stable, relation.delta = set(self.stable), set(self.delta)
+        return relation
+
+    def advance(self, derived):
+        """ Move the current delta tuples into the stable set, and make the given tuples the new delta. """
+        for positions, index in self.indexes.items():
+            for t in self.delta:
+                index.setdefault(tuple(t[p] for p in positions), []).append(t)
+        self.stable.update(self.delta)
+        self.delta = derived
+        self.delta_indexes = dict()
+
+    def lookup(self, positions, key, source):
+        """ Return the tuples of the given source (_STABLE, _DELTA or _ALL) that have the given key values in the
+        given positions. """
+        if source == _ALL:
+            return itertools.chain(self._lookup(positions, key, False), self._lookup(positions, key, True))
+        return self._lookup(positions, key, source == _DELTA)
+
+    def _lookup(self, positions, key, delta):
+        tuples = self.delta if delta else self.stable
+        if not positions:
+            return tuples
+        indexes = self.delta_indexes if delta else self.indexes
+        index = indexes.get(positions)
+        if index is None:
+            index = indexes[positions] = dict()
+            for t in tuples:
+                index.setdefault(tuple(t[p] for p in positions), []).append(t)
+        return index.get(key, [])
+
+
+# The sources from which a body atom can take its tuples in a semi-naive evaluation round
+_STABLE, _DELTA, _ALL = range(3)
+
+
+class _Rule:
+    """ A Datalog rule compiled for semi-naive evaluation. Rule variables are mapped to integer slots of a binding
+    list, and all constants are represented as strings. """
+    def __init__(self, head: LPAtom, body):
+        self.slots = dict()
+        self.atoms = [_BodyAtom(atom.symbol, [self.term(a) for a in atom.args]) for atom in body if not atom.infix]
+        self.comparisons = [(_comparisons[atom.symbol], self.term(atom.args[0]), self.term(atom.args[1]))
+                            for atom in body if atom.infix]
+        self.head = (head.symbol, len(head.args))
+        self.head_args = [self.term(a) for a in head.args]
+        self.plans = dict()  # The join plans of the rule, indexed by the position of the atom taken from the delta
+
+        unbound = [a for a in self.head_args if isinstance(a, int) and not self._binds(a)]
+        if unbound:
+            raise TarskiError(f'Unsafe variables in Datalog rule "{head} :- {", ".join(map(str, body))}"')
+
+    def term(self, arg):
+        """ Return the slot of the given rule argument, if a variable, or its string value, if a constant. """
+        arg = str(arg)
+        if not arg[0].isupper():
+            return arg
+        return self.slots.setdefault(arg, len(self.slots))
+
+    def _binds(self, slot):
+        return any(slot in atom.args for atom in self.atoms) or \
+            any(op is _eq and slot in (lhs, rhs) for op, lhs, rhs in self.comparisons)
+
+    def fire(self, delta, relations, derived):
+        """ Derive all head atoms that result from joining the body atom in position `delta` with the delta tuples
+        of its relation (or from joining all body atoms over all known tuples, if `delta` is None), and add to
+        `derived` those that are not yet known. """
+        plan = self.plans.get(delta)
+        if plan is None:
+            plan = self.plans[delta] = self._create_plan(delta)
+        known, new = relations[self.head], derived[self.head]
+        head_args = self.head_args
+
+        def emit(values):
+            atom = tuple(values[a] if isinstance(a, int) else a for a in head_args)
+            if atom not in known:
+                new.add(atom)
+
+        _execute(plan, 0, [None] * len(self.slots), relations, emit)
+
+    def _create_plan(self, delta):
+        """ Return a list of join steps that computes all bindings of the rule in which the atom in position `delta`
+        is taken from the delta tuples of its relation. Atoms preceding it are taken from all known tuples, and atoms
+        following it only from the stable ones, so that no binding is computed in more than one round. The remaining
+        atoms are greedily joined in order of decreasing number of bound arguments, and comparisons are checked as
+        soon as their variables are bound. """
+        steps, bound = [], set()
+        pending = [i for i in range(len(self.atoms)) if i != delta]
+        comparisons = list(self.comparisons)
+        order = [] if delta is None else [delta]
+
+        while True:
+            for i in order:
+                atom = self.atoms[i]
+                source = _DELTA if i == delta else (_ALL if delta is None or i < delta else _STABLE)
+                steps.append(atom.create_step(bound, source))
+                bound.update(a for a in atom.args if isinstance(a, int))
+            steps += _pop_comparison_steps(comparisons, bound)
+            if not pending:
+                break
+            best = max(pending, key=lambda j: sum(1 for a in self.atoms[j].args
+                                                  if not isinstance(a, int) or a in bound))
+            pending.remove(best)
+            order = [best]
+
+        if comparisons:
+            raise TarskiError(f'Unsafe variables in the comparisons of Datalog rule with head "{self.head[0]}"')
+        return steps
+
+
+class _BodyAtom:
+    def __init__(self, symbol, args):
+        self.key = (symbol, len(args))
+        self.args = args
+
+    def create_step(self, bound, source):
+        """ Return a join step that retrieves the tuples of this atom consistent with the bindings of the given
+        variables, and binds the rest of its variables. """
+        key, binds, checks, seen = [], [], [], set()
+        for position, arg in enumerate(self.args):
+            if not isinstance(arg, int) or arg in bound:
+                key.append((position, arg))
+            elif arg in seen:
+                checks.append((position, arg))  # A variable appearing more than once in the atom
+            else:
+                binds.append((position, arg))
+                seen.add(arg)
+        positions = tuple(p for p, _ in key)
+        return _JOIN, self.key, positions, [a for _, a in key], source, binds, checks
+
+
+def _pop_comparison_steps(comparisons, bound):
+    """ Remove from the given list and return as steps the comparisons that can be performed once the given variables
+    are bound. An equality with a single unbound variable binds that variable. """
+    steps = []
+    progress = True
+    while progress:
+        progress = False
+        for comparison in list(comparisons):
+            op, lhs, rhs = comparison
+            unbound = [a for a in (lhs, rhs) if isinstance(a, int) and a not in bound]
+            if not unbound:
+                steps.append((_FILTER, op, lhs, rhs))
+            elif op is _eq and len(unbound) == 1 and lhs != rhs:
+                target, value = (lhs, rhs) if lhs in unbound else (rhs, lhs)
+                steps.append((_ASSIGN, target, value))
+                bound.add(target)
+                progress = True
+            else:
+                continue
+            comparisons.remove(comparison)
+    return steps
+
+
+_JOIN, _FILTER, _ASSIGN = range(3)
+
+
+def _execute(steps, i, values, relations, emit):
+    if i == len(steps):
+        emit(values)
+        return
+
+    step = steps[i]
+    kind = step[0]
+    if kind == _JOIN:
+        _, relation, positions, key, source, binds, checks = step
+        key = tuple(values[a] if isinstance(a, int) else a for a in key)
+        for t in relations[relation].lookup(positions, key, source):
+            for position, slot in binds:
+                values[slot] = t[position]
+            if all(t[position] == values[slot] for position, slot in checks):
+                _execute(steps, i + 1, values, relations, emit)
+
+    elif kind == _FILTER:
+        _, op, lhs, rhs = step
+        lhs = values[lhs] if isinstance(lhs, int) else lhs
+        rhs = values[rhs] if isinstance(rhs, int) else rhs
+        if op(_value(lhs), _value(rhs)):
+            _execute(steps, i + 1, values, relations, emit)
+
+    else:
+        _, target, value = step
+        values[target] = values[value] if isinstance(value, int) else value
+        _execute(steps, i + 1, values, relations, emit)
+
+
+def _value(constant):
+    """ Return a key to compare constants as ASP solvers do: integers numerically, before all symbolic constants,
+    which are compared lexicographically. """
+    try:
+        return 0, int(constant), ''
+    except ValueError:
+        return 1, 0, constant
+
+
+def _eq(x, y):
+    return x == y
+
+
+_comparisons = {
+    "=": _eq,
+    "!=": lambda x, y: x != y,
+    "<": lambda x, y: x < y,
+    "<=": lambda x, y: x <= y,
+    ">": lambda x, y: x > y,
+    ">=": lambda x, y: x >= y,
+}
@@ -1,3 +1,5 @@
 
 from .model import SearchModel, GroundForwardSearchModel
 from .blind import BreadthFirstSearch
+from .state import PackedModel, PackedStateLayout, create_packed_layout
+from .applicability import SuccessorGenerator
@@ -0,0 +1,135 @@
+"""
+ Efficient computation of the set of ground operators that are applicable in a given state.
+"""
+from ..grounding.common import StateVariableLite
+from ..evaluators.compiled import compile as compile_expression
+from ..evaluators.simple import evaluate
+from ..model import Model
+from ..syntax import Atom, Constant, CompoundFormula, Connective, Tautology, Contradiction, builtins
+from ..util import SymbolIndex
+
+
+class SuccessorGenerator:
+    """ A successor generator in the style of Fast Downward's, based on a decision tree that is compiled from the
+    operator preconditions. Each inner node of the tree tests the truth value of one ground atom, and has three
+    children: one with the operators that require the atom to be true, one with those that require it to be false,
+    and one with those that don't care about the atom. Enumerating the applicable operators in a state then only
+    requires following the branches that are consistent with the state.
+
+    Only operators whose precondition is a conjunction of ground literals can be compiled into the tree; applicability
+    of the rest of the operators is checked by evaluating their (compiled) precondition in each state.
+    """
+    def __init__(self, operators):
+        self.operators = list(operators)
+        self.variables = SymbolIndex()  # The ground atoms tested by the decision tree
+        self.generic = []  # The indexes of the operators that could not be compiled into the tree
+        self.empty = Model(self.operators[0].language) if self.operators else None
+
+        compiled = []
+        for i, op in enumerate(self.operators):
+            literals = self._compile_precondition(op.precondition)
+            if literals is None:
+                self.generic.append(i)
+            elif literals is not False:  # i.e. the operator is not trivially inapplicable
+                compiled.append((i, literals))
+
+        self.root = _build_decision_tree(compiled)
+        self.generic_preconditions = [(i, compile_expression(self.operators[i].precondition)) for i in self.generic]
+
+    def _compile_precondition(self, precondition):
+        """ Return a list of (atom index, value) pairs, sorted by atom index, representing the given precondition,
+        or None if the precondition is not a conjunction of ground literals. Return False if the precondition can be
+        statically determined to be false. """
+        if isinstance(precondition, Tautology):
+            return []
+        if isinstance(precondition, Contradiction):
+            return False
+
+        conjuncts = precondition.subformulas \
+            if isinstance(precondition, CompoundFormula) and precondition.connective == Connective.And \
+            else [precondition]
+
+        literals = dict()
+        for conjunct in conjuncts:
+            value = True
+            if isinstance(conjunct, CompoundFormula) and conjunct.connective == Connective.Not:
+                conjunct, value = conjunct.subformulas[0], False
+
+            if not isinstance(conjunct, Atom) or not all(isinstance(t, Constant) for t in conjunct.subterms):
+                return None
+
+            if builtins.is_builtin_predicate(conjunct.predicate):
+                # Comparisons between constants have a fixed truth value, which we can evaluate right away
+                if evaluate(conjunct, self.empty) != value:
+                    return False
+                continue
+
+            variable = StateVariableLite.from_atom(conjunct)
+            if variable not in self.variables:
+                self.variables.add(variable)
+            index = self.variables.get_index(variable)
+            if literals.setdefault(index, value) != value:
+                return False  # The precondition contains both some atom and its negation
+        return sorted(literals.items())
+
+    def applicable(self, state):
+        """ Return a list with all operators that are applicable in the given state, in the order in which they were
+        given to the generator. """
+        indexes = [i for i, precondition in self.generic_preconditions if precondition(state)]
+        values = dict()
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            indexes += node.immediate
+            if node.variable is None:
+                continue
+            value = values.get(node.variable)
+            if value is None:
+                atom = self.variables.get_object(node.variable)
+                value = values[node.variable] = state.holds(atom.symbol, atom.binding)
+            stack.append(node.dontcare)
+            stack.append(node.positive if value else node.negative)
+
+        indexes.sort()
+        return [self.operators[i] for i in indexes]
+
+
+class _DecisionNode:
+    def __init__(self, immediate):
+        self.immediate = immediate  # The operators whose preconditions are all satisfied when reaching this node
+        self.variable = None  # The index of the atom tested in this node, if any
+        self.positive = self.negative = self.dontcare = None
+
+
+def _build_decision_tree(entries):
+    """ Build the decision tree for the given list of (operator index, sorted literal list) entries. The tree is
+    built iteratively, as the tree can be much deeper than Python's default recursion limit. """
+    root = _DecisionNode([])
+    stack = [(root, entries)]
+    while stack:
+        node, entries = stack.pop()
+        node.immediate = [i for i, literals in entries if not literals]
+        pending = [(i, literals) for i, literals in entries if literals]
+        if not pending:
+            continue
+
+        # Test the lowest-indexed atom that is still untested in some of the operators of this node
+        node.variable = min(literals[0][0] for _, literals in pending)
+        positive, negative, dontcare = [], [], []
+        for i, literals in pending:
+            var, value = literals[0]
+            if var != node.variable:
+                dontcare.append((i, literals))
+            elif value:
+                positive.append((i, literals[1:]))
+            else:
+                negative.append((i, literals[1:]))
+
+        for attribute, children in (('positive', positive), ('negative', negative), ('dontcare', dontcare)):
+            if children:
+                child = _DecisionNode([])
+                setattr(node, attribute, child)
+                stack.append((child, children))
+    return root
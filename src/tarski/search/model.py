@@ -1,6 +1,7 @@
 
-from .operations import is_applicable, progress
-from ..evaluators.simple import evaluate
+from .applicability import SuccessorGenerator
+from .operations import progress
+from ..evaluators.compiled import compile as compile_expression
 
 
 class SearchModel:
@@ -25,16 +26,24 @@ class GroundForwardSearchModel:
     and for use in low-performance environments.
     """
 
-    def __init__(self, problem, operators):
+    def __init__(self, problem, operators, layout=None):
+        """ If a PackedStateLayout is given, search states will be represented as PackedModel objects with that
+        layout, which are much cheaper to hash and compare than standard models. """
         self.problem = problem
         self.operators = operators
+        self.layout = layout
+        self.successor_generator = SuccessorGenerator(operators)
+        self.goal = compile_expression(problem.goal)
 
     def init(self):
+        if self.layout is not None:
+            return self.layout.pack(self.problem.init)
         return self.problem.init
 
     def applicable(self, state):
-        """ Return a generator with all ground operators that are applicable in the given state. """
-        return (op for op in self.operators if is_applicable(state, op))
+        """ Return a list with all ground operators that are applicable in the given state, in the order in which they
+        were given to the search model. """
+        return self.successor_generator.applicable(state)
 
     def successors(self, state):
         """ Return a generator with all tuples (op, successor) for successors of the given state. """
@@ -42,4 +51,4 @@ class GroundForwardSearchModel:
 
     def is_goal(self, state):
         """ Return whether the given state is a goal"""
-        return evaluate(self.problem.goal, state)  # Just interpret the goal formula on the state
+        return self.goal(state)
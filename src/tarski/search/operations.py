@@ -1,5 +1,3 @@
-import copy
-
 from ..fstrips import AddEffect, DelEffect, FunctionalEffect, UniversalEffect
 from ..evaluators.simple import evaluate
 from ..fstrips.representation import substitute_expression
@@ -41,13 +39,27 @@ def apply_effect(model, effect):
 def progress(state, operator):
     """ Returns the progression of the given state along the effects of the given operator.
     Note that this method does not check that the operator is applicable.
+    The returned state shares with the given state the extensions of all symbols that are not affected by the
+    operator, hence the given state should not be modified afterwards.
     """
-    # TODO This is unnecessarily expensive, but a simple copy wouldn't work either.
-    #      If/when we transition towards a C++-backed model implementation, this should be improved.
-    sprime = copy.deepcopy(state)
+    sprime = state.copy_on_write(collect_affected_signatures(operator.effects))
 
     # Let's push to the beginning the delete effect, to ensure add-after-delete semantics
     effects = sorted(operator.effects, key=lambda e: 0 if isinstance(e, DelEffect) else 1)
     for eff in effects:
         apply_effect(sprime, eff)
     return sprime
+
+
+def collect_affected_signatures(effects, signatures=None):
+    """ Return the set of signatures of all predicate and function symbols whose extension can be modified by the
+    given effects. """
+    signatures = set() if signatures is None else signatures
+    for effect in effects:
+        if isinstance(effect, (AddEffect, DelEffect)):
+            signatures.add(effect.atom.predicate.signature)
+        elif isinstance(effect, FunctionalEffect):
+            signatures.add(effect.lhs.symbol.signature)
+        elif isinstance(effect, UniversalEffect):
+            collect_affected_signatures(effect.effects, signatures)
+    return signatures
@@ -0,0 +1,240 @@
+"""
+ A packed representation of search states, in which the value of every ground state variable of a problem is stored
+ in a flat buffer instead of in the set-based extensions of a standard Tarski Model.
+"""
+from .. import errors as err
+from ..grounding.common import StateVariableLite
+from ..model import Model, ExtensionalFunctionDefinition, _check_assignment, wrap_tuple
+from ..syntax import Function, CompoundTerm, Atom, Predicate, Constant
+
+
+class PackedStateLayout:
+    """ The layout shared by all packed states of a given problem. The layout maps each (predicative) state variable
+    to a bit of the state buffer, and each functional state variable to a slot of an array of values.
+    Any atom or term that is not a state variable of the layout is considered static, and its denotation is
+    looked up in the `static` model, which is shared by all states with this layout.
+    """
+    def __init__(self, language, variables, static=None):
+        """ Create a layout from a SymbolIndex of StateVariableLite objects, such as the ones returned by the
+        `ground_state_variables()` method of the different grounding strategies. """
+        self.language = language
+        self.variables = variables
+        self.static = static if static is not None else Model(language)
+        self.atoms = dict()  # A map from predicative state variables to bit positions
+        self.terms = dict()  # A map from functional state variables to positions in the array of values
+        for _, variable in variables.enumerate():
+            if isinstance(variable.symbol, Function):
+                self.terms[variable] = len(self.terms)
+            else:
+                self.atoms[variable] = len(self.atoms)
+        self.nbytes = (len(self.atoms) + 7) // 8
+        self.positions = dict()  # A map from each fluent symbol signature to the list of its state variable positions
+        for mapping in (self.atoms, self.terms):
+            for variable, position in mapping.items():
+                self.positions.setdefault(variable.symbol.signature, []).append((variable, position))
+        self.fluent_symbols = {v.symbol.signature for v in self.atoms} | {v.symbol.signature for v in self.terms}
+
+    def pack(self, model: Model):
+        """ Return a packed copy of the given (standard) model. Atoms and terms of the model that are not state
+        variables of this layout are ignored, as their denotation is assumed to be given by the static model. """
+        packed = PackedModel(self, evaluator=model.evaluator)
+        for signature, extension in model.predicate_extensions.items():
+            if signature in self.fluent_symbols:
+                predicate = self.language.get_predicate(signature[0])
+                for point in extension:
+                    packed.add(predicate, *(ref.expr for ref in point))
+
+        for signature, definition in model.function_extensions.items():
+            if signature in self.fluent_symbols:
+                function = self.language.get_function(signature[0])
+                for point, value in definition.data.items():
+                    packed.set(function(*(ref.expr for ref in point)), value)
+        return packed
+
+    def __str__(self):
+        return f'PackedStateLayout[{len(self.atoms)} atoms, {len(self.terms)} terms]'
+    __repr__ = __str__
+
+
+def create_packed_layout(problem, variables):
+    """ Create a layout for the states of the given problem, with the given index of state variables.
+    The extensions in the initial state of the problem of those symbols that have no state variable in the index are
+    taken as the static part of the layout. """
+    fluent_symbols = {v.symbol.signature for v in variables}
+    static = Model(problem.language)
+    for signature, extension in problem.init.predicate_extensions.items():
+        if signature not in fluent_symbols:
+            static.predicate_extensions[signature] = set(extension)
+
+    for signature, definition in problem.init.function_extensions.items():
+        if signature not in fluent_symbols:
+            static.function_extensions[signature] = definition.copy()
+
+    return PackedStateLayout(problem.language, variables, static)
+
+
+class PackedModel:
+    """ A model with the same interface as the standard Tarski Model, but which stores the truth value of each
+    predicative state variable as a single bit of a bytearray. Equality and hashing work directly on the underlying
+    buffer, which makes packed models suitable for duplicate detection in search algorithms.
+
+    Note that all packed models that are compared with each other are expected to share the same layout.
+    """
+    def __init__(self, layout: PackedStateLayout, bits=None, values=None, evaluator=None):
+        self.layout = layout
+        self.evaluator = evaluator
+        self.bits = bits if bits is not None else bytearray(layout.nbytes)
+        self.values = values if values is not None else [None] * len(layout.terms)
+
+    @property
+    def language(self):
+        return self.layout.language
+
+    def _atom_position(self, predicate, point):
+        if not all(isinstance(c, Constant) for c in point):
+            return None  # Only points made up of constants can correspond to state variables
+        return self.layout.atoms.get(StateVariableLite(predicate, tuple(point)))
+
+    def _fluent_atom_position(self, predicate, point):
+        position = self._atom_position(predicate, point)
+        if position is None:
+            raise err.SemanticError(f'Atom "{predicate.symbol}{point}" is not a state variable of {self.layout}')
+        return position
+
+    def _removable_atom_position(self, predicate, args):
+        """ Return the position of the state variable of the given atom, as in `Model.remove`, or None if the atom is
+        not a state variable and it is false in the static part of the layout. """
+        if isinstance(predicate, Atom):
+            args = predicate.subterms
+            predicate = predicate.predicate
+        point, _ = _check_assignment(predicate, args)
+        position = self._atom_position(predicate, point)
+        if position is None and self.layout.static.holds(predicate, point):
+            raise err.SemanticError(f'Cannot remove atom "{predicate.symbol}{point}" from the static part of '
+                                    f'{self.layout}')
+        return position
+
+    def add(self, predicate, *args):
+        """ Set to true the state variable corresponding to the given atom. """
+        if isinstance(predicate, Atom):
+            args = predicate.subterms
+            predicate = predicate.predicate
+        point, _ = _check_assignment(predicate, args)
+        position = self._fluent_atom_position(predicate, point)
+        self.bits[position >> 3] |= 1 << (position & 7)
+
+    def remove(self, predicate, *args):
+        """ Set to false the state variable corresponding to the given atom.
+        Raises KeyError if the atom was not true in the model. """
+        position = self._removable_atom_position(predicate, args)
+        if position is None or not self.bits[position >> 3] & (1 << (position & 7)):
+            raise KeyError(args)
+        self.bits[position >> 3] &= ~(1 << (position & 7))
+
+    def discard(self, predicate, *args):
+        """ Set to false the state variable corresponding to the given atom, if it was true.
+        Does not raise any exception if the atom was not true in the model. """
+        position = self._removable_atom_position(predicate, args)
+        if position is not None:
+            self.bits[position >> 3] &= ~(1 << (position & 7))
+
+    def holds(self, predicate, point):
+        """ Return true iff the given predicate is true on the given point in the current model """
+        position = self._atom_position(predicate, point)
+        if position is None:
+            return self.layout.static.holds(predicate, point)
+        return bool(self.bits[position >> 3] & (1 << (position & 7)))
+
+    def set(self, term: CompoundTerm, value):
+        """ Set the value of the interpretation on the given (functional) state variable to be equal to `value`. """
+        point, value = _check_assignment(term.symbol, tuple(term.subterms), value)
+        position = self.layout.terms.get(StateVariableLite(term.symbol, point))
+        if position is None:
+            raise err.SemanticError(f'Term "{term}" is not a state variable of {self.layout}')
+        self.values[position] = value
+
+    def value(self, fun: Function, point):
+        """ Return the value of the given function on the given point in the current model """
+        position = None
+        if all(isinstance(c, Constant) for c in point):
+            position = self.layout.terms.get(StateVariableLite(fun, tuple(point)))
+        if position is None:
+            return self.layout.static.value(fun, point)
+        value = self.values[position]
+        if value is None:
+            raise KeyError(point)
+        return value
+
+    def get_extension(self, symbol):
+        """ Return the extension of the given (predicate or function) symbol in the current model, with the same format
+        used by standard models. """
+        positions = self.layout.positions.get(symbol.signature)
+        if positions is None:
+            return self.layout.static.get_extension(symbol)
+
+        if isinstance(symbol, Predicate):
+            bits = self.bits
+            return {wrap_tuple(v.binding) for v, pos in positions if bits[pos >> 3] & (1 << (pos & 7))}
+
+        definition = ExtensionalFunctionDefinition()
+        for variable, position in positions:
+            if self.values[position] is not None:
+                definition.set(variable.binding, self.values[position])
+        return definition
+
+    def as_atoms(self):
+        """ Return a representation of the model as a list of atoms that are true, including static atoms. For
+        functional symbols f, return tuples of the form (f(o1, ..., on), value) """
+        atoms = self.layout.static.as_atoms()
+        bits = self.bits
+        atoms += [v.to_atom() for v, pos in self.layout.atoms.items() if bits[pos >> 3] & (1 << (pos & 7))]
+        atoms += [(v.symbol(*v.binding), self.values[pos]) for v, pos in self.layout.terms.items()
+                  if self.values[pos] is not None]
+        return atoms
+
+    def _value_key(self):
+        return tuple(None if v is None else v.symbol for v in self.values)
+
+    def __eq__(self, other):
+        if isinstance(other, PackedModel) and self.layout is other.layout:
+            return self.bits == other.bits and self._value_key() == other._value_key()
+        if isinstance(other, (PackedModel, Model)):
+            # Note that hashes are consistent with this equality only among packed models with the same layout
+            return _model_contents(self) == _model_contents(other)
+        return NotImplemented
+
+    def __hash__(self):
+        if not self.values:  # i.e. there are no functional state variables
+            return hash(bytes(self.bits))
+        return hash((bytes(self.bits), self._value_key()))
+
+    def __copy__(self):
+        # Layout and evaluator are shared, only the actual state buffers get copied
+        return PackedModel(self.layout, bytearray(self.bits), list(self.values), self.evaluator)
+
+    def __deepcopy__(self, memo):
+        return self.__copy__()
+
+    def copy_on_write(self, signatures):
+        # pylint: disable=unused-argument
+        # Packed models share no mutable structure, so a shallow copy of the buffers is all we need
+        return self.__copy__()
+
+    def __getitem__(self, arg):
+        return Model.__getitem__(self, arg)
+
+    def __str__(self):
+        return f'Model[{", ".join(sorted(map(str, self.as_atoms())))}]'
+    __repr__ = __str__
+
+
+def _model_contents(model):
+    """ Return the set of true atoms and (term, value) pairs of the given model, described by names. """
+    contents = set()
+    for element in model.as_atoms():
+        if isinstance(element, Atom):
+            contents.add((element.predicate.name, tuple(t.name for t in element.subterms)))
+        else:
+            term, value = element
+            contents.add((term.symbol.name, tuple(t.name for t in term.subterms), value.name))
+    return contents
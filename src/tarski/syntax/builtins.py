@@ -60,7 +60,7 @@ def is_builtin_predicate(predicate):
 def create_atom(lang, symbol: BuiltinPredicateSymbol, lhs, rhs):
     from .formulas import Atom  # pylint: disable=import-outside-toplevel  # Avoiding circular references
     predicate = lang.get_predicate(symbol)
-    return Atom(predicate, [lhs, rhs])
+    return lang.get_unique(Atom, predicate, [lhs, rhs])
 
 
 def negate_builtin_atom(atom):
@@ -23,7 +23,7 @@ def create_atom(symbol: BuiltinPredicateSymbol, lhs, rhs):
     # TODO AT THE MOMENT WE DO NOT CHECK FOR TYPE SAFETY WITH BUILT-IN TYPES
 
     predicate = language.get_predicate(symbol)
-    return Atom(predicate, [lhs, rhs])
+    return language.get_unique(Atom, predicate, [lhs, rhs])
 
 
 def create_arithmetic_term(symbol: BuiltinFunctionSymbol, lhs, rhs):
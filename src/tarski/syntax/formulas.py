@@ -1,7 +1,7 @@
 
 from collections import OrderedDict
 from enum import Enum
-from typing import List
+from typing import List, Optional
 
 from .. import errors as err
 from .builtins import BuiltinPredicateSymbol
@@ -32,7 +32,13 @@ def negate_quantifier(q: Quantifier):
 
 
 class Formula:
-    """ A first-order logical formula. """
+    """ A first-order logical formula.
+
+    Atoms cache their hash, which is recomputed only when their predicate or tuple of subterms is reassigned, as walkers
+    and transformations that modify expressions in place do. This means that modifying in place the subterms of an atom
+    after hashing it is not supported. Other formulas are not cached, as transformations often modify their
+    subformulas in place.
+    """
     def __str__(self):
         raise NotImplementedError()  # To be subclassed
 
@@ -118,9 +124,9 @@ class CompoundFormula(Formula):
     __repr__ = __str__
 
     def __eq__(self, other):
-        return self.__class__ is other.__class__ and \
-               self.connective == other.connective and \
-               self.subformulas == other.subformulas
+        return self is other or (self.__class__ is other.__class__ and
+                                 self.connective == other.connective and
+                                 self.subformulas == other.subformulas)
 
     def __hash__(self):
         element_hashes = [self.__class__, self.connective]
@@ -164,9 +170,9 @@ bot = Contradiction()
 
 def _to_binary_tree(args, connective):
     assert len(args) > 1
-    phi = CompoundFormula(connective, (args[-2], args[-1]))
+    phi = _compound(connective, (args[-2], args[-1]))
     for arg in reversed(args[:-2]):
-        phi = CompoundFormula(connective, (arg, phi))
+        phi = _compound(connective, (arg, phi))
     return phi
 
 
@@ -174,10 +180,21 @@ def _create_compound(args, connective, flat):
     if len(args) == 1:  # Handle gracefully the case of a single-atom compound formula
         return args[0]
     if flat:
-        return CompoundFormula(connective, args)
+        return _compound(connective, args)
     return _to_binary_tree(args, connective)
 
 
+def _compound(connective, subformulas):
+    """ Create a compound formula, which will be the unique one with the given components if the language of the
+    formula has hash-consing enabled. """
+    sub = subformulas[0] if subformulas else None  # Look for some atom that tells us the language of the formula
+    while isinstance(sub, (CompoundFormula, QuantifiedFormula)):
+        sub = sub.subformulas[0] if isinstance(sub, CompoundFormula) else sub.formula
+    if isinstance(sub, Atom):
+        return sub.predicate.language.get_unique(CompoundFormula, connective, subformulas)
+    return CompoundFormula(connective, subformulas)
+
+
 def land(*args, flat=False):
     """ Create an and-formula with the given subformulas. If binary is true, the and-formula will be shaped as a binary
      tree (e.g. (...((p1 and p2) and p3) and ...))), otherwise it will have a flat structure. This is an implementation
@@ -197,7 +214,7 @@ def lor(*args, flat=False):
 
 
 def neg(phi):
-    return CompoundFormula(Connective.Not, [phi])
+    return _compound(Connective.Not, [phi])
 
 
 def implies(phi, psi):
@@ -289,6 +306,7 @@ def unwrap_conjunction_or_atom(phi):
 
 class Atom(Formula):
     """ A first-order atom. """
+    _hashed: Optional[tuple] = None  # The hash of the atom, along with the components from which it was computed
 
     def __init__(self, predicate, arguments):
         super().__init__()
@@ -328,12 +346,16 @@ class Atom(Formula):
     __repr__ = __str__
 
     def __eq__(self, other):
-        return self.__class__ is other.__class__ and \
-               self.predicate == other.predicate and \
-               termlists_are_equal(self.subterms, other.subterms)
+        return self is other or (self.__class__ is other.__class__ and
+                                 self.predicate == other.predicate and
+                                 termlists_are_equal(self.subterms, other.subterms))
 
     def __hash__(self):
-        return hash((self.__class__, self.predicate, termlist_hash(self.subterms)))
+        cached = self._hashed
+        if cached is None or cached[1] is not self.subterms or cached[2] is not self.predicate:
+            h = hash((self.__class__, self.predicate, termlist_hash(self.subterms)))
+            cached = self._hashed = (h, self.subterms, self.predicate)
+        return cached[0]
 
 
 class VariableBinding:
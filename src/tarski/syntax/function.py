@@ -56,4 +56,4 @@ class Function:
 
     def __call__(self, *args):
         from .terms import CompoundTerm  # pylint: disable=import-outside-toplevel  # Avoiding circular references
-        return CompoundTerm(self, args)
+        return self.language.get_unique(CompoundTerm, self, args)
@@ -53,4 +53,4 @@ class Predicate:
 
     def __call__(self, *args):
         from .formulas import Atom  # pylint: disable=import-outside-toplevel  # Avoiding circular references
-        return Atom(self, args)
+        return self.language.get_unique(Atom, self, args)
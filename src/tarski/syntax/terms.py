@@ -1,5 +1,5 @@
 
-from typing import Tuple
+from typing import Optional, Tuple
 
 from .util import termlists_are_equal, termlist_hash
 from .sorts import Sort, parent, Interval
@@ -23,7 +23,8 @@ class Term:
         >>> counter[symref(c)] = 2  # This is the correct way of doing it
 
         To prevent usage in such containers, Term objects are not hashable. If you need to hash them for other purposes,
-        use the `t.hash()` method.
+        use the `t.hash()` method. As with atoms, compound terms cache their hash, which is recomputed only when their
+        symbol or tuple of subterms is reassigned.
     """
 
     @property
@@ -167,6 +168,7 @@ class CompoundTerm(Term):
     constant symbols. More generally, a compound term is a function symbol of a certain arity n paired with an n-tuple
     of terms, sorts matching.
     """
+    _hashed: Optional[tuple] = None  # The hash of the term, along with the components from which it was computed
 
     def __init__(self, symbol, subterms: Tuple[Term]):
 
@@ -203,12 +205,16 @@ class CompoundTerm(Term):
     __repr__ = __str__
 
     def hash(self):
-        return hash((self.symbol.symbol, termlist_hash(self.subterms)))
+        cached = self._hashed
+        if cached is None or cached[1] is not self.subterms or cached[2] is not self.symbol:
+            h = hash((self.symbol.symbol, termlist_hash(self.subterms)))
+            cached = self._hashed = (h, self.subterms, self.symbol)
+        return cached[0]
 
     def is_syntactically_equal(self, other):
-        return self.__class__ is other.__class__ and \
-               self.symbol == other.symbol and \
-               termlists_are_equal(self.subterms, other.subterms)
+        return self is other or (self.__class__ is other.__class__ and
+                                 self.symbol == other.symbol and
+                                 termlists_are_equal(self.subterms, other.subterms))
 
 
 class AggregateCompoundTerm(Term):
@@ -254,7 +260,6 @@ class IfThenElse(Term):
         This term evaluates to t1 if C is true, and t2 otherwise. t1 and t2
         are restricted to have the same codomain.
     """
-
     def __init__(self, condition, subterms: Tuple[Term, Term]):
         if len(subterms) != 2:
             raise err.ArityMismatch('IfThenElse', subterms, msg='IfThenElse term needs exactly two sub terms')
@@ -1,5 +1,7 @@
 from ...fstrips.representation import substitute_expression
-from ...syntax import symref, Constant, create_substitution, VariableBinding
+from ...syntax import symref, Constant, Variable, CompoundTerm, Atom, CompoundFormula, QuantifiedFormula, \
+    Tautology, Contradiction, create_substitution, VariableBinding
+from ...fstrips import AddEffect, DelEffect, FunctionalEffect, UniversalEffect
 from ...fstrips.action import Action, PlainOperator
 
 
@@ -56,3 +58,81 @@ def ground_schema_into_plain_operator_from_grounding(action: Action, grounding):
     binding = [lang.get_constant(name) if isinstance(name, str) else name for name in grounding]
     subst = create_substitution(action.parameters, binding)
     return ground_schema_into_plain_operator(action, subst)
+
+
+class ActionSchemaTemplate:
+    """ A template for the fast instantiation of a given action schema into PlainOperators.
+
+    The template is precomputed once per action schema, and records the positions of the schema parameters within
+    its precondition and effects, so that instantiating the schema amounts to filling those positions with the
+    corresponding constants, instead of deep-copying and walking the whole precondition and effects through
+    `substitute_expression`.
+    """
+    def __init__(self, action: Action):
+        self.action = action
+        self.language = action.language
+        self.parameters = {symref(p): i for i, p in enumerate(action.parameters)}
+        self.precondition = self._compile(action.precondition)
+        self.effects = [self._compile_effect(eff) for eff in action.effects]
+
+    def instantiate(self, grounding):
+        """ Return the PlainOperator that results from instantiating the action schema with the given grounding, i.e.
+        a sequence of constants (or constant names), one for each schema parameter. All compound expressions of the
+        operator are new objects, so that the operator can be modified in place without affecting the schema or any
+        other operator, with the only exception of the expressions shared on purpose by a language with hash-consing
+        enabled. """
+        lang = self.language
+        values = tuple(lang.get_constant(c) if isinstance(c, str) else c for c in grounding)
+        if len(values) != len(self.parameters):
+            raise RuntimeError('Can only ground action schemas when the substitution contains all action parameters')
+
+        name = f'{self.action.name}({", ".join(c.name for c in values)})'
+        return PlainOperator(lang, name, self.precondition(values), [eff(values) for eff in self.effects])
+
+    def _compile(self, node):
+        """ Return a function that maps a tuple of parameter values into the instantiation of the given node. Leaves
+        of the node other than parameters (constants, non-parameter variables, etc.) are shared by all
+        instantiations, but compound expressions are built anew for each of them. """
+        if isinstance(node, Variable):
+            position = self.parameters.get(symref(node))
+            if position is None:
+                return lambda values: node
+            return lambda values: values[position]
+
+        if isinstance(node, (Constant, Tautology, Contradiction)):
+            return lambda values: node
+
+        lang = self.language
+        if isinstance(node, (Atom, CompoundTerm)):
+            children = [self._compile(t) for t in node.subterms]
+            symbol, factory = (node.predicate, Atom) if isinstance(node, Atom) else (node.symbol, CompoundTerm)
+            return lambda values: lang.get_unique(factory, symbol, tuple(c(values) for c in children))
+
+        if isinstance(node, CompoundFormula):
+            children, connective = [self._compile(f) for f in node.subformulas], node.connective
+            return lambda values: lang.get_unique(CompoundFormula, connective, [c(values) for c in children])
+
+        if isinstance(node, QuantifiedFormula):
+            formula, quantifier, variables = self._compile(node.formula), node.quantifier, node.variables
+            return lambda values: QuantifiedFormula(quantifier, list(variables), formula(values))
+
+        # Any other type of node (e.g. IfThenElse) is dealt with by a standard substitution
+        parameters = self.action.parameters
+        return lambda values: substitute_expression(node, create_substitution(parameters, values))
+
+    def _compile_effect(self, effect):
+        condition = self._compile(effect.condition)
+        if isinstance(effect, (AddEffect, DelEffect)):
+            atom, effect_type = self._compile(effect.atom), type(effect)
+            return lambda values: effect_type(atom(values), condition(values))
+
+        if isinstance(effect, FunctionalEffect):
+            lhs, rhs, effect_type = self._compile(effect.lhs), self._compile(effect.rhs), type(effect)
+            return lambda values: effect_type(lhs(values), rhs(values), condition(values))
+
+        if isinstance(effect, UniversalEffect):
+            variables, effects = effect.variables, [self._compile_effect(eff) for eff in effect.effects]
+            return lambda values: UniversalEffect(list(variables), [eff(values) for eff in effects], condition(values))
+
+        parameters = self.action.parameters
+        return lambda values: substitute_expression(effect, create_substitution(parameters, values))
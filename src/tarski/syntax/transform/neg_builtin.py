@@ -5,6 +5,7 @@ import copy
 
 from ..formulas import Connective, Atom, QuantifiedFormula, CompoundFormula
 from ..builtins import negate_builtin_atom
+from ..util import modifiable
 
 
 class NegatedBuiltinAbsorption:
@@ -33,6 +34,7 @@ class NegatedBuiltinAbsorption:
                 assert phi.connective == Connective.And or phi.connective == Connective.Or
                 new_sub = [self._convert(phi.subformulas[0]),
                            self._convert(phi.subformulas[1])]
+                phi = modifiable(phi)
                 phi.subformulas = tuple(new_sub)
                 return phi
         elif isinstance(phi, QuantifiedFormula):
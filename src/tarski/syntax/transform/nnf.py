@@ -6,6 +6,7 @@ import copy
 from ... import errors as err
 from ..formulas import neg, Formula, QuantifiedFormula, CompoundFormula, Connective, negate_quantifier, Tautology, \
     Contradiction, Atom
+from ..util import modifiable
 
 
 class NNFTransformation:
@@ -32,6 +33,7 @@ class NNFTransformation:
 
         if isinstance(phi, CompoundFormula) and phi.connective in (Connective.And, Connective.Or):
             # Convert conjunct / disjunct formulas recursively, applying De Morgan if negated=True
+            phi = modifiable(phi)
             phi.subformulas = tuple(self._convert(sub, negated) for sub in phi.subformulas)
             phi.connective = negate_connective(phi.connective) if negated else phi.connective
             return phi
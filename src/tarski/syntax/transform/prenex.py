@@ -36,10 +36,10 @@ class PrenexTransformation:
         new_phi = QuantifiedFormula(lhs.quantifier, list(new_variables.values()), lor(lhs.formula, rhs.formula))
         return new_phi
 
-    def _nest_quantifiers(self, out_q, out_vars, out_phi, inner_q, inner_vars, conn, lhs, rhs):
+    def _nest_quantifiers(self, out_q, out_vars, out_is_lhs, inner_q, inner_vars, conn, lhs, rhs):
         """
-            Note that out_phi is either lhs or rhs, we have the parameter duplicated so we
-            can preserve the ordering of subformulas
+            Note that the formula quantified by the outer quantifier is either lhs or rhs, as told by out_is_lhs,
+            so that we can preserve the ordering of subformulas
         """
         in_vars_dict = {(x.symbol, x.sort.name): x for x in inner_vars}
         new_out_vars = []
@@ -53,7 +53,11 @@ class PrenexTransformation:
                 subst[symref(y)] = y2
                 new_out_vars.append(y2)
         if len(subst) > 0:
-            substitute_expression(out_phi, subst, inplace=True)
+            # We use the result of the substitution, which is a copy of the formula if it is a unique one
+            if out_is_lhs:
+                lhs = substitute_expression(lhs, subst, inplace=True)
+            else:
+                rhs = substitute_expression(rhs, subst, inplace=True)
         phi = CompoundFormula(conn, tuple([lhs, rhs]))
         inner = QuantifiedFormula(inner_q, inner_vars, phi)
         return QuantifiedFormula(out_q, new_out_vars, inner)
@@ -106,10 +110,10 @@ class PrenexTransformation:
             # equivalence
 
             if rhs.quantifier == Quantifier.Exists and lhs.quantifier == Quantifier.Forall:
-                return self._nest_quantifiers(Quantifier.Exists, rhs.variables, rhs.formula,
+                return self._nest_quantifiers(Quantifier.Exists, rhs.variables, False,
                                               Quantifier.Forall, lhs.variables,
                                               phi.connective, lhs.formula, rhs.formula)
-            return self._nest_quantifiers(Quantifier.Exists, lhs.variables, lhs.formula,
+            return self._nest_quantifiers(Quantifier.Exists, lhs.variables, True,
                                           Quantifier.Forall, rhs.variables,
                                           phi.connective, lhs.formula, rhs.formula)
         # \forall ( P \lor Q(x)) \equiv P \lor \forall x Q(x)
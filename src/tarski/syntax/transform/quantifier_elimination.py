@@ -9,6 +9,7 @@ from ... import errors as err
 from .substitutions import create_substitution, substitute_expression
 from ..formulas import land, lor, Quantifier, QuantifiedFormula, Atom, Tautology, Contradiction, CompoundFormula
 from .errors import TransformationError
+from ..util import modifiable
 
 
 class QuantifierEliminationMode(Enum):
@@ -41,6 +42,7 @@ class QuantifierElimination:
             return phi  # Already quantifier-free
 
         if isinstance(phi, CompoundFormula):
+            phi = modifiable(phi)
             phi.subformulas = tuple(self._convert(sub) for sub in phi.subformulas)
             return phi
 
@@ -1,4 +1,5 @@
 
+import copy
 import itertools
 
 
@@ -23,9 +24,19 @@ def get_symbols(lang, type_="all", include_builtin=True, include_total_cost=Fals
 
 def termlists_are_equal(terms1, terms2):
     """ Check whether two given lists of terms are (syntactic-wise) equal. """
-    return len(terms1) == len(terms2) and all(x.is_syntactically_equal(y) for x, y in zip(terms1, terms2))
+    return len(terms1) == len(terms2) and all(x is y or x.is_syntactically_equal(y) for x, y in zip(terms1, terms2))
 
 
 def termlist_hash(terms):
     """ Return a ready-to-hash tuple with the hashes of a list of terms. """
     return tuple(x.hash() for x in terms)
+
+
+def modifiable(expression):
+    """ Return the given expression, if it can be modified in place, or otherwise a shallow copy of it. The latter is
+    the case of the unique expressions of languages with hash-consing enabled, which are shared by any number of other
+    expressions (see `FirstOrderLanguage.enable_hash_consing`). """
+    # Unique expressions are marked with their own id, which shallow and deep copies of them do not have
+    if getattr(expression, '_unique', None) != id(expression):
+        return expression
+    return copy.copy(expression)
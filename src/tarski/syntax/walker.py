@@ -4,6 +4,7 @@ import copy
 from enum import Enum
 
 from ..errors import TarskiError
+from .util import modifiable
 
 
 class WalkerError(TarskiError):
@@ -52,6 +53,9 @@ class FOLWalker:
         return node
 
     def run(self, expression, inplace=True):
+        """ Visit the given expression, and return the result. If `inplace` is true, the expression is modified in
+        place, with the exception of its unique subexpressions (see `FirstOrderLanguage.enable_hash_consing`), which are
+        copied before being modified. """
         # Simply dispatch according to type
         expression = expression if inplace else copy.deepcopy(expression)
         return self.visit_expression(expression, inplace=True)
@@ -60,7 +64,7 @@ class FOLWalker:
         # pylint: disable=import-outside-toplevel  # Avoiding circular references
         from .formulas import CompoundFormula, QuantifiedFormula, Atom, Tautology, Contradiction
         from .terms import Constant, Variable, CompoundTerm, IfThenElse    # pylint: disable=import-outside-toplevel
-        node = node if inplace else copy.deepcopy(node)
+        node = modifiable(node) if inplace else copy.deepcopy(node)
 
         if isinstance(node, (Variable, Constant, Contradiction, Tautology)):
             pass
@@ -1,9 +1,13 @@
 """
     Some basic utility methods.
 """
+import mmap
+import struct
+import zlib
+from array import array
 from collections import OrderedDict
 
-from .errors import DuplicateDefinition
+from .errors import DuplicateDefinition, TarskiError
 
 
 class SymbolIndex:
@@ -25,6 +29,19 @@ class SymbolIndex:
         self.data[obj] = len(self.data)
         self.objects.append(obj)
 
+    def get_or_add(self, obj):
+        """ Return the index of the given object, adding the object to the index if it is not yet there. """
+        index = self.data.get(obj)
+        if index is None:
+            index = self.data[obj] = len(self.objects)
+            self.objects.append(obj)
+        return index
+
+    def update(self, elements):
+        """ Add to the index all objects from the given iterable that are not yet there. """
+        for element in elements:
+            self.get_or_add(element)
+
     def dump(self):
         return [str(o) for o in self.data.keys()]
 
@@ -45,3 +62,137 @@ class SymbolIndex:
 
     def __len__(self):
         return len(self.data)
+
+
+class CompactIndex:
+    """ An indexing object with the same interface as `SymbolIndex` for tuples of (32-bit, non-negative) integers,
+    such as the tuple with the id of a symbol and the ids of the objects of one of its groundings.
+
+    Instead of storing Python tuples in a dictionary, all tuples are stored one after the other in a flat array of
+    machine integers, and looked up through an open-addressing hash table that is itself an array of machine
+    integers. An indexed tuple of length k thus takes about 4k + 16 bytes of memory. Indexes can be pickled, and saved
+    into files that are later loaded through a memory map (see `save` and `load`).
+    """
+    _MAGIC = b'TCI1'
+    _HEADER = struct.Struct('<4s4xQQQ')  # Magic number and lengths of the arrays of offsets, integers and slots
+
+    def __init__(self, elements=None):
+        self._offsets = array('q', [0])  # Position in _data of the i-th tuple, plus the position where _data ends
+        self._data = array('i')
+        self._slots = array('i', [0]) * 8  # The hash table, with 1 + the index of a tuple in each used slot
+        self.update(elements or [])
+
+    def _find(self, packed):
+        """ Return the position of the hash table slot that contains the given tuple (packed into an array), or of
+        the empty slot where it should be inserted if it is not in the index. """
+        mask = len(self._slots) - 1
+        position = zlib.crc32(packed) & mask
+        while True:
+            index = self._slots[position] - 1
+            if index < 0 or self._data[self._offsets[index]:self._offsets[index + 1]] == packed:
+                return position
+            position = (position + 1) & mask
+
+    def _insert(self, position, packed):
+        if not isinstance(self._data, array):  # Copy the arrays of a memory-mapped index the first time it changes
+            self._offsets, self._data, self._slots = array('q', self._offsets), array('i', self._data), \
+                array('i', self._slots)
+        index = len(self)
+        self._data.extend(packed)
+        self._offsets.append(len(self._data))
+        self._slots[position] = index + 1
+        if 2 * len(self) > len(self._slots):  # Keep the load factor of the hash table under 1/2
+            self._rehash(2 * len(self._slots))
+        return index
+
+    def _rehash(self, size):
+        self._slots = array('i', [0]) * size
+        mask = size - 1
+        for index in range(len(self)):
+            position = zlib.crc32(self._data[self._offsets[index]:self._offsets[index + 1]]) & mask
+            while self._slots[position]:
+                position = (position + 1) & mask
+            self._slots[position] = index + 1
+
+    def get_index(self, key):
+        index = self._slots[self._find(array('i', key))] - 1
+        if index < 0:
+            raise KeyError(key)
+        return index
+
+    def get_object(self, index):
+        return tuple(self._data[self._offsets[index]:self._offsets[index + 1]])
+
+    def add(self, key):
+        packed = array('i', key)
+        position = self._find(packed)
+        if self._slots[position]:
+            raise DuplicateDefinition(key, self._slots[position] - 1)
+        self._insert(position, packed)
+
+    def get_or_add(self, key):
+        """ Return the index of the given tuple, adding the tuple to the index if it is not yet there. """
+        packed = array('i', key)
+        position = self._find(packed)
+        index = self._slots[position] - 1
+        return index if index >= 0 else self._insert(position, packed)
+
+    def update(self, elements):
+        """ Add to the index all tuples from the given iterable that are not yet there. """
+        for element in elements:
+            self.get_or_add(element)
+
+    def dump(self):
+        return [str(o) for o in self]
+
+    def save(self, filename):
+        """ Save the index into the given file, in the native byte order of the machine. """
+        with open(filename, 'wb') as f:
+            f.write(self._HEADER.pack(self._MAGIC, len(self._offsets), len(self._data), len(self._slots)))
+            for a in (self._offsets, self._data, self._slots):
+                f.write(a)
+
+    @classmethod
+    def load(cls, filename):
+        """ Load an index saved into the given file with `save`. The file is memory-mapped, and its contents are read
+        only as needed. The file is copied into memory only if new tuples are added to the loaded index. """
+        with open(filename, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, noffsets, ndata, nslots = cls._HEADER.unpack_from(buffer)
+        if magic != cls._MAGIC:
+            raise TarskiError(f'File "{filename}" is not a valid index file')
+        index = cls.__new__(cls)
+        view = memoryview(buffer)
+        start = cls._HEADER.size
+        index._offsets = view[start:start + 8 * noffsets].cast('q')
+        start += 8 * noffsets
+        index._data = view[start:start + 4 * ndata].cast('i')
+        start += 4 * ndata
+        index._slots = view[start:start + 4 * nslots].cast('i')
+        return index
+
+    def __getstate__(self):
+        return bytes(self._offsets), bytes(self._data), bytes(self._slots)
+
+    def __setstate__(self, state):
+        self._offsets, self._data, self._slots = array('q'), array('i'), array('i')
+        for a, data in zip((self._offsets, self._data, self._slots), state):
+            a.frombytes(data)
+
+    def __str__(self):
+        return ','.join('{}: {}'.format(idx, o) for idx, o in self.enumerate())
+
+    __repr__ = __str__
+
+    def __iter__(self):
+        return (self.get_object(index) for index in range(len(self)))
+
+    def enumerate(self):
+        """ Iterate over all (ordered) pairs of the form idx, o, where idx is the index of tuple 'o' """
+        return enumerate(self)
+
+    def __contains__(self, k):
+        return self._slots[self._find(array('i', k))] != 0
+
+    def __len__(self):
+        return len(self._offsets) - 1
@@ -47,7 +47,8 @@ def execute(command, **kwargs):
         msg += '. Standard error redirected to "{}"'.format(stderr.name)
     logging.debug(msg)
 
-    retcode = subprocess.call(command, cwd=cwd, stdout=stdout, stderr=stderr)
+    # The optional "input" bytes are fed into the standard input of the command
+    retcode = subprocess.run(command, cwd=cwd, stdout=stdout, stderr=stderr, input=kwargs.get("input")).returncode
 
     if stdout:
         stdout.close()
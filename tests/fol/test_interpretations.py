@@ -8,7 +8,8 @@ from tarski import errors
 
 from ..common import numeric
 from tarski.evaluators.simple import evaluate
-from tarski.syntax import Constant, ite, symref
+from tarski.evaluators.compiled import compile as compile_expression
+from tarski.syntax import Constant, ite, symref, exists, forall
 from tarski.theories import Theory
 from tarski.modules import import_scipy_special
 
@@ -439,6 +440,30 @@ def test_model_as_atoms():
     assert term.is_syntactically_equal(f(o1)) and value.is_syntactically_equal(o2)
 
 
+def test_model_bulk_insertion():
+    lang = tarski.language(theories=[Theory.ARITHMETIC])
+    block = lang.sort('block')
+    on = lang.predicate('on', block, block)
+    weight = lang.function('weight', block, lang.Real)
+    a, b, c = (lang.constant(name, block) for name in "abc")
+
+    model, expected = Model(lang), Model(lang)
+    model.add_all(on, [(a, b), (b, c)])
+    model.set_all(weight, [((a, ), 2), ((b, ), "3.5")])
+    expected.add(on, a, b)
+    expected.add(on, b, c)
+    expected.set(weight(a), 2)
+    expected.set(weight(b), 3.5)
+    assert model == expected and model.holds(on, (b, c))
+
+    with pytest.raises(errors.ArityMismatch):
+        model.add_all(on, [(a, b), (c, )])
+    with pytest.raises(errors.SortMismatch):
+        model.add_all(on, [(a, lang.constant(1, lang.Real))])
+    with pytest.raises(errors.SemanticError):
+        model.add_all(weight, [(a, 1)])
+
+
 def test_predicate_without_equality_reals():
     import numpy
 
@@ -511,3 +536,56 @@ def test_matrix_evaluation_case_2():
     x0.set(z(), 3.0)
     # print(x0[I @ v][2, 0])
     assert x0[I @ v][2, 0].is_syntactically_equal(lang.constant(3.0, lang.Real))
+
+
+def test_compiled_evaluation():
+    lang = tarski.language('arith', [Theory.EQUALITY, Theory.ARITHMETIC])
+    x = lang.function('x', lang.Integer)
+    y = lang.function('y', lang.Integer)
+    v = lang.variable('v', lang.Integer)
+
+    model = Model(lang)
+    model.evaluator = evaluate
+    model.set(x(), 1)
+    model.set(y(), 2)
+
+    for formula in [(x() <= y()) & (y() <= x()), (x() < y()) | (y() < x()), ~(x() > y())]:
+        assert compile_expression(formula)(model) is evaluate(formula, model)
+
+    for term in [x() + 2, ite(x() < y(), y() * 3, x() - 1), y() % x()]:
+        assert compile_expression(term)(model).is_syntactically_equal(evaluate(term, model))
+
+    # Free variables are given a value through sigma, indexed by symref
+    compiled = compile_expression(x() + v)
+    assert compiled(model, {symref(v): lang.constant(3, lang.Integer)}).symbol == 4
+
+    with pytest.raises(errors.UndefinedTerm):
+        compile_expression(x() + y())(Model(lang))
+
+
+def test_quantified_formula_evaluation():
+    lang = tarski.language('blocks', [Theory.EQUALITY])
+    block = lang.sort('block')
+    on = lang.predicate('on', block, block)
+    clear = lang.predicate('clear', block)
+    a, b, c = (lang.constant(name, block) for name in 'abc')
+    x, y = lang.variable('x', block), lang.variable('y', block)
+
+    model = Model(lang)
+    model.evaluator = evaluate
+    model.add(on, a, b)
+    model.add(clear, a)
+    model.add(clear, c)
+
+    assert model[exists(x, y, on(x, y) & clear(x))] is True
+    assert model[exists(x, on(x, x))] is False
+    assert model[exists(x, on(x, b) & ~clear(x))] is False
+    assert model[exists(x, ~clear(x))] is True
+    assert model[exists(x, y, on(x, y) & (x != y))] is True
+    assert model[forall(x, clear(x))] is False
+    assert model[forall(x, clear(x) | exists(y, on(y, x)))] is True
+    assert model[forall(x, y, ~on(x, y) | clear(x))] is True
+
+    # Free variables can be given a value through sigma
+    assert model[exists(y, on(x, y)), {symref(x): a}] is True
+    assert model[exists(y, on(x, y)), {symref(x): b}] is False
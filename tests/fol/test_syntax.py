@@ -1,5 +1,6 @@
 
 import copy
+import pickle
 from collections import defaultdict
 
 import pytest
@@ -8,11 +9,14 @@ from tarski import theories, Term, Constant
 from tarski.benchmarks.blocksworld import generate_strips_bw_language
 from tarski.fstrips import fstrips
 from tarski.syntax import symref, CompoundFormula, Atom, ite, AggregateCompoundTerm, CompoundTerm, lor, Tautology, \
-    Contradiction, land, top, bot
+    Contradiction, land, top, bot, neg, exists, forall
 from tarski.theories import Theory
 from tarski import errors as err
 from tarski import fstrips as fs
 from tarski.syntax.algebra import Matrix
+from tarski.syntax.transform.substitutions import substitute_expression, create_substitution
+from tarski.syntax.transform.nnf import NNFTransformation
+from tarski.syntax.transform.quantifier_elimination import remove_quantifiers, QuantifierEliminationMode
 
 from ..common import numeric
 
@@ -250,6 +254,103 @@ def test_formula_refs():
     assert fr1 != fr2
 
 
+def test_cached_hashes_are_updated_by_inplace_substitutions():
+    lang = fstrips.language('hashes', [Theory.EQUALITY, Theory.ARITHMETIC])
+    f = lang.function('f', lang.Object, lang.Object)
+    p = lang.predicate('p', lang.Object, lang.Object)
+    a, b = lang.constant('a', lang.Object), lang.constant('b', lang.Object)
+    x = lang.variable('x', lang.Object)
+
+    phi = land(p(x, f(a)), p(f(x), b))
+    hashed = hash(phi)
+    assert hash(copy.deepcopy(phi)) == hashed
+
+    substitute_expression(phi, create_substitution([x], [a]), inplace=True)
+    assert hash(phi) != hashed
+    assert hash(phi) == hash(land(p(a, f(a)), p(f(a), b)))
+    assert symref(phi.subformulas[1].subterms[0]) == symref(f(a))
+    assert phi.subformulas[1].subterms[0].hash() == f(a).hash()
+
+    # Transformations that modify in place a formula nested in another one also update the hash of the latter
+    q = lang.predicate('q', lang.Object)
+    r = lang.predicate('r', lang.Object)
+    phi = exists(x, q(x) & neg(q(x) & r(x)))
+    hash(phi)
+    nnf = NNFTransformation.rewrite(exists(x, q(x) & neg(q(x) & r(x)))).nnf
+    assert NNFTransformation.rewrite(phi, do_copy=False).nnf is phi
+    assert phi == nnf and hash(phi) == hash(nnf)
+
+
+def test_hash_consing():
+    lang = fstrips.language('hashes', [Theory.EQUALITY, Theory.ARITHMETIC])
+    f = lang.function('f', lang.Object, lang.Object)
+    g = lang.function('g', lang.Object, lang.Integer)
+    p = lang.predicate('p', lang.Object, lang.Object)
+    a, b = lang.constant('a', lang.Object), lang.constant('b', lang.Object)
+    x = lang.variable('x', lang.Object)
+
+    atom = p(a, b)
+    assert not lang.hash_consing and p(a, b) is not atom
+
+    lang.enable_hash_consing()
+    assert lang.hash_consing
+    assert p(a, b) is not atom  # Expressions built before enabling hash-consing are not made unique
+    assert p(a, b) is p(a, b) and p(f(a), x) is p(f(a), lang.variable('x', lang.Object))
+    assert p(a, b) is not p(b, a)
+    assert (g(a) + 1 == g(b)) is (g(a) + 1 == g(b))
+    assert land(p(a, b), neg(p(b, a))) is land(p(a, b), neg(p(b, a)))
+    assert lor(p(a, b), p(b, a), flat=True) is lor(p(a, b), p(b, a), flat=True)
+    assert land(p(a, b), p(b, a)) is not lor(p(a, b), p(b, a))
+
+
+def test_hash_consing_looks_up_expressions_before_building_them(monkeypatch):
+    lang = fstrips.language('hashes')
+    p = lang.predicate('p', lang.Object)
+    a = lang.constant('a', lang.Object)
+    lang.enable_hash_consing()
+    atom = p(a)
+
+    monkeypatch.setattr(Atom, '_check_well_formed', lambda self: pytest.fail('Atom built again'))
+    assert p(a) is atom
+
+
+def test_hash_consed_expressions_are_not_modified_in_place():
+    lang = fstrips.language('hashes')
+    p = lang.predicate('p', lang.Object)
+    q = lang.predicate('q', lang.Object)
+    a, b = lang.constant('a', lang.Object), lang.constant('b', lang.Object)
+    x = lang.variable('x', lang.Object)
+    lang.enable_hash_consing()
+
+    shared = p(x) & q(x)
+    phi = land(shared, p(a))
+    substituted = substitute_expression(phi, create_substitution([x], [b]), inplace=True)
+    assert str(substituted) == '((p(b) and q(b)) and p(a))'
+    assert str(phi) == '((p(x) and q(x)) and p(a))' and phi is land(p(x) & q(x), p(a))
+
+    negated = neg(shared)
+    nnf = NNFTransformation.rewrite(negated, do_copy=False).nnf
+    assert str(nnf) == '((not p(x)) or (not q(x)))'
+    assert str(negated) == '(not (p(x) and q(x)))' and shared is p(x) & q(x)
+
+    expanded = remove_quantifiers(lang, forall(x, shared), QuantifierEliminationMode.Forall, do_copy=False)
+    assert {str(f) for f in expanded.subformulas} == {'(p(a) and q(a))', '(p(b) and q(b))'}
+    assert str(shared) == '(p(x) and q(x))'
+
+
+def test_language_with_hash_consing_can_be_pickled():
+    lang = theories.language('hashes', theories=[])
+    p = lang.predicate('p', lang.Object)
+    a = lang.constant('a', lang.Object)
+    lang.enable_hash_consing()
+    atom = p(a)
+
+    unpickled = pickle.loads(pickle.dumps(lang))
+    assert unpickled.hash_consing and unpickled.has_predicate('p')
+    p2, a2 = unpickled.get('p', 'a')
+    assert p2(a2) is p2(a2) and p(a) is atom
+
+
 def test_ite():
     lang = fstrips.language('arith', [Theory.EQUALITY, Theory.ARITHMETIC])
 
@@ -3,14 +3,15 @@ from collections import OrderedDict
 from tarski.fstrips import DelEffect, UniversalEffect, AddEffect
 from tarski.fstrips.action import PlainOperator
 from tarski.fstrips.representation import is_ground
-from tarski.grounding import ProblemGrounding
+from tarski.grounding import ProblemGrounding, NaiveGroundingStrategy
 from tarski.grounding.lp_grounding import ground_problem_schemas_into_plain_operators
 from tarski.syntax import symref
 from tarski.syntax.transform.action_grounding import ground_schema_into_plain_operator, \
-    ground_schema_into_plain_operator_from_grounding
+    ground_schema_into_plain_operator_from_grounding, ActionSchemaTemplate
 from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
 
 from tests.common import blocksworld
+from tests.common.gripper import create_sample_problem
 
 
 def test_task_index_process_symbols_fluents_bw():
@@ -74,3 +75,46 @@ def test_complex_action_grounding():
     eff = op.effects[0]
 
     assert all(is_ground(sube.atom) for sube in eff.effects)
+
+
+def test_action_schema_templates():
+    problem = blocksworld.create_4blocks_task()  # An FSTRIPS problem, with functional effects
+    grounding = NaiveGroundingStrategy(problem)
+    for name, groundings in grounding.ground_actions().items():
+        action = problem.get_action(name)
+        template = ActionSchemaTemplate(action)
+        for binding in groundings:
+            expected = ground_schema_into_plain_operator_from_grounding(action, binding)
+            op = template.instantiate(binding)
+            assert op.name == expected.name and str(op.precondition) == str(expected.precondition)
+            assert str(op.effects) == str(expected.effects)
+
+    # Templates work also with universal effects, and constants given by name
+    problem = create_sample_problem()
+    lang = problem.language
+    at_robby, room = lang.get('at-robby', 'room')
+    x = lang.variable('x', 'object')
+    ue = UniversalEffect([], effects=[AddEffect(at_robby(x)), DelEffect(room(x))])
+    action = problem.action('fake', [x], precondition=room(x) & ~at_robby(x), effects=[ue])
+
+    op = ActionSchemaTemplate(action).instantiate(('rooma', ))
+    assert op.name == 'fake(rooma)' and str(op.precondition) == '(room(rooma) and (not at-robby(rooma)))'
+    assert all(is_ground(sube.atom) for sube in op.effects[0].effects)
+
+
+def test_template_instances_do_not_share_compound_expressions():
+    problem = create_sample_problem()
+    lang = problem.language
+    at_robby, room, rooma = lang.get('at-robby', 'room', 'rooma')
+    x = lang.variable('x', 'object')
+    action = problem.action('fake', [x], precondition=room(x) & ~at_robby(rooma), effects=[AddEffect(at_robby(x))])
+
+    template = ActionSchemaTemplate(action)
+    op1, op2 = template.instantiate(('rooma', )), template.instantiate(('roomb', ))
+    assert op1.precondition.subformulas[1] is not op2.precondition.subformulas[1]
+    assert op1.precondition.subformulas[1] is not action.precondition.subformulas[1]
+
+    # Modifying an operator in place affects neither the schema nor any other operator
+    op1.precondition.subformulas[1].subformulas = (at_robby(x), )
+    assert str(action.precondition) == '(room(x) and (not at-robby(rooma)))'
+    assert str(op2.precondition) == '(room(roomb) and (not at-robby(rooma)))'
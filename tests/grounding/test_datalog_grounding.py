@@ -0,0 +1,101 @@
+import pytest
+
+import tarski.fstrips as fs
+from tarski.errors import TarskiError
+from tarski.grounding import DatalogGroundingStrategy, NaiveGroundingStrategy
+from tarski.grounding.errors import ReachabilityLPUnsolvable
+from tarski.reachability.asp import LPAtom, Translator
+from tarski.reachability.datalog import DatalogProgram, solve_datalog
+from tarski.syntax import neg
+
+from tests.common.gripper import create_sample_problem
+from tests.common.simple import create_simple_problem
+
+
+def test_datalog_evaluation_of_recursive_program():
+    program = DatalogProgram()
+    for x, y in [('a', 'b'), ('b', 'c'), ('c', 'a'), ('c', 'd')]:
+        program.rule(LPAtom('edge', [x, y]))
+    program.rule(LPAtom('path', ['X', 'Y']), [LPAtom('edge', ['X', 'Y'])])
+    program.rule(LPAtom('path', ['X', 'Z']), [LPAtom('path', ['X', 'Y']), LPAtom('path', ['Y', 'Z'])])
+    program.rule(LPAtom('cycle', ['X']), [LPAtom('path', ['X', 'X'])])
+    program.rule(LPAtom('before', ['X']), [LPAtom('path', ['X', 'Y']), LPAtom('<', ['X', 'Y'], infix=True)])
+    program.rule(LPAtom('goal'), [LPAtom('cycle', ['a'])])
+
+    model = solve_datalog(program, Translator())
+    assert model['path'] == {(x, y) for x in 'abc' for y in 'abcd'}
+    assert model['cycle'] == {('a', ), ('b', ), ('c', )}
+    assert model['before'] == {('a', ), ('b', ), ('c', )}
+    assert model['goal'] == {()}
+
+
+def test_datalog_grounding_of_small_gripper():
+    problem = create_sample_problem()
+    grounding = DatalogGroundingStrategy(problem)
+    actions = grounding.ground_actions()
+
+    assert len(actions['pick']) == len(actions['drop']) == 16  # 4 balls, two rooms, two grippers
+    assert actions['move'] == {('rooma', 'roomb'), ('roomb', 'rooma')}
+    assert sorted(grounding.iterate_action_groundings()) == \
+        sorted((k, g) for k, groundings in actions.items() for g in groundings)
+
+    variables = grounding.ground_state_variables()
+    assert len(variables) == 20
+    assert set(variables) == set(DatalogGroundingStrategy(problem, ground_actions=False).ground_state_variables())
+    assert set(variables) <= set(NaiveGroundingStrategy(problem).ground_state_variables())
+
+
+def test_datalog_grounding_on_negated_preconditions():
+    problem = create_simple_problem()
+    p, a = problem.language.get("p", "a")
+    assert DatalogGroundingStrategy(problem).ground_actions()["negate"] == {('a', )}
+
+    problem.init.remove(p, a)
+    assert DatalogGroundingStrategy(problem).ground_actions()["negate"] == set()
+
+    problem.goal = p(a)
+    with pytest.raises(ReachabilityLPUnsolvable):
+        _ = DatalogGroundingStrategy(problem).ground_actions()
+
+    problem = create_sample_problem()
+    pick_prec = problem.actions['pick'].precondition
+    pick_prec.subformulas = tuple(neg(f) for f in pick_prec.subformulas)
+    assert len(DatalogGroundingStrategy(problem).ground_actions()['pick']) == 512
+
+
+def test_datalog_regrounding():
+    problem = create_sample_problem()
+    lang = problem.language
+    carry, free, ball1, ball2, left, rooma = lang.get('carry', 'free', 'ball1', 'ball2', 'left', 'rooma')
+
+    def variant(goal=None, *added):
+        instance = fs.create_fstrips_problem(lang, problem_name='variant', domain_name=problem.domain_name)
+        instance.actions = problem.actions
+        instance.init = problem.init.copy_on_write(list(problem.init.predicate_extensions.keys()))
+        instance.init.remove(free, left)
+        for atom in added:
+            instance.init.add(atom.predicate, *atom.subterms)
+        instance.goal = problem.goal if goal is None else goal
+        return instance
+
+    grounding = DatalogGroundingStrategy(problem)
+    assert len(grounding.ground_actions()['pick']) == 16
+
+    # Without a free left gripper, nothing can be picked with it
+    first = grounding.reground(variant())
+    assert first.domain is grounding.domain
+    assert len(first.ground_actions()['pick']) == 8
+
+    # A superset of the previous initial state resumes the previous fixpoint
+    second = first.reground(variant(None, carry(ball2, left)))
+    assert second.ground_actions() == DatalogGroundingStrategy(variant(None, carry(ball2, left))).ground_actions()
+    assert len(second.ground_actions()['pick']) == 16
+
+    # Changing only the goal reuses the fixpoint of the initial state as is
+    third = second.reground(variant(lang.get('at')(ball1, rooma), carry(ball2, left)))
+    assert third.ground_actions() == second.ground_actions()
+    assert third.evaluator is second.evaluator
+
+    other = create_simple_problem()
+    with pytest.raises(TarskiError):
+        grounding.reground(other)
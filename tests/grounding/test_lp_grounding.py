@@ -5,6 +5,7 @@ from tarski.grounding import LPGroundingStrategy, NaiveGroundingStrategy
 from tarski.grounding.errors import ReachabilityLPUnsolvable
 from tarski.grounding.lp_grounding import compute_action_groundings
 from tarski.reachability import create_reachability_lp
+from tarski.reachability.clingo_wrapper import is_clingo_module_available
 from tarski.syntax import neg
 from tests.common.benchmarks import get_lenient_benchmarks
 
@@ -12,9 +13,9 @@ from tests.common.gripper import create_sample_problem
 from tests.common.simple import create_simple_problem
 from ..io.common import reader, collect_strips_benchmarks, parse_benchmark_instance
 
-if shutil.which("gringo") is None:
-    pytest.skip('Install the Clingo ASP solver and put the "gringo" binary on your PATH in order to test ASP-based '
-                "reachability analysis", allow_module_level=True)
+if shutil.which("gringo") is None and not is_clingo_module_available():
+    pytest.skip('Install the Clingo ASP solver and put the "gringo" binary on your PATH, or install the clingo Python '
+                'module, in order to test ASP-based reachability analysis', allow_module_level=True)
 
 
 SAMPLE_STRIPS_INSTANCES = [
@@ -129,6 +130,18 @@ def test_ground_actions_for_small_gripper():
     assert len(set(naive_variables) - set(lpvariables)) == 124
 
 
+def test_streamed_action_groundings():
+    problem = create_sample_problem()
+    # Streaming the ground actions from the LP solution must yield the same groundings than the cached LP model
+    streamed = list(LPGroundingStrategy(problem).iterate_action_groundings())
+    assert len(streamed) == 34
+
+    grounding = LPGroundingStrategy(problem)
+    actions = grounding.ground_actions()
+    assert sorted(streamed) == sorted((k, g) for k, groundings in actions.items() for g in groundings)
+    assert sorted(grounding.iterate_action_groundings()) == sorted(streamed)
+
+
 def test_ground_actions_on_negated_preconditions():
     problem = create_sample_problem()
 
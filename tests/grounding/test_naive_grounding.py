@@ -1,5 +1,11 @@
+import copy
+import os
+
 from tarski.benchmarks.blocksworld import generate_fstrips_blocksworld_problem, generate_strips_blocksworld_problem
-from tarski.grounding import ProblemGrounding, NaiveGroundingStrategy, create_all_possible_state_variables
+from tarski.grounding import ProblemGrounding, NaiveGroundingStrategy, create_all_possible_state_variables, \
+    GroundingCache
+from tarski.grounding.cache import problem_fingerprint
+from tarski.grounding.common import StateVariableIndex, StateVariableLite
 from tarski.grounding.naive import instantiation
 from tarski.util import SymbolIndex
 from tarski.syntax import create_substitution
@@ -7,11 +13,14 @@ from tarski.grounding.naive.sensors import SensorGrounder
 from tarski.grounding.naive.constraints import ConstraintGrounder
 from tarski.grounding.naive.diff_constraints import DifferentialConstraintGrounder
 from tarski.grounding.naive.reactions import ReactionGrounder
+from tarski.fstrips import fstrips
+from tarski.theories import Theory
 
 from ..fstrips.contingent import localize
 from ..fstrips.hybrid.tasks import create_particles_world, create_billiards_world
 from tests.common.blocksworld import create_4blocks_task
 from tests.common import parcprinter
+from tests.common.gripper import create_sample_problem
 
 
 def create_small_bw_with_index():
@@ -142,6 +151,22 @@ def test_problem_grounding_on_bw():
             'loc(b4)'] == as_list2(variables)
 
 
+def test_action_grounding_with_static_pruning():
+    problem = create_sample_problem()
+    naive = NaiveGroundingStrategy(problem).ground_actions()
+    pruned = NaiveGroundingStrategy(problem, prune_with_statics=True).ground_actions()
+
+    # The static "room", "ball" and "gripper" atoms and the "from != to" inequality leave only reachable groundings
+    assert {k: len(v) for k, v in naive.items()} == {'move': 64, 'pick': 512, 'drop': 512}
+    assert {k: len(v) for k, v in pruned.items()} == {'move': 2, 'pick': 16, 'drop': 16}
+    assert {tuple(c.name for c in g) for g in pruned['move']} == {('rooma', 'roomb'), ('roomb', 'rooma')}
+    assert all(set(map(as_names, pruned[k])) <= set(map(as_names, naive[k])) for k in naive)
+
+
+def as_names(grounding):
+    return tuple(c.name for c in grounding)
+
+
 def test_all_state_variables_can_be_evaluated_in_init_parcprinter():
     prob = parcprinter.create_small_task()
     index = ProblemGrounding(prob)
@@ -174,3 +199,68 @@ def test_create_state_variables_for_hybrid_problem_with_reactions():
     for var in create_all_possible_state_variables(index.fluent_terms):
         index.state_variables.add(var)
     assert len(index.state_variables) == 4
+
+
+def test_cached_grounding(tmp_path):
+    problem = create_sample_problem()
+    cache = GroundingCache(str(tmp_path))
+    expected = NaiveGroundingStrategy(problem, prune_with_statics=True)
+
+    for _ in range(2):  # The first iteration computes the grounding and stores it, the second one reads it from disk
+        grounding = NaiveGroundingStrategy(problem, prune_with_statics=True, cache=cache)
+        assert list(grounding.ground_state_variables()) == list(expected.ground_state_variables())
+        actions = grounding.ground_actions()
+        assert {k: list(map(as_names, v)) for k, v in actions.items()} == \
+            {k: list(map(as_names, v)) for k, v in expected.ground_actions().items()}
+    assert len(os.listdir(str(tmp_path))) == 1
+
+    # Grounding with a different configuration or a different problem must not hit the cache
+    assert len(NaiveGroundingStrategy(problem, cache=cache).ground_actions()['move']) == 64
+    assert problem_fingerprint(problem) == problem_fingerprint(create_sample_problem())
+    problem.init.add(problem.language.get('room'), problem.language.get('ball1'))
+    assert problem_fingerprint(problem) != problem_fingerprint(create_sample_problem())
+    assert len(NaiveGroundingStrategy(problem, prune_with_statics=True, cache=cache).ground_actions()['move']) == 6
+    assert len(os.listdir(str(tmp_path))) == 3
+
+
+def test_compact_state_variable_index(tmp_path):
+    problem = create_sample_problem()
+    variables = NaiveGroundingStrategy(problem).ground_state_variables()
+    index = StateVariableIndex(problem.language, elements=variables)
+    assert len(index) == len(variables) and list(index) == list(variables)
+    assert all(index.get_index(v) == i and index.get_object(i) == v for i, v in variables.enumerate())
+    assert index.get_or_add(variables.get_object(3)) == 3
+
+    filename = str(tmp_path / 'variables.bin')
+    index.save(filename)
+    loaded = StateVariableIndex.load(filename, problem.language)
+    assert list(loaded.enumerate()) == list(variables.enumerate())
+
+
+def test_compact_state_variable_index_with_numeric_arguments(tmp_path):
+    lang = fstrips.language('numeric', [Theory.ARITHMETIC])
+    block = lang.sort('block')
+    b1 = lang.constant('b1', block)
+    f = lang.function('f', lang.Integer, lang.Integer)
+    g = lang.function('g', block, lang.Integer, lang.Real, lang.Real)
+
+    variables = [StateVariableLite(f, (lang.constant(3, lang.Integer), )),
+                 StateVariableLite(f, (lang.constant(-3, lang.Integer), )),
+                 StateVariableLite(g, (b1, lang.constant(2 ** 30, lang.Integer), lang.constant(-2.5, lang.Real)))]
+    index = StateVariableIndex(lang)
+    assert [index.get_or_add(v) for v in variables] == [0, 1, 2]
+    assert list(index) == variables and all(index.get_index(v) == i for i, v in enumerate(variables))
+
+    filename = str(tmp_path / 'variables.bin')
+    index.save(filename)
+    assert list(StateVariableIndex.load(filename, lang)) == variables
+
+
+def test_state_variables_are_interned():
+    problem = create_sample_problem()
+    at, ball1, rooma = problem.language.get('at', 'ball1', 'rooma')
+    variables = NaiveGroundingStrategy(problem).ground_state_variables()
+    variable = StateVariableLite.from_atom(at(ball1, rooma))
+    assert variable is StateVariableLite(at, (ball1, rooma))
+    assert variables.get_object(variables.get_index(variable)) is variable
+    assert copy.deepcopy(variable) == variable
@@ -0,0 +1,52 @@
+import pickle
+
+from tarski.fstrips import UniversalEffect, AddEffect
+from tarski.fstrips.encoding import Decoder, encode_effect, encode_operator
+from tarski.grounding import NaiveGroundingStrategy
+from tarski.grounding.lp_grounding import ground_problem_schemas_into_plain_operators
+from tarski.grounding.parallel import ground_operators_in_parallel
+from tarski.syntax.transform.action_grounding import ground_schema_into_plain_operator_from_grounding
+
+from tests.common.blocksworld import create_4blocks_task
+from tests.common.gripper import create_sample_problem
+
+
+def describe(op):
+    return op.name, str(op.precondition), str(op.effects)
+
+
+def test_operator_encoding_roundtrip():
+    problem = create_4blocks_task()  # An FSTRIPS problem, with functional effects
+    decoder = Decoder(problem.language)
+    for name, groundings in NaiveGroundingStrategy(problem).ground_actions().items():
+        for grounding in groundings:
+            op = ground_schema_into_plain_operator_from_grounding(problem.get_action(name), grounding)
+            code = encode_operator(op)
+            assert describe(decoder.operator(pickle.loads(pickle.dumps(code)))) == describe(op)
+
+    lang = create_sample_problem().language
+    at_robby, room = lang.get('at-robby', 'room')
+    x = lang.variable('x', lang.Object)
+    effect = UniversalEffect([x], [AddEffect(at_robby(x), room(x))])
+    assert str(Decoder(lang).effect(encode_effect(effect))) == str(effect)
+
+
+def test_parallel_grounding():
+    problem = create_sample_problem()
+    groundings = [(name, g) for name, gs in NaiveGroundingStrategy(problem).ground_actions().items() for g in gs]
+    serial = [ground_schema_into_plain_operator_from_grounding(problem.get_action(name), g) for name, g in groundings]
+
+    # The parallel result has the same operators, ordered by schema and, within a schema, by input order
+    for nprocs, chunksize in [(1, 1000), (2, 7), (3, 1000)]:
+        parallel = ground_operators_in_parallel(problem, groundings, nprocs, chunksize)
+        assert [describe(op) for op in parallel] == [describe(op) for op in serial]
+
+
+def test_grounding_into_operators_has_same_order_in_parallel():
+    problem = create_sample_problem()
+    serial = ground_problem_schemas_into_plain_operators(problem)
+    assert [describe(op) for op in ground_problem_schemas_into_plain_operators(problem, nprocs=2)] == \
+        [describe(op) for op in serial]
+    schemas = list(problem.actions.keys())
+    positions = [schemas.index(op.name.split('(')[0]) for op in serial]
+    assert positions == sorted(positions)  # Operators are ordered by schema
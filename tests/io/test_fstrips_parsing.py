@@ -1,4 +1,6 @@
 
+import os
+
 import pytest
 from tarski.errors import UndefinedSort, UndefinedPredicate
 from tarski.fstrips import AddEffect, FunctionalEffect
@@ -321,3 +323,99 @@ def test_increase_effects():
     increase = output[1][0]
     assert isinstance(increase, FunctionalEffect) and isinstance(increase.condition, Tautology)
     assert str(increase.rhs) == '+(total-cost(), 1)'
+
+
+def test_streaming_instance_parsing(tmp_path):
+    from tarski.grounding.cache import problem_fingerprint
+    data = os.path.join('tests', 'data', 'pddl')
+    instances = [(os.path.join(data, 'grid', 'domain.pddl'), os.path.join(data, 'grid', 'grid3x3.pddl')),
+                 (os.path.join(data, 'ipc', 'flashfill-sat18', 'domain-p01.pddl'),
+                  os.path.join(data, 'ipc', 'flashfill-sat18', 'p01.pddl'))]
+
+    domain = tmp_path / 'domain.pddl'
+    domain.write_text("""
+    (define (domain counters) (:requirements :typing :numeric-fluents :action-costs)
+     (:types counter) (:predicates (on ?c - counter)) (:functions (value ?c - counter) - number (total-cost) - number))
+    """)
+    instance = tmp_path / 'instance.pddl'
+    instance.write_text("""
+    ; A comment
+    (define (problem Counters-2) (:domain counters)
+     (:objects c0 c1 - counter)
+     (:init (on c0) (not (on c1)) (= (value c0) 3) (= (value ; A comment within a fact
+      c1) -1) (= (total-cost) 0))
+     (:goal (and (<= (value c0) (value c1)))) (:metric minimize (total-cost)))
+    """)
+    instances.append((str(domain), str(instance)))
+
+    for domain_filename, instance_filename in instances:
+        problem = FstripsReader(raise_on_error=True).read_problem(domain_filename, instance_filename)
+        streamed = FstripsReader(raise_on_error=True, streaming=True).read_problem(domain_filename, instance_filename)
+        assert problem.name == streamed.name
+        assert [c.name for c in problem.language.constants()] == [c.name for c in streamed.language.constants()]
+        assert problem_fingerprint(problem) == problem_fingerprint(streamed)
+        assert (problem.plan_metric is None) == (streamed.plan_metric is None)
+
+    instance.write_text("(define (problem counters-2) (:domain counters) (:objects c0 c1 - counter) (:init (on c0)")
+    with pytest.raises(ParsingError):
+        FstripsReader(raise_on_error=True, streaming=True).read_problem(str(domain), str(instance))
+
+
+def test_problem_cache(tmp_path):
+    from tarski.grounding.cache import problem_fingerprint
+    from tarski.io import ProblemCache
+    domain = tmp_path / 'domain.pddl'
+    domain.write_text("""
+    (define (domain counters) (:requirements :typing :numeric-fluents :action-costs)
+     (:types counter) (:predicates (on ?c - counter)) (:functions (value ?c - counter) - number (total-cost) - number)
+     (:action inc :parameters (?c - counter) :precondition (on ?c)
+      :effect (and (increase (value ?c) 1) (increase (total-cost) 2))))
+    """)
+    instance = tmp_path / 'instance.pddl'
+    instance.write_text("""
+    (define (problem counters-2) (:domain counters) (:objects c0 c1 - counter)
+     (:init (on c0) (= (value c0) 3) (= (value c1) -1) (= (total-cost) 0))
+     (:goal (and (<= (value c0) (value c1)))) (:metric minimize (total-cost)))
+    """)
+    cache = ProblemCache(str(tmp_path / 'cache'))
+    problems = [FstripsReader(raise_on_error=True, cache=cache).read_problem(str(domain), str(instance))
+                for _ in range(2)]
+    assert len(os.listdir(cache.directory)) == 1
+    parsed, loaded = problems
+    assert problem_fingerprint(parsed) == problem_fingerprint(loaded)
+    assert [s.name for s in parsed.language.sorts] == [s.name for s in loaded.language.sorts]
+    assert str(parsed.get_action('inc').cost) == str(loaded.get_action('inc').cost)
+    assert str(loaded.plan_metric.opt_expression) == 'total-cost()'
+
+    # A change in the contents of the files results in a new snapshot
+    instance.write_text(instance.read_text().replace('(on c0)', '(on c1)'))
+    changed = FstripsReader(raise_on_error=True, cache=cache).read_problem(str(domain), str(instance))
+    assert len(os.listdir(cache.directory)) == 2
+    assert problem_fingerprint(changed) != problem_fingerprint(loaded)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_read_instances(tmp_path, workers):
+    from tarski.grounding.cache import problem_fingerprint
+    from tarski.io import read_instances
+    from tarski.io.cache import restore_problem
+    domain = os.path.join('tests', 'data', 'pddl', 'grid', 'domain.pddl')
+    instances = []
+    for i in range(3):
+        instance = tmp_path / f'instance{i}.pddl'
+        instance.write_text(f"""
+        (define (problem grid-{i}) (:domain grid) (:objects p0 p1 p{i + 2} - position k0 - key d0 - door)
+         (:init (at p0) (leftof p0 p1) (above p1 p{i + 2}) (hand-free) (at-pos k0 p1) (opened-by d0 k0))
+         (:goal (and (at p{i + 2}))))
+        """)
+        instances.append(str(instance))
+
+    expected = [FstripsReader(raise_on_error=True).read_problem(domain, instance) for instance in instances]
+    problems = read_instances(domain, instances, workers=workers, raise_on_error=True)
+    assert [p.name for p in problems] == ['grid-0', 'grid-1', 'grid-2']
+    assert [problem_fingerprint(p) for p in problems] == [problem_fingerprint(p) for p in expected]
+    assert len({id(p.language) for p in problems}) == len(problems)
+
+    snapshots = read_instances(domain, instances, workers=workers, snapshots=True, streaming=True)
+    assert [problem_fingerprint(restore_problem(s, FstripsReader().problem)) for s in snapshots] == \
+        [problem_fingerprint(p) for p in expected]
@@ -1,3 +1,5 @@
+import gzip
+import io
 import tempfile
 from typing import Optional, List
 
@@ -133,6 +135,23 @@ def test_blocksworld_writing_with_different_constants():
     )""" in instance_model_string
 
 
+def test_streaming_writing(tmp_path):
+    problem = generate_fstrips_counters_problem(ncounters=3)
+    writer = FstripsWriter(problem)
+    domain, instance = str(tmp_path / 'domain.pddl.gz'), str(tmp_path / 'instance.pddl.gz')
+    writer.write(domain, instance)
+    with gzip.open(domain, 'rt') as f:
+        assert f.read() == writer.print_domain()
+    with gzip.open(instance, 'rt') as f:
+        text = f.read()
+    assert text == writer.print_instance()
+    assert "(= (value c1) 0)\n        (= (value c2) 0)" in text
+
+    stream = io.StringIO()
+    writer.dump_instance(stream)
+    assert stream.getvalue() == text
+
+
 def test_requirements_string():
     problem = parcprinter.create_small_task()
 
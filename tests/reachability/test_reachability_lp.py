@@ -1,5 +1,8 @@
+import gzip
 
-from tarski.reachability.asp import create_reachability_lp, LogicProgram, ReachabilityLPCompiler, LPAtom
+from tarski.reachability.asp import create_reachability_lp, compile_reachability_domain, LogicProgram, \
+    ReachabilityLPCompiler, LPAtom, split_rule
+from tarski.reachability.datalog import DatalogProgram, solve_datalog
 from tarski.syntax import exists
 from tarski import fstrips as fs
 from tests.io.common import parse_benchmark_instance
@@ -75,3 +78,52 @@ def test_lp_translation():
     assert lp.rules == [
         'action_gripper(G) :- type_object(G), atom_gripper(G).',
         'atom_gripper(G) :- action_gripper(G).']
+
+
+def test_lp_translator_not_shared_with_domain():
+    problem = create_sample_problem()
+    domain = compile_reachability_domain(problem)
+    translations = dict(domain.translator.cache)
+
+    _, tr1 = create_reachability_lp(problem, domain=domain)
+    _, tr2 = create_reachability_lp(problem, domain=domain)
+    assert tr1 is not domain.translator and tr2 is not domain.translator and tr1 is not tr2
+    assert domain.translator.cache == translations and len(tr1.cache) > len(translations)
+
+
+def test_lp_text_emission(tmp_path):
+    problem = create_sample_problem()
+    lp, tr = create_reachability_lp(problem)
+    text = lp.text()
+    assert text.splitlines() == lp.rules and text.endswith('\n')
+
+    # Normalized names are computed once and shared across all rules
+    assert tr.normalize('at-robby', prefix='atom') == 'atom_at__robby'
+    assert tr.normalize('at-robby', prefix='atom') is tr.normalize('at-robby', prefix='atom')
+
+    for filename in ('program.lp', 'program.lp.gz'):
+        lp.dump(str(tmp_path / filename))
+    with gzip.open(str(tmp_path / 'program.lp.gz'), 'rt') as f:
+        assert f.read() == text
+    with open(str(tmp_path / 'program.lp'), 'r') as f:
+        assert f.read() == text
+
+
+def test_lp_rule_splitting():
+    head = LPAtom('action_a', ['X', 'Y'])
+    body = [LPAtom('p', ['X', 'Z']), LPAtom('q', ['Z']), LPAtom('r', ['Y']), LPAtom('!=', ['X', 'Y'], infix=True)]
+    rules = split_rule(head, body, lambda args: LPAtom('aux', args))
+    # Variable Z is projected away as soon as "p" and "q" are joined, and the inequality is checked in the last rule
+    assert [f'{h} :- {", ".join(map(str, b))}.' for h, b in rules] == [
+        'aux(X) :- p(X, Z), q(Z).',
+        'action_a(X, Y) :- r(Y), aux(X), X != Y.']
+
+    problem = create_sample_problem()
+    for ground_actions in (True, False):
+        program, tr = create_reachability_lp(problem, ground_actions=ground_actions, lp=DatalogProgram())
+        split, splittr = create_reachability_lp(problem, ground_actions=ground_actions, split_rules=True,
+                                                lp=DatalogProgram())
+        assert all(sum(1 for atom in body if not atom.infix) <= 2 for _, body in split.rules)
+        model, splitmodel = solve_datalog(program, tr), solve_datalog(split, splittr)
+        assert {k: v for k, v in model.items() if not k.startswith('__f')} == \
+            {k: v for k, v in splitmodel.items() if not k.startswith('__f')}
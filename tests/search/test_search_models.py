@@ -1,12 +1,30 @@
 """
  Tests for the Search module
 """
+import copy
+
+import pytest
+
+import tarski
+from tarski import errors
 from tarski.benchmarks.blocksworld import generate_strips_blocksworld_problem
+from tarski.evaluators import evaluate_batch
+from tarski.evaluators.batch import states_to_matrix
+from tarski.evaluators.simple import evaluate
+from tarski.fstrips.action import PlainOperator
+from tarski.grounding import NaiveGroundingStrategy
+from tarski.grounding.common import StateVariableLite
 from tarski.grounding.lp_grounding import ground_problem_schemas_into_plain_operators
-from tarski.search import GroundForwardSearchModel, BreadthFirstSearch
+from tarski.search import GroundForwardSearchModel, BreadthFirstSearch, SuccessorGenerator, PackedModel, \
+    PackedStateLayout, create_packed_layout
 from tarski.search.model import progress
+from tarski.search.operations import is_applicable
+from tarski.syntax import exists, symref
 from tarski.syntax.transform.action_grounding import ground_schema_into_plain_operator_from_grounding
+from tarski.theories import Theory
+from tarski.util import SymbolIndex
 from tarski.utils import parse_model
+from tests.common.gripper import create_sample_problem
 from tests.io.common import parse_benchmark_instance
 
 
@@ -56,5 +74,159 @@ def test_basic_search():
     assert stats.nexpansions == 3
 
 
+def test_packed_model():
+    problem = create_sample_problem()
+    lang = problem.language
+    layout = create_packed_layout(problem, NaiveGroundingStrategy(problem).ground_state_variables())
+    at_robby, room, rooma, roomb = lang.get('at-robby', 'room', 'rooma', 'roomb')
+
+    s0 = layout.pack(problem.init)
+    assert s0 == problem.init and str(s0) == str(problem.init)
+    assert s0.holds(at_robby, (rooma, )) and not s0.holds(at_robby, (roomb, ))
+    assert s0.holds(room, (roomb, ))  # A static atom, answered by the static part of the layout
+    assert evaluate(problem.goal, s0) is False
+
+    s1 = copy.deepcopy(s0)
+    assert s1 == s0 and hash(s1) == hash(s0) and s1.layout is s0.layout
+    s1.discard(at_robby, rooma)
+    s1.add(at_robby(roomb))
+    assert s1 != s0 and s1.holds(at_robby, (roomb, )) and s0.holds(at_robby, (rooma, ))
+    assert len(s1.as_atoms()) == len(s0.as_atoms())
+    assert s1.get_extension(at_robby) == {(symref(roomb), )}
+    assert s1.get_extension(room) == problem.init.get_extension(room)
+
+    # Quantified formulas are evaluated by joining over the extensions of the packed model
+    x = lang.variable('x', lang.Object)
+    assert evaluate(exists(x, at_robby(x) & (x != rooma)), s1) is True
+    assert evaluate(exists(x, at_robby(x) & (x != rooma)), s0) is False
+
+    s1.remove(at_robby(roomb))
+    s1.add(at_robby, rooma)
+    assert s1 == s0 and hash(s1) == hash(s0)
+
+    # As with standard models, points with non-constants hold nowhere, and only removal of true atoms is checked
+    assert not s1.holds(at_robby, (x, ))
+    s1.discard(at_robby, roomb)
+    with pytest.raises(KeyError):
+        s1.remove(at_robby, roomb)
+    with pytest.raises(errors.SemanticError):
+        s1.discard(room, rooma)  # A static atom
+
+
+def test_search_with_packed_states():
+    problem = create_sample_problem()
+    grounding = NaiveGroundingStrategy(problem)
+    operators = [ground_schema_into_plain_operator_from_grounding(problem.get_action(name), binding)
+                 for name, bindings in grounding.ground_actions().items() for binding in bindings]
+    layout = create_packed_layout(problem, grounding.ground_state_variables())
+
+    _, stats = BreadthFirstSearch(GroundForwardSearchModel(problem, operators), max_expansions=20).run()
+    _, packed_stats = BreadthFirstSearch(GroundForwardSearchModel(problem, operators, layout), max_expansions=20).run()
+    assert packed_stats.nexpansions == stats.nexpansions == 20
+    assert packed_stats.iterations == stats.iterations
+
+
+def test_progression_shares_unaffected_extensions():
+    problem = create_sample_problem()
+    lang = problem.language
+    move = problem.get_action('move')
+    at_robby, room, rooma, roomb = lang.get('at-robby', 'room', 'rooma', 'roomb')
 
-
+    s0 = problem.init
+    s1 = progress(s0, ground_schema_into_plain_operator_from_grounding(move, ('rooma', 'roomb')))
+    assert s1.holds(at_robby, (roomb, )) and not s1.holds(at_robby, (rooma, ))
+    assert s0.holds(at_robby, (rooma, )) and not s0.holds(at_robby, (roomb, ))  # The parent state is untouched
+
+    # The extension of static "room" is shared, while that of "at-robby" has been copied
+    assert s1.predicate_extensions[room.signature] is s0.predicate_extensions[room.signature]
+    assert s1.predicate_extensions[at_robby.signature] is not s0.predicate_extensions[at_robby.signature]
+
+
+def test_successor_generator():
+    problem = create_sample_problem()
+    grounding = NaiveGroundingStrategy(problem)
+    operators = [ground_schema_into_plain_operator_from_grounding(problem.get_action(name), binding)
+                 for name, bindings in grounding.ground_actions().items() for binding in bindings]
+    # Add one operator with a non-conjunctive precondition, which needs to be dealt with by the generic fallback
+    lang = problem.language
+    at_robby, rooma, roomb = lang.get('at-robby', 'rooma', 'roomb')
+    operators.append(PlainOperator(lang, 'teleport', at_robby(rooma) | at_robby(roomb), []))
+
+    generator = SuccessorGenerator(operators)
+    assert generator.generic == [len(operators) - 1]
+
+    # The generator must return exactly the same operators, in the same order, than a linear scan over all operators
+    states, seen = [problem.init], set()
+    while states and len(seen) < 30:
+        state = states.pop(0)
+        if state in seen:
+            continue
+        seen.add(state)
+        applicable = generator.applicable(state)
+        assert applicable == [op for op in operators if is_applicable(state, op)]
+        states += [progress(state, op) for op in applicable]
+
+
+def test_batch_evaluation():
+    problem = create_sample_problem()
+    grounding = NaiveGroundingStrategy(problem)
+    operators = [ground_schema_into_plain_operator_from_grounding(problem.get_action(name), binding)
+                 for name, bindings in grounding.ground_actions().items() for binding in bindings]
+    layout = create_packed_layout(problem, grounding.ground_state_variables())
+    model = GroundForwardSearchModel(problem, operators, layout)
+
+    # Collect a few states of the state space
+    states = [model.init()]
+    for state in states:
+        states += [succ for _, succ in model.successors(state) if succ not in states]
+        if len(states) > 50:
+            break
+
+    lang = problem.language
+    at_robby, room, rooma, roomb, free = lang.get('at-robby', 'room', 'rooma', 'roomb', 'free')
+    left, right = lang.get('left', 'right')
+    formulas = [problem.goal, at_robby(roomb), ~free(left) | free(right), room(rooma) & at_robby(rooma), rooma != roomb]
+    for formula in formulas:
+        expected = [evaluate(formula, s) for s in states]
+        assert evaluate_batch(formula, states).tolist() == expected
+        assert evaluate_batch(formula, states_to_matrix(states, model.layout), model.layout).tolist() == expected
+
+
+def test_batch_evaluation_of_numeric_terms():
+    lang = tarski.language('counters', [Theory.EQUALITY, Theory.ARITHMETIC])
+    x, y = lang.function('x', lang.Integer), lang.function('y', lang.Integer)
+    layout = PackedStateLayout(lang, SymbolIndex([StateVariableLite(x, ()), StateVariableLite(y, ())]))
+
+    states = []
+    for i in range(5):
+        state = PackedModel(layout)
+        state.set(x(), i)
+        state.set(y(), 4 - i)
+        states.append(state)
+
+    assert evaluate_batch(x() + 2 * y(), states).tolist() == [8, 7, 6, 5, 4]
+    assert evaluate_batch((x() < y()) | (x() == 4), states).tolist() == [True, True, False, False, True]
+
+
+def test_batch_evaluation_with_object_valued_terms():
+    lang = tarski.language('blocks', [Theory.EQUALITY, Theory.ARITHMETIC])
+    block = lang.sort('block')
+    loc, clear = lang.function('loc', block, block), lang.predicate('clear', block)
+    height = lang.function('h', lang.Integer)
+    b1, b2, b3 = (lang.constant(name, block) for name in ('b1', 'b2', 'b3'))
+    layout = PackedStateLayout(lang, SymbolIndex([StateVariableLite(loc, (b1, )), StateVariableLite(clear, (b2, )),
+                                                  StateVariableLite(height, ())]))
+
+    states = []
+    for target in (b2, b3):
+        state = PackedModel(layout)
+        state.set(loc(b1), target)
+        state.set(height(), 2)
+        if target is b3:
+            state.add(clear, b2)
+        states.append(state)
+
+    assert evaluate_batch(clear(b2), states).tolist() == [False, True]
+    assert evaluate_batch(loc(b1) == b3, states).tolist() == [False, True]
+    assert evaluate_batch(loc(b1), states).tolist() == ['b2', 'b3']
+    assert evaluate_batch(height() + 1, states).tolist() == [3, 3]
@@ -1,4 +1,10 @@
 
+import pickle
+
+import pytest
+
+from tarski.errors import DuplicateDefinition
+from tarski.util import CompactIndex, SymbolIndex
 from tarski.utils import resources
 
 
@@ -11,3 +17,35 @@ def test_timer_class():
     with resources.timing("\tHello world", newline=True):
         x += 1
     assert x == 2
+
+
+def test_symbol_index_get_or_add():
+    index = SymbolIndex(['a', 'b'])
+    assert index.get_or_add('b') == 1
+    assert index.get_or_add('c') == 2
+    index.update(['a', 'd', 'c'])
+    assert list(index) == ['a', 'b', 'c', 'd']
+
+
+def test_compact_index(tmp_path):
+    keys = [(0, 1, 2), (3, ), (), (0, 2, 1), (5, 5)] + [(i, i + 1) for i in range(100)]
+    index = CompactIndex(keys[:3])
+    assert index.get_or_add((3, )) == 1
+    index.update(keys)
+    assert len(index) == len(keys) and list(index) == keys
+    assert index.get_index((0, 2, 1)) == 3 and index.get_object(3) == (0, 2, 1)
+    assert (0, 1) in index and (1, 0) not in index
+    with pytest.raises(DuplicateDefinition):
+        index.add((5, 5))
+    with pytest.raises(KeyError):
+        index.get_index((1, 0))
+
+    copy = pickle.loads(pickle.dumps(index))
+    assert list(copy.enumerate()) == list(index.enumerate())
+
+    filename = str(tmp_path / 'index.bin')
+    index.save(filename)
+    loaded = CompactIndex.load(filename)
+    assert all(loaded.get_index(key) == i for i, key in enumerate(keys))
+    assert loaded.get_or_add((1, 0)) == len(keys) and (1, 0) in loaded  # Loaded indexes can be extended
+    assert (1, 0) not in CompactIndex.load(filename)